@@ -2,9 +2,127 @@
 ciphertext autokey variations
 we can do 3 operations, 2 subtractions and 1 addition, addition=vigenere, subtraction=beaufort, minuend
 C=P+K C=P-K, C=K-P
+
+The kernels work on whole arrays. Where the key stream is the input itself
+(primer + text) it is read through a SequenceChain. Where it is the output,
+every element depends on the one a primer length earlier, so each residue
+class modulo the primer length is a running sum, see autokey_recurrence().
 """
 
-from ..structures.sequence import Sequence
+import numpy as np
+
+from ..stats.batch import batch_ioc
+from ..stats.ioc import normalized_ioc
+from ..structures.sequence import Sequence, SequenceChain, SequenceView
+
+
+def autokey_keystream(
+    text: Sequence, primer: Sequence, textsign: int, keysign: int
+) -> np.ndarray:
+    """
+    textsign * text[j] + keysign * key[j] for the key stream primer + text
+    """
+    assert primer.alphabet == text.alphabet
+    key = SequenceChain(primer, text)
+    out = textsign * text.data.astype(np.int64)
+    for start, piece in key.pieces(0, len(text)):
+        out[start : start + len(piece)] += keysign * piece.astype(np.int64)
+    return out
+
+
+def autokey_recurrence(
+    x: np.ndarray, primer: Sequence, MAX: int, sign: int = 1
+) -> np.ndarray:
+    """
+    Solve y[j] = x[j] + sign * y[j-P] mod MAX, with y[j-P] = primer[j] for j < P
+    and P the length of the primer.
+    Every residue class modulo P is independent: it's a running sum, or an
+    alternating running sum when sign is -1.
+    """
+    P = len(primer)
+    if P == 0:
+        raise ValueError("primer can't be empty")
+    N = len(x)
+    rows = -(-N // P)
+    grid = np.zeros(rows * P, dtype=np.int64)
+    grid[:N] = x
+    grid = grid.reshape(rows, P) % MAX
+    start = primer.data.astype(np.int64)
+    if sign == 1:
+        y = np.cumsum(grid, axis=0) + start
+    else:
+        # (-1)^n y[n] is a plain running sum of (-1)^n x[n]
+        alternate = np.where(np.arange(0, rows) % 2 == 0, 1, -1)[:, None]
+        y = alternate * (np.cumsum(alternate * grid, axis=0) - start)
+    return y.reshape(-1)[:N] % MAX
+
+
+def autokey_keystream_batch(
+    text: Sequence, primers: np.ndarray, textsign: int, keysign: int
+) -> np.ndarray:
+    """
+    autokey_keystream() for a batch of primers of the same length, one per
+    row. Only the first P elements depend on the primer.
+    """
+    primers = np.atleast_2d(primers).astype(np.int64)
+    P = primers.shape[1]
+    data = text.data.astype(np.int64)
+    N = len(data)
+    out = np.empty((len(primers), N), dtype=np.int64)
+    out[:, P:] = textsign * data[P:] + keysign * data[: max(N - P, 0)]
+    out[:, :P] = textsign * data[:P] + keysign * primers[:, :N]
+    return out
+
+
+def autokey_recurrence_batch(
+    x: np.ndarray, primers: np.ndarray, MAX: int, sign: int = 1
+) -> np.ndarray:
+    """
+    autokey_recurrence() for a batch of primers of the same length, one per
+    row. The running sums are shared, every primer only adds its own start.
+    """
+    primers = np.atleast_2d(primers).astype(np.int64)
+    K, P = primers.shape
+    if P == 0:
+        raise ValueError("primer can't be empty")
+    N = len(x)
+    rows = -(-N // P)
+    grid = np.zeros(rows * P, dtype=np.int64)
+    grid[:N] = x
+    grid = grid.reshape(rows, P) % MAX
+    if sign == 1:
+        y = np.cumsum(grid, axis=0)[None, :, :] + primers[:, None, :]
+    else:
+        alternate = np.where(np.arange(0, rows) % 2 == 0, 1, -1)[:, None]
+        running = np.cumsum(alternate * grid, axis=0)
+        y = alternate[None, :, :] * (running[None, :, :] - primers[:, None, :])
+    return y.reshape(K, -1)[:, :N] % MAX
+
+
+def autokey_decrypt_batch(
+    ciphertext: Sequence, primers: np.ndarray, algorithm: str
+) -> np.ndarray:
+    """
+    Decrypt with a batch of primers at once, one plaintext per row.
+    `algorithm` is one of AUTOKEY_ALGORITHMS
+    """
+    MAX = len(ciphertext.alphabet)
+    c = ciphertext.data.astype(np.int64)
+    kind, textsign, keysign = AUTOKEY_ALGORITHMS[algorithm]
+    if kind == "ciphertext":
+        return autokey_keystream_batch(ciphertext, primers, textsign, keysign) % MAX
+    return autokey_recurrence_batch(textsign * c, primers, MAX, keysign)
+
+
+# how every autokey decryption is computed: which key, and the signs
+AUTOKEY_ALGORITHMS: dict[str, tuple[str, int, int]] = {
+    "ciphertext_vigenere": ("ciphertext", 1, -1),
+    "ciphertext_beaufort": ("ciphertext", -1, 1),
+    "ciphertext_minuend": ("ciphertext", 1, 1),
+    "plaintext_vigenere": ("plaintext", 1, -1),
+    "plaintext_beaufort": ("plaintext", -1, 1),
+    "plaintext_minuend": ("plaintext", 1, 1),
+}
 
 
 def ciphertext_autokey_vigenere_encrypt(
@@ -14,14 +132,9 @@ def ciphertext_autokey_vigenere_encrypt(
     Vigenere primitive without any console output, C=P+K
     """
     assert primer.alphabet == plaintext.alphabet
-    key: Sequence = primer.copy()
-    output = Sequence(alphabet=plaintext.alphabet)
     MAX = len(plaintext.alphabet)
-    for j in range(0, len(plaintext)):
-        c = (plaintext[j] + key[j]) % MAX
-        output.append(c)
-        key.append(c)
-    return output
+    c = autokey_recurrence(plaintext.data.astype(np.int64), primer, MAX, 1)
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def ciphertext_autokey_vigenere_decrypt(
@@ -30,13 +143,9 @@ def ciphertext_autokey_vigenere_decrypt(
     """
     Vigenere primitive without any console output, P=C-K
     """
-    assert primer.alphabet == ciphertext.alphabet
     MAX = len(ciphertext.alphabet)
-    key = primer + ciphertext
-    output = Sequence(alphabet=ciphertext.alphabet)
-    for j in range(0, len(ciphertext)):
-        output.append((ciphertext[j] - key[j]) % MAX)
-    return output
+    p = autokey_keystream(ciphertext, primer, 1, -1) % MAX
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 def ciphertext_autokey_beaufort_encrypt(
@@ -46,14 +155,9 @@ def ciphertext_autokey_beaufort_encrypt(
     Minuend primitive without any console output, C=K-P
     """
     assert primer.alphabet == plaintext.alphabet
-    key: Sequence = primer.copy()
     MAX = len(plaintext.alphabet)
-    output = Sequence(alphabet=plaintext.alphabet)
-    for j in range(0, len(plaintext)):
-        c = (key[j] - plaintext[j]) % MAX
-        output.append(c)
-        key.append(c)
-    return output
+    c = autokey_recurrence(-plaintext.data.astype(np.int64), primer, MAX, 1)
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def ciphertext_autokey_beaufort_decrypt(
@@ -62,13 +166,9 @@ def ciphertext_autokey_beaufort_decrypt(
     """
     Minuend primitive without any console output, P=K-C
     """
-    assert primer.alphabet == ciphertext.alphabet
-    key: Sequence = primer + ciphertext
-    output = Sequence(alphabet=ciphertext.alphabet)
     MAX = len(ciphertext.alphabet)
-    for j in range(0, len(ciphertext)):
-        output.append((key[j] - ciphertext[j]) % MAX)
-    return output
+    p = autokey_keystream(ciphertext, primer, -1, 1) % MAX
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 def ciphertext_autokey_variant_beaufort_encrypt(
@@ -78,14 +178,9 @@ def ciphertext_autokey_variant_beaufort_encrypt(
     Beafort primitive without any console output, C=P-K
     """
     assert primer.alphabet == plaintext.alphabet
-    key: Sequence = primer.copy()
-    output = Sequence(alphabet=plaintext.alphabet)
     MAX = len(plaintext.alphabet)
-    for j in range(0, len(plaintext)):
-        c = (plaintext[j] - key[j]) % MAX
-        output.append(c)
-        key.append(c)
-    return output
+    c = autokey_recurrence(plaintext.data.astype(np.int64), primer, MAX, -1)
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def ciphertext_autokey_variant_beaufort_decrypt(
@@ -94,19 +189,27 @@ def ciphertext_autokey_variant_beaufort_decrypt(
     """
     Beafort primitive without any console output, P=C+K
     """
-    assert primer.alphabet == ciphertext.alphabet
-    key: Sequence = primer + ciphertext
-    output = Sequence(alphabet=ciphertext.alphabet)
     MAX = len(ciphertext.alphabet)
-    for j in range(0, len(ciphertext)):
-        output.append((ciphertext[j] + key[j]) % MAX)
-    return output
+    p = autokey_keystream(ciphertext, primer, 1, 1) % MAX
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 """
 Combo autokey combines both the plaintext and ciphertext algorithms
 """
 
+# signs of the text, the plaintext key and the ciphertext key for every mode
+COMBO_MODES: dict[int, tuple[int, int, int]] = {
+    1: (1, 1, 1),
+    2: (1, 1, -1),
+    3: (1, -1, 1),
+    4: (1, -1, -1),
+    5: (-1, 1, 1),
+    6: (-1, 1, -1),
+    7: (-1, -1, 1),
+    8: (-1, -1, -1),
+}
+
 
 def combo_autokey_vigenere_encrypt(
     plaintext: Sequence, primer: Sequence, mode: int = 1
@@ -115,32 +218,13 @@ def combo_autokey_vigenere_encrypt(
     Vigenere primitive without any console output, C=P+K
     """
     assert primer.alphabet == plaintext.alphabet
-    plain_key: Sequence = primer + plaintext
-    cipher_key: Sequence = primer
-    output = Sequence(alphabet=plaintext.alphabet)
+    if mode not in COMBO_MODES:
+        raise Exception
+    textsign, plainsign, ciphersign = COMBO_MODES[mode]
     MAX = len(plaintext.alphabet)
-    for j in range(0, len(plaintext)):
-        if mode == 1:
-            c = (plaintext[j] + plain_key[j] + cipher_key[j]) % MAX
-        elif mode == 2:
-            c = (plaintext[j] + plain_key[j] - cipher_key[j]) % MAX
-        elif mode == 3:
-            c = (plaintext[j] - plain_key[j] + cipher_key[j]) % MAX
-        elif mode == 4:
-            c = (plaintext[j] - plain_key[j] - cipher_key[j]) % MAX
-        elif mode == 5:
-            c = (-plaintext[j] + plain_key[j] + cipher_key[j]) % MAX
-        elif mode == 6:
-            c = (-plaintext[j] + plain_key[j] - cipher_key[j]) % MAX
-        elif mode == 7:
-            c = (-plaintext[j] - plain_key[j] + cipher_key[j]) % MAX
-        elif mode == 8:
-            c = (-plaintext[j] - plain_key[j] - cipher_key[j]) % MAX
-        else:
-            raise Exception
-        cipher_key.append(c)
-        output.append(c)
-    return output
+    x = autokey_keystream(plaintext, primer, textsign, plainsign)
+    c = autokey_recurrence(x, primer, MAX, ciphersign)
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def combo_autokey_vigenere_decrypt(
@@ -149,34 +233,15 @@ def combo_autokey_vigenere_decrypt(
     """
     Vigenere primitive without any console output, C=P+K
     """
+    # TODO encrypt and decrypt modes don't match
     assert primer.alphabet == ciphertext.alphabet
-    plain_key: Sequence = primer
-    cipher_key: Sequence = primer + ciphertext
-    output = Sequence(alphabet=ciphertext.alphabet)
+    if mode not in COMBO_MODES:
+        raise Exception
+    textsign, plainsign, ciphersign = COMBO_MODES[mode]
     MAX = len(ciphertext.alphabet)
-    for j in range(0, len(ciphertext)):
-        # TODO encrypt and decrypt modes don't match
-        if mode == 1:
-            p = (ciphertext[j] + plain_key[j] + cipher_key[j]) % MAX
-        elif mode == 2:
-            p = (ciphertext[j] + plain_key[j] - cipher_key[j]) % MAX
-        elif mode == 3:
-            p = (ciphertext[j] - plain_key[j] + cipher_key[j]) % MAX
-        elif mode == 4:
-            p = (ciphertext[j] - plain_key[j] - cipher_key[j]) % MAX
-        elif mode == 5:
-            p = (-ciphertext[j] + plain_key[j] + cipher_key[j]) % MAX
-        elif mode == 6:
-            p = (-ciphertext[j] + plain_key[j] - cipher_key[j]) % MAX
-        elif mode == 7:
-            p = (-ciphertext[j] - plain_key[j] + cipher_key[j]) % MAX
-        elif mode == 8:
-            p = (-ciphertext[j] - plain_key[j] - cipher_key[j]) % MAX
-        else:
-            raise Exception
-        plain_key.append(p)
-        output.append(p)
-    return output
+    x = autokey_keystream(ciphertext, primer, textsign, ciphersign)
+    p = autokey_recurrence(x, primer, MAX, plainsign)
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 # plaintext autokey variations
@@ -190,14 +255,9 @@ def plaintext_autokey_vigenere_encrypt(
     """
     Vigenere primitive without any console output, C=P+K
     """
-    assert primer.alphabet == plaintext.alphabet
-    key = primer + plaintext
     MAX = len(plaintext.alphabet)
-    output = Sequence(alphabet=plaintext.alphabet)
-    for j in range(0, len(plaintext)):
-        c = (plaintext[j] + key[j]) % MAX
-        output.append(c)
-    return output
+    c = autokey_keystream(plaintext, primer, 1, 1) % MAX
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def plaintext_autokey_vigenere_encrypt_with_alphabet(
@@ -207,25 +267,21 @@ def plaintext_autokey_vigenere_encrypt_with_alphabet(
     trace: bool = False,
 ) -> Sequence:
     """
-    Plain Vigenere C=P+K
+    Plain Vigenere C=P+K, on the tabula recta of a mixed alphabet
     """
     assert primer.alphabet == plaintext.alphabet
-    key = primer + plaintext
     MAX = len(plaintext.alphabet)
-    output: Sequence = Sequence()
-
     if not alphabet:
-        alphabet = list(range(0, MAX + 1))
-    tr: list[list[int]] = construct_tabula_recta(alphabet)
-    abc = list(alphabet)
-
-    for i in range(0, len(plaintext)):
-        row_index = abc.index(key[i])
-        row = tr[row_index]
-        column_index = abc.index(plaintext[i])
-        output.append(tr[row_index][column_index])
+        alphabet = list(range(0, MAX))
+    abc = np.array(list(alphabet), dtype=np.int64)
+    position = np.zeros(MAX, dtype=np.int64)
+    position[abc] = np.arange(0, len(abc))
+    key = SequenceChain(primer, plaintext)
 
-    return output
+    c = position[plaintext.data]
+    for start, piece in key.pieces(0, len(plaintext)):
+        c[start : start + len(piece)] += position[piece]
+    return Sequence.from_buffer(abc[c % len(abc)], plaintext.alphabet)
 
 
 def plaintext_autokey_vigenere_decrypt(
@@ -235,14 +291,9 @@ def plaintext_autokey_vigenere_decrypt(
     Vigenere primitive without any console output, P=C-K
     """
     assert primer.alphabet == ciphertext.alphabet
-    key: Sequence = primer.copy()
     MAX = len(ciphertext.alphabet)
-    output = Sequence(alphabet=ciphertext.alphabet)
-    for j in range(0, len(ciphertext)):
-        c = (ciphertext[j] - key[j]) % MAX
-        output.append(c)
-        key.append(c)
-    return output
+    p = autokey_recurrence(ciphertext.data.astype(np.int64), primer, MAX, -1)
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 def plaintext_autokey_beaufort_encrypt(
@@ -251,14 +302,9 @@ def plaintext_autokey_beaufort_encrypt(
     """
     Minuend primitive without any console output, C=K-P
     """
-    assert primer.alphabet == plaintext.alphabet
-    key: Sequence = primer + plaintext
-    output = Sequence(alphabet=plaintext.alphabet)
     MAX = len(plaintext.alphabet)
-    for j in range(0, len(plaintext)):
-        c = (key[j] - plaintext[j]) % MAX
-        output.append(c)
-    return output
+    c = autokey_keystream(plaintext, primer, -1, 1) % MAX
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def plaintext_autokey_beaufort_decrypt(
@@ -268,14 +314,9 @@ def plaintext_autokey_beaufort_decrypt(
     Minuend primitive without any console output, P=K-C
     """
     assert primer.alphabet == ciphertext.alphabet
-    key: Sequence = primer.copy()
-    output = Sequence(alphabet=ciphertext.alphabet)
     MAX = len(ciphertext.alphabet)
-    for j in range(0, len(ciphertext)):
-        c = (key[j] - ciphertext[j]) % MAX
-        output.append(c)
-        key.append(c)
-    return output
+    p = autokey_recurrence(-ciphertext.data.astype(np.int64), primer, MAX, 1)
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 def plaintext_autokey_variant_beaufort_encrypt(
@@ -284,14 +325,9 @@ def plaintext_autokey_variant_beaufort_encrypt(
     """
     Beafort primitive without any console output, C=P-K
     """
-    assert primer.alphabet == plaintext.alphabet
-    key: Sequence = primer + plaintext
-    output = Sequence(alphabet=plaintext.alphabet)
     MAX = len(plaintext.alphabet)
-    for j in range(0, len(plaintext)):
-        c = (plaintext[j] - key[j]) % MAX
-        output.append(c)
-    return output
+    c = autokey_keystream(plaintext, primer, 1, -1) % MAX
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def plaintext_autokey_variant_beaufort_decrypt(
@@ -301,47 +337,13 @@ def plaintext_autokey_variant_beaufort_decrypt(
     Beafort primitive without any console output, P=C+K
     """
     assert primer.alphabet == ciphertext.alphabet
-    key: Sequence = primer.copy()
-    output = Sequence(alphabet=ciphertext.alphabet)
     MAX = len(ciphertext.alphabet)
-    for j in range(0, len(ciphertext)):
-        p = (key[j] + ciphertext[j]) % MAX
-        output.append(p)
-        key.append(p)
-    return output
-
-
-# Vigenere Autokey with custom alphabet
-
-
-def plaintext_autokey_vigenere_encrypt_with_alphabet(
-    plaintext: Sequence,
-    primer: Sequence,
-    # alphabet: list[int] = range(0, MAX + 1),
-    trace: bool = False,
-) -> Sequence:
-    """
-    Plain Vigenere C=P+K
-    """
-    assert primer.alphabet == plaintext.alphabet
-    output = Sequence(alphabet=plaintext.alphabet)
-    tr: list[list[int]] = construct_tabula_recta(alphabet)
-
-    key: list[int] = primer.copy()
-    output: list[int] = []
-    for j in range(0, len(plaintext)):
-        row_index = alphabet.index(primer[i % len(primer)])
-        row = tr[row_index]
-        column_index = alphabet.index(plaintext[i])
-        c = tr[row_index][column_index]
-        output.append(c)
-        key.append(c)
-
-    return output
+    p = autokey_recurrence(ciphertext.data.astype(np.int64), primer, MAX, 1)
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 def detect_plaintext_autokey(
-    ciphertext: list[int],
+    ciphertext: Sequence,
     minkeysize: int = 1,
     maxkeysize: int = 20,
     trace: bool = False,
@@ -350,44 +352,33 @@ def detect_plaintext_autokey(
     the way Caesar generalizes to Vigenere,
     a single-letter autokey generalizes to a multi-letter autokey
     to solve it, split it into multiple slices.
+    The slices are views on the ciphertext, nothing is copied.
     """
+    MAX = len(ciphertext.alphabet)
     if trace is True:
         print(f"test for plaintext autokey, samplesize={len(ciphertext)}")
         print("#######################################################\n")
 
+    # every single-rune primer at once, one candidate per row
+    primers = np.arange(0, MAX)[:, None]
     for keysize in range(minkeysize, maxkeysize + 1):
         slices = {}
-        vigiocs: float = 0
-        miniocs: float = 0
-        beaiocs: float = 0
+        iocsums: dict[str, float] = {"vigenere": 0.0, "beaufort": 0.0, "minuend": 0.0}
         for start in range(0, keysize):
-            slices[start] = ciphertext[start::keysize]
+            slices[start] = SequenceView(ciphertext, offset=start, stride=keysize)
             if trace is True:
                 print(f"\nslice={start}: ", end="")
-            # Bruteforce Vigenere introductory key at this position
-            for key in range(0, MAX):
-                plain = plaintext_autokey_vigenere_decrypt(slices[start], [key])
-                vigiocs += normalized_ioc(plain)
-                if normalized_ioc(plain) > 1.3:
-                    if trace is True:
-                        print(f"vigenere ioc={normalized_ioc(plain):.2f} ", end="")
-            # Bruteforce Beaufort introductory key at this position
-            for key in range(0, MAX):
-                plain = plaintext_autokey_beaufort_decrypt(slices[start], [key])
-                beaiocs += normalized_ioc(plain)
-                if normalized_ioc(plain) > 1.3:
-                    if trace is True:
-                        print(f"beaufort ioc={normalized_ioc(plain):.2f} ", end="")
-            # Bruteforce Minuend introductory key at this position
-            for key in range(0, MAX):
-                plain = plaintext_autokey_beaufort_decrypt(slices[start], [key])
-                miniocs += normalized_ioc(plain)
-                if normalized_ioc(plain) > 1.3:
-                    if trace is True:
-                        print(f"minuend ioc={normalized_ioc(plain):.2f} ", end="")
-        vigiocavg = vigiocs / MAX / keysize
-        miniocavg = miniocs / MAX / keysize
-        beaiocavg = beaiocs / MAX / keysize
+            # Bruteforce Vigenere, Beaufort and Minuend introductory key at this position
+            for name in iocsums.keys():
+                plain = autokey_decrypt_batch(slices[start], primers, f"plaintext_{name}")
+                iocs = batch_ioc(plain, MAX)
+                iocsums[name] += float(iocs.sum())
+                if trace is True:
+                    for ic in iocs[iocs > 1.3]:
+                        print(f"{name} ioc={ic:.2f} ", end="")
+        vigiocavg = iocsums["vigenere"] / MAX / keysize
+        miniocavg = iocsums["minuend"] / MAX / keysize
+        beaiocavg = iocsums["beaufort"] / MAX / keysize
         if trace is True:
             print(f"\nvigenere keysize={keysize} avgioc = {vigiocavg:0.3f}")
             print(f"\nbeaufort keysize={keysize} avgioc = {beaiocavg:0.3f}")
@@ -395,6 +386,8 @@ def detect_plaintext_autokey(
         if vigiocavg > 1.2 or miniocavg > 1.2 or beaiocavg > 1.2:
             print("Attempting bruteforce...")
             if keysize < 4:
+                from ..lib import bruteforce_autokey
+
                 bruteforce_autokey(
                     ciphertext,
                     minkeylength=keysize,
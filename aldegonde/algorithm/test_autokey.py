@@ -75,3 +75,21 @@ def test_ciphertext_autokey_vigenere_typewriter():
         )
         == demo_plaintext
     )
+
+
+def test_autokey_decrypt_batch():
+    ciphertext = Sequence("KBHBNDOKURKXVDMSLXV", alphabet=UPPERCASE_ALPHABET)
+    single = {
+        "ciphertext_vigenere": autokey.ciphertext_autokey_vigenere_decrypt,
+        "ciphertext_beaufort": autokey.ciphertext_autokey_beaufort_decrypt,
+        "ciphertext_minuend": autokey.ciphertext_autokey_variant_beaufort_decrypt,
+        "plaintext_vigenere": autokey.plaintext_autokey_vigenere_decrypt,
+        "plaintext_beaufort": autokey.plaintext_autokey_beaufort_decrypt,
+        "plaintext_minuend": autokey.plaintext_autokey_variant_beaufort_decrypt,
+    }
+    primers = [[23], [0], [25], [3, 7], [1, 2, 3, 4, 5]]
+    for name, decrypt in single.items():
+        for primer in primers:
+            batch = autokey.autokey_decrypt_batch(ciphertext, [primer, primer], name)
+            expected = decrypt(ciphertext, Sequence.wrap(primer, UPPERCASE_ALPHABET))
+            assert batch[1].tolist() == expected.data.tolist()
@@ -1,18 +1,27 @@
+import numpy as np
+
+from ..analysis.split import split_by_slice
+from ..stats.ioc import normalized_ioc
 from ..structures.alphabet import Alphabet
 from ..structures.sequence import Sequence
 
 
+def periodic_key(primer: Sequence, length: int) -> np.ndarray:
+    """
+    The primer repeated up to `length` elements
+    """
+    if len(primer) == 0:
+        raise ValueError("primer can't be empty")
+    return np.resize(primer.data.astype(np.int64), length)
+
+
 def variant_beaufort_encrypt(
     plaintext: Sequence, primer: Sequence, trace: bool = False
 ) -> Sequence:
-    output: Sequence = Sequence(alphabet=plaintext.alphabet)
-    for i in range(0, len(plaintext)):
-        output.append(
-            variant_beaufort_encrypt_module(
-                plaintext[i], primer[i % len(primer)], len(output.alphabet)
-            )
-        )
-    return output
+    MAX = len(plaintext.alphabet)
+    key = periodic_key(primer, len(plaintext))
+    c = variant_beaufort_encrypt_module(plaintext.data.astype(np.int64), key, MAX)
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def variant_beaufort_encrypt_module(char: int, modifier: int, alphabetlen: int) -> int:
@@ -26,10 +35,10 @@ def variant_beaufort_encrypt_module(char: int, modifier: int, alphabetlen: int)
 def variant_beaufort_decrypt(
     ciphertext: Sequence, primer: Sequence, trace: bool = False
 ) -> Sequence:
-    output: Sequence = Sequence(alphabet=ciphertext.alphabet)
-    for i in range(0, len(ciphertext)):
-        output.append((ciphertext[i] + primer[i % len(primer)]) % len(output.alphabet))
-    return output
+    MAX = len(ciphertext.alphabet)
+    key = periodic_key(primer, len(ciphertext))
+    p = variant_beaufort_decrypt_module(ciphertext.data.astype(np.int64), key, MAX)
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 def variant_beaufort_decrypt_module(char: int, modifier: int, alphabetlen: int) -> int:
@@ -47,15 +56,10 @@ def beaufort_encrypt(
     Plain Beaufort C=K-P
     Note: this is the same as beaufort_decrypt() !!
     """
-    output: Sequence = Sequence(alphabet=plaintext.alphabet)
-    for i in range(0, len(plaintext)):
-        # output.append((primer[i % len(primer)] - plaintext[i]) % len(output.alphabet))
-        output.append(
-            beaufort_encrypt_module(
-                plaintext[i], primer[i % len(primer)], len(output.alphabet)
-            )
-        )
-    return output
+    MAX = len(plaintext.alphabet)
+    key = periodic_key(primer, len(plaintext))
+    c = beaufort_encrypt_module(plaintext.data.astype(np.int64), key, MAX)
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def beaufort_encrypt_module(char: int, modifier: int, alphabetlen: int) -> int:
@@ -69,15 +73,10 @@ def beaufort_decrypt(
     Plain Beaufort P=K-P
     Note: this is the same as beaufort_encrypt() !!
     """
-    output: Sequence = Sequence(alphabet=ciphertext.alphabet)
-    for i in range(0, len(ciphertext)):
-        # output.append((primer[i % len(primer)] - ciphertext[i]) % len(output.alphabet))
-        output.append(
-            beaufort_decrypt_module(
-                ciphertext[i], primer[i % len(primer)], len(output.alphabet)
-            )
-        )
-    return output
+    MAX = len(ciphertext.alphabet)
+    key = periodic_key(primer, len(ciphertext))
+    p = beaufort_decrypt_module(ciphertext.data.astype(np.int64), key, MAX)
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 def beaufort_decrypt_module(char: int, modifier: int, alphabetlen: int) -> int:
@@ -87,12 +86,10 @@ def beaufort_decrypt_module(char: int, modifier: int, alphabetlen: int) -> int:
 def vigenere_encrypt(
     plaintext: Sequence, primer: Sequence, trace: bool = False
 ) -> Sequence:
-    output: Sequence = Sequence(alphabet=plaintext.alphabet)
-    print(output)
-    print(repr(output))
-    for i in range(0, len(plaintext)):
-        output.append((plaintext[i] + primer[i % len(primer)]) % len(output.alphabet))
-    return output
+    MAX = len(plaintext.alphabet)
+    key = periodic_key(primer, len(plaintext))
+    c = (plaintext.data.astype(np.int64) + key) % MAX
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def vigenere_encrypt_module(char: int, modifier: int, alphabetlen: int) -> int:
@@ -105,10 +102,10 @@ def vigenere_encrypt_module(char: int, modifier: int, alphabetlen: int) -> int:
 def vigenere_decrypt(
     ciphertext: Sequence, primer: Sequence, trace: bool = False
 ) -> Sequence:
-    output: Sequence = Sequence(alphabet=ciphertext.alphabet)
-    for i in range(0, len(ciphertext)):
-        output.append((ciphertext[i] - primer[i % len(primer)]) % len(output.alphabet))
-    return output
+    MAX = len(ciphertext.alphabet)
+    key = periodic_key(primer, len(ciphertext))
+    p = (ciphertext.data.astype(np.int64) - key) % MAX
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 def vigenere_encrypt_module(char: int, modifier: int, alphabetlen: int) -> int:
@@ -154,20 +151,18 @@ def vigenere_encrypt_with_alphabet(
 ) -> Sequence:
     """
     Vigenere with custom alphabet. Also known as the Quagmire I
+    Row r of the tabula recta is the alphabet shifted by r, so the lookup is
+    an addition of positions in the mixed alphabet
     """
-    output: Sequence = Sequence()
     if not alphabet:
-        alphabet = list(range(0, len(plaintext.alphabet) + 1))
-    tr: list[list[int]] = construct_tabula_recta(alphabet)
-    abc = list(alphabet)
-
-    for i in range(0, len(plaintext)):
-        row_index = abc.index(primer[i % len(primer)])
-        row = tr[row_index]
-        column_index = abc.index(plaintext[i])
-        output.append(tr[row_index][column_index])
+        alphabet = list(range(0, len(plaintext.alphabet)))
+    abc = np.array(list(alphabet), dtype=np.int64)
+    position = np.zeros(len(plaintext.alphabet), dtype=np.int64)
+    position[abc] = np.arange(0, len(abc))
+    key = periodic_key(primer, len(plaintext))
 
-    return output
+    c = abc[(position[key] + position[plaintext.data]) % len(abc)]
+    return Sequence.from_buffer(c, plaintext.alphabet)
 
 
 def vigenere_decrypt_with_alphabet(
@@ -179,23 +174,20 @@ def vigenere_decrypt_with_alphabet(
     """
     Plain Vigenere C=P+K
     """
-    output: Sequence = Sequence()
     if not alphabet:
-        alphabet = list(range(0, len(ciphertext.alphabet) + 1))
-    tr: list[list[int]] = construct_tabula_recta(alphabet)
-
-    for i in range(0, len(ciphertext)):
-        row_index = alphabet.index(primer[i % len(primer)])
-        row = tr[row_index]
-        column_index = row.index(ciphertext[i])
-        output.append(alphabet[column_index])
+        alphabet = list(range(0, len(ciphertext.alphabet)))
+    abc = np.array(list(alphabet), dtype=np.int64)
+    position = np.zeros(len(ciphertext.alphabet), dtype=np.int64)
+    position[abc] = np.arange(0, len(abc))
+    key = periodic_key(primer, len(ciphertext))
 
-    return output
+    p = abc[(position[ciphertext.data] - position[key]) % len(abc)]
+    return Sequence.from_buffer(p, ciphertext.alphabet)
 
 
 # assume fixed length key. find period
 def detect_vigenere(
-    ciphertext: list[int],
+    ciphertext: Sequence,
     minkeysize: int = 1,
     maxkeysize: int = 20,
     trace: bool = False,
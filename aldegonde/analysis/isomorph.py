@@ -6,14 +6,36 @@
     length 3: AAA | AAB ABA ABB | ABC (5)
     length 4: AAAA | AAAB AABA AABB ABAA ABAB ABBA ABBB |
               AABC AACB ABAC ABBC ABCA ABCB ABCC ABCA ABCB ABCC | ABCD
+
+    As integers an isomorph is its signature: for every element the distance
+    back to the previous occurrence of the same symbol inside the window, or
+    0 if there is none. ATTACK is 0 0 1 3 0 0. Two windows are isomorphs when
+    their signatures are equal, whatever the size of the alphabet.
+    The signature of a window is read from the distance to the previous
+    occurrence in the whole text, so all windows share one array.
 """
+from functools import partial
 import itertools
-import random
-import statistics
-from typing import Dict
+import math
+from typing import Optional
+
+import numpy as np
 
 from ..structures import sequence
 from ..math import factor
+from ..stats import montecarlo, significance
+
+
+def letter(index: int) -> str:
+    """
+    Letter of the index-th distinct symbol of an isomorph: A-Z, a-z and
+    further unicode characters beyond that
+    """
+    if index < 26:
+        return chr(ord("A") + index)
+    if index < 52:
+        return chr(ord("a") + index - 26)
+    return chr(0x100 + index - 52)
 
 
 def isomorph(ciphertext: sequence.Sequence) -> str:
@@ -21,65 +43,227 @@ def isomorph(ciphertext: sequence.Sequence) -> str:
     Input is a piece of ciphertext as a list of int
     Output is this normalized as an isomorph, as a string for easy comparison in alphabet A-Z
     Example ATTACK and EFFECT both normalize to ABBACD
-    TODO: raise exception when we go beyond Z
     """
     output: str = ""
-    letter: str = "A"
     mapping: dict[int, str] = {}
     for rune in ciphertext:
         if rune not in mapping:
-            mapping[rune] = letter
-            letter = chr(ord(letter) + 1)
+            mapping[rune] = letter(len(mapping))
         output = output + mapping[rune]
     return output
 
 
+def previous_distance(data: np.ndarray) -> np.ndarray:
+    """
+    For every position the distance back to the previous occurrence of the
+    same symbol, 0 for the first occurrence
+    """
+    data = np.asarray(data)
+    order = np.argsort(data, kind="stable")
+    same = data[order[1:]] == data[order[:-1]]
+    distance = np.zeros(len(data), dtype=np.int64)
+    distance[order[1:][same]] = (order[1:] - order[:-1])[same]
+    return distance
+
+
+def signatures(data: np.ndarray, length: int) -> np.ndarray:
+    """
+    Signature of every window of this length, as array of windows x length
+    """
+    distance = previous_distance(data)
+    windows = max(len(distance) - length + 1, 0)
+    if windows == 0:
+        return np.zeros((0, length), dtype=np.int64)
+    output = np.lib.stride_tricks.sliding_window_view(distance, length)[:windows].copy()
+    # distances that reach back before the start of the window are new symbols
+    output[output > np.arange(0, length)] = 0
+    return output
+
+
+class IsomorphIndex:
+    """
+    All repeated isomorphs of a text, for every length up to `maximum`.
+
+    The windows of length L+1 are the windows of length L extended by one
+    element, so the groups of isomorphic windows are refined one length at
+    a time. Windows that are unique at some length stay unique and are
+    dropped, only repeated windows are carried to the next length.
+
+    Example:
+        >>> index = IsomorphIndex(np.array([0, 1, 1, 0, 2, 3, 3, 2]))
+        >>> index.repeated(4)
+        {'ABBA': [0, 4]}
+    """
+
+    def __init__(self, data: np.ndarray, maximum: Optional[int] = None) -> None:
+        self.data = np.asarray(data)
+        N = len(self.data)
+        self.length: int = N
+        self.distance = previous_distance(self.data)
+        if maximum is None:
+            maximum = N
+        # groups[L]: positions of repeated windows, grouped by isomorph in
+        # order of position, and the start of every group in positions
+        self.groups: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+
+        positions = np.arange(0, N, dtype=np.int64)
+        group = np.zeros(N, dtype=np.int64)
+        for length in range(1, maximum + 1):
+            if length > 1:
+                keep = positions + length - 1 < N
+                positions, group = positions[keep], group[keep]
+                element = self.distance[positions + length - 1]
+                element[element >= length] = 0
+                order = np.lexsort((element, group))
+                positions, group, element = positions[order], group[order], element[order]
+                changes = (np.diff(group) != 0) | (np.diff(element) != 0)
+                group = np.concatenate(([0], np.cumsum(changes))).astype(np.int64)
+            repeated = np.bincount(group)[group] > 1 if len(group) else group > 0
+            positions, group = positions[repeated], group[repeated]
+            if len(positions) == 0:
+                break
+            group = np.concatenate(([0], np.cumsum(np.diff(group) != 0))).astype(np.int64)
+            starts = np.flatnonzero(np.diff(group, prepend=-1))
+            self.groups[length] = (positions, starts)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def occurrences(self, length: int) -> list[np.ndarray]:
+        """
+        Start positions of every isomorph of this length that occurs more
+        than once, in order of first occurrence
+        """
+        if length not in self.groups:
+            return []
+        positions, starts = self.groups[length]
+        found = np.split(positions, starts[1:])
+        return sorted(found, key=lambda p: int(p[0]))
+
+    def repeated(self, length: int) -> dict[str, list[int]]:
+        """
+        The isomorphs of this length that occur more than once, with their
+        positions
+        """
+        return {
+            isomorph(self.data[p[0] : p[0] + length].tolist()): p.tolist()
+            for p in self.occurrences(length)
+        }
+
+    def repeated_isomorphs(self, minimum: int = 1) -> dict[str, list[int]]:
+        """
+        All repeated isomorphs of at least `minimum` elements
+        """
+        output: dict[str, list[int]] = {}
+        for length in range(minimum, max(self.groups, default=0) + 1):
+            output.update(self.repeated(length))
+        return output
+
+    def duplicates(self, length: int) -> int:
+        """
+        Number of windows whose isomorph occurs more than once
+        """
+        if length not in self.groups:
+            return 0
+        return len(self.groups[length][0])
+
+    def distinct(self, length: int) -> int:
+        """
+        Number of different isomorphs of this length
+        """
+        windows = max(self.length - length + 1, 0)
+        if length not in self.groups:
+            return windows
+        positions, starts = self.groups[length]
+        return windows - len(positions) + len(starts)
+
+
 def all_isomorphs(ciphertext: sequence.Sequence, length: int) -> dict[str, list[int]]:
     """
     Return all isomorphs of a particular length from a sequence
     """
-    isos: dict[
-        str, list[int]
-    ] = {}  # normalized isomorph as key, list of positions as value
-    isos = {}
-
-    for pos in range(0, len(ciphertext) - length):
-        iso = isomorph(ciphertext[pos : pos + length])
-        if iso in isos:
-            isos[iso].append(pos)
-        else:
-            isos[iso] = [pos]
+    data = ciphertext.data if isinstance(ciphertext, sequence.Sequence) else np.asarray(ciphertext)
+    windows = signatures(data, length)
+    if len(windows) == 0:
+        return {}
+    _, first, inverse = np.unique(windows, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.cumsum(np.bincount(inverse))[:-1]
+    groups = np.split(order, bounds)
+    # normalized isomorph as key, list of positions as value, in order of
+    # first occurrence
+    isos: dict[str, list[int]] = {}
+    for g in np.argsort(first, kind="stable"):
+        isos[isomorph(data[groups[g][0] : groups[g][0] + length].tolist())] = groups[g].tolist()
     return isos
 
 
-def random_isomorph_statistics(
-    sequencelength: int, isomorphlength: int, samples: int = 20, trace: bool = False
-) -> tuple[float, float, float, float]:
+# isomorph lengths of a null model run
+NULL_MAXLENGTH: int = 64
+
+
+def isomorph_counts(data: np.ndarray, maxlength: int = NULL_MAXLENGTH) -> np.ndarray:
     """
-    Returns the mean and stdev of distinct isomorphs and mean and stdev of duplicate isomorphs
+    Number of distinct isomorphs for lengths 1..maxlength, followed by the
+    number of duplicate isomorphs for the same lengths
     """
-    distincts: Dict[int, list[int]] = {}
-    duplicates: Dict[int, list[int]] = {}
+    index = IsomorphIndex(data, maximum=maxlength)
+    lengths = range(1, maxlength + 1)
+    return np.array(
+        [index.distinct(n) for n in lengths] + [index.duplicates(n) for n in lengths]
+    )
 
-    for _ in range(0, samples):
-        # create random samples
-        rand: list[int] = [random.randrange(0, 29) for _ in range(sequencelength)]
-        isos = all_isomorphs(rand, isomorphlength)
-        distinct: int = len(isos.keys())
-        duplicate: int = sum([len(x) for x in isos.values() if len(x)>1])
 
-        if isomorphlength in distincts:
-            distincts[isomorphlength].append(distinct)
-            duplicates[isomorphlength].append(duplicate)
-        else:
-            distincts[isomorphlength] = [distinct]
-            duplicates[isomorphlength] = [duplicate]
+def random_isomorph_baseline(
+    sequencelength: int,
+    alphabetsize: int = 29,
+    samples: int = 20,
+    model: str = "uniform",
+    maxlength: int = NULL_MAXLENGTH,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> tuple[montecarlo.Summary, montecarlo.Summary]:
+    """
+    Distinct and duplicate isomorphs of random text for every length in one
+    Monte Carlo run, position n-1 holds length n
+    """
+    values = montecarlo.sample(
+        partial(isomorph_counts, maxlength=maxlength),
+        sequencelength,
+        alphabetsize,
+        samples,
+        model=model,
+        seed=seed,
+        workers=workers,
+    )
+    return (
+        montecarlo.summarize(values[:, :maxlength]),
+        montecarlo.summarize(values[:, maxlength:]),
+    )
 
-    meandistinct = statistics.mean(distincts[isomorphlength])
-    stdevdistinct = statistics.stdev(distincts[isomorphlength])
-    meanduplicate = statistics.mean(duplicates[isomorphlength])
-    stdevduplicate = statistics.stdev(duplicates[isomorphlength])
-    return (meandistinct, stdevdistinct, meanduplicate, stdevduplicate)
+
+def random_isomorph_statistics(
+    sequencelength: int,
+    isomorphlength: int,
+    samples: int = 20,
+    trace: bool = False,
+    seed: Optional[int] = None,
+    alphabetsize: int = 29,
+) -> tuple[float, float, float, float]:
+    """
+    Returns the mean and stdev of distinct isomorphs and mean and stdev of duplicate isomorphs
+    """
+    distinct, duplicate = random_isomorph_baseline(
+        sequencelength, alphabetsize, samples, maxlength=isomorphlength, seed=seed
+    )
+    n = isomorphlength - 1
+    return (
+        float(distinct.mean[n]),
+        math.sqrt(distinct.variance[n]),
+        float(duplicate.mean[n]),
+        math.sqrt(duplicate.variance[n]),
+    )
 
 
 def print_isomorph_statistics(seq: sequence.Sequence, trace: bool = False) -> None:
@@ -91,22 +275,26 @@ def print_isomorph_statistics(seq: sequence.Sequence, trace: bool = False) -> No
     """
     startlength = 4
     endlength = 40
-    isos: dict[str, list[int]]  # normalized isomorph as key, list of positions as value
+    index = IsomorphIndex(seq.data, maximum=endlength)
 
     for length in range(startlength, endlength + 1):
-        isos = all_isomorphs(seq, length)
-        # print(isos.keys())
-        distinct: int = len(isos.keys())
-        duplicates: int = sum([len(x) for x in isos.values() if len(x)>1])
+        distinct: int = index.distinct(length)
+        duplicates: int = index.duplicates(length)
 
         if duplicates<100 or trace is True:
-            for key, values in isos.items():
+            for key, values in index.repeated(length).items():
                 for v in itertools.combinations(values, 2):
                     print(f"{key} loc={v[1]}-{v[0]} diff={abs(v[1]-v[0])} factors={factor.prime_factors(abs(v[1]-v[0]))}")
 
-        (avgdistinct, stdevdistinct, avgduplicate, stdevduplicate) = random_isomorph_statistics(
-            sequencelength=len(seq), isomorphlength=length
+        # cached, the null model only depends on the text length
+        avgdistinct, vardistinct = significance.expected(
+            "isomorphs_distinct", len(seq), len(seq.alphabet), length
+        )
+        avgduplicate, varduplicate = significance.expected(
+            "isomorphs_duplicate", len(seq), len(seq.alphabet), length
         )
+        stdevdistinct = math.sqrt(vardistinct)
+        stdevduplicate = math.sqrt(varduplicate)
 
         if duplicates == 0:
             print(f"no duplicate isomorphs found of length {length}")
@@ -131,4 +319,85 @@ def print_isomorph_statistics(seq: sequence.Sequence, trace: bool = False) -> No
             print(f"duplicate: {duplicates:4d} (avg: {avgduplicate:7.2f})")
 
 
+class InvertedIndex:
+    """
+    Isomorph lookup across many sequences, like LP sections, LP words or
+    words of a dictionary. Every window of `length` elements is filed under
+    its signature. A query looks up the signature of its first `length`
+    elements and checks the rest of the pattern on those candidates only.
+    Matches can overlap and can lie anywhere inside a sequence.
+
+    Example:
+        >>> words = InvertedIndex(lp.units("words"))
+        >>> words.find(english_to_runes("EFFECT"), whole=True)
+    """
 
+    def __init__(self, sequences: list, length: int = 4) -> None:
+        if length < 1 or pow(length, length) >= 1 << 63:
+            raise ValueError(f"can't index windows of length {length}")
+        self.window = length
+        parts = [np.asarray(s.data if isinstance(s, sequence.Sequence) else s) for s in sequences]
+        lengths = [len(p) for p in parts]
+        self.offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.data = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        N = len(self.data)
+        # sequence of every element, and the start and end of that sequence
+        self.owner = np.repeat(np.arange(0, len(parts)), lengths)
+        self.start = self.offsets[:-1][self.owner]
+        self.end = self.offsets[1:][self.owner]
+        # previous occurrences in another sequence don't count
+        self.distance = previous_distance(self.data)
+        self.distance[self.distance > np.arange(0, N) - self.start] = 0
+
+        positions = np.flatnonzero(np.arange(0, N) + length <= self.end)
+        codes = self.code(self.elements(positions, length))
+        order = np.argsort(codes, kind="stable")
+        self.keys = codes[order]
+        self.positions = positions[order]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def elements(self, positions: np.ndarray, length: int) -> np.ndarray:
+        """
+        Signatures of the windows of `length` at these positions
+        """
+        output = self.distance[positions[:, np.newaxis] + np.arange(0, length)]
+        output[output > np.arange(0, length)] = 0
+        return output
+
+    def code(self, signatures: np.ndarray) -> np.ndarray:
+        """
+        Signatures of `window` elements as integers in base `window`
+        """
+        return signatures.astype(np.int64) @ pow(self.window, np.arange(self.window - 1, -1, -1))
+
+    def find(self, pattern, whole: bool = False) -> list[tuple[int, int]]:
+        """
+        All windows isomorphic to the pattern, as (sequence, position in the
+        sequence). The pattern is any list of symbols, a Sequence or a string,
+        like "ABBA". With `whole` only sequences that match as a whole count.
+        """
+        if isinstance(pattern, sequence.Sequence):
+            pattern = pattern.data
+        elif isinstance(pattern, str):
+            pattern = list(pattern)
+        Q = len(pattern)
+        if Q == 0:
+            return []
+        signature = signatures(np.asarray(pattern), Q)[0]
+        if Q >= self.window:
+            code = int(self.code(signature[np.newaxis, : self.window])[0])
+            lo, hi = np.searchsorted(self.keys, [code, code + 1])
+            candidates = np.sort(self.positions[lo:hi])
+        else:
+            candidates = np.arange(0, len(self.data))
+        candidates = candidates[candidates + Q <= self.end[candidates]]
+        if whole:
+            candidates = candidates[
+                (candidates == self.start[candidates]) & (candidates + Q == self.end[candidates])
+            ]
+        match = (self.elements(candidates, Q) == signature).all(axis=1)
+        found = candidates[match]
+        owner = self.owner[found]
+        return list(zip(owner.tolist(), (found - self.start[found]).tolist()))
@@ -1,6 +1,62 @@
+"""
+The `Kappa` test: overlay the text with itself shifted by k positions and
+count the positions with the same rune. For a periodic polyalphabetic cipher
+the shifts that are a multiple of the period have as many coincidences as
+the plaintext.
+
+The coincidences of all shifts are the autocorrelation of the text. Every
+rune is a 0/1 indicator sequence, its autocorrelation follows from the FFT,
+and the sum over the alphabet counts the coincidences of every shift at
+once, in O(M N log N) instead of O(N^2).
+"""
+
+import numpy as np
+
 from ..structures import sequence
 
 
+def coincidence_spectrum(runes: sequence.Sequence) -> np.ndarray:
+    """
+    Number of positions i with runes[i] == runes[i+k], for every shift k
+    in 0..N-1. Shift 0 is N, shift k are the doublets at skip k.
+    """
+    data = runes.data
+    N = len(data)
+    if N == 0:
+        return np.zeros(0, dtype=np.int64)
+    # zero padded to at least 2N so the correlation doesn't wrap around
+    size = 1 << (2 * N - 1).bit_length()
+    power = np.zeros(size // 2 + 1)
+    for symbol in np.unique(data):
+        spectrum = np.fft.rfft(data == symbol, size)
+        power += spectrum.real**2 + spectrum.imag**2
+    return np.rint(np.fft.irfft(power, size)[:N]).astype(np.int64)
+
+
+def kappa_spectrum(runes: sequence.Sequence) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Coincidences and normalized kappa, coincidences / (N-k) * M, for every
+    shift k in 0..N-1
+    """
+    coincidences = coincidence_spectrum(runes)
+    overlap = len(coincidences) - np.arange(0, len(coincidences))
+    kappa = coincidences / overlap * len(runes.alphabet)
+    return coincidences, kappa
+
+
+def kappa_peaks(
+    kappa: np.ndarray, threshold: float = 1.3, minimum: int = 1, maximum: int = 0
+) -> np.ndarray:
+    """
+    Shifts in minimum..maximum-1 with normalized kappa above the threshold,
+    maximum=0 means up to half the length
+    """
+    if maximum == 0:
+        maximum = len(kappa) // 2
+    shifts = np.arange(minimum, min(maximum, len(kappa)))
+    return shifts[kappa[shifts] > threshold]
+
+
 def print_kappa(
     ciphertext: sequence.Sequence,
     minimum: int = 1,
@@ -12,18 +68,11 @@ def print_kappa(
     The `Kappa` test. Overlay the ciphertext with itself shifted by a number of positions, then count the
     positions with the same character.
     """
-    MAX = len(ciphertext.alphabet)
-    if maximum == 0:
-        maximum = int(len(ciphertext) / 2)
-    elif maximum > len(ciphertext):
+    if maximum > len(ciphertext):
         maximum = len(ciphertext)
-    for keylen in range(minimum, maximum):
-        counter = 0
-        dups = 0
-        for i in range(0, len(ciphertext) - keylen):
-            counter = counter + 1
-            if ciphertext[i] == ciphertext[i + keylen]:
-                dups = dups + 1
-        if (dups / counter * MAX) > threshold or trace is True:
-            print(f"keylen={keylen:02d}, dups={dups:02d}, ioc={dups/counter*MAX:.3f} ")
+    coincidences, kappa = kappa_spectrum(ciphertext)
+    if trace is True:
+        threshold = -np.inf
+    for keylen in kappa_peaks(kappa, threshold, minimum, maximum):
+        print(f"keylen={keylen:02d}, dups={coincidences[keylen]:02d}, ioc={kappa[keylen]:.3f} ")
     print()
@@ -7,10 +7,11 @@ def split_by_slice(inp: sequence.Sequence, size: int) -> dict[int, sequence.Sequ
     This will return every N'th element
     For size 3, it will return a dictionary of lists with elements:
        [0, 3, 6, 9] [1, 4, 7, 10] [2, 5, 8]
+    The slices are views on the input, call copy() on them to modify
     """
-    outp = {}
+    outp: dict[int, sequence.Sequence] = {}
     for i in range(0, size):
-        outp[i] = inp[slice(i, len(inp), size)].copy()
+        outp[i] = sequence.SequenceView(inp, offset=i, stride=size)
     return outp
 
 
@@ -36,7 +37,7 @@ def split_by_doublet(ciphertext: sequence.Sequence) -> list[sequence.Sequence]:
     for i in range(0, len(ciphertext)):
         if ciphertext[i] == ciphertext[i - 1]:
             output.append(current)
-            current = sequence.Sequence(data=[i], alphabet=ciphertext.alphabet)
+            current = sequence.Sequence(data=[ciphertext[i]], alphabet=ciphertext.alphabet)
         else:
             current.append(ciphertext[i])
     output.append(current)
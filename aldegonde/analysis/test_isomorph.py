@@ -0,0 +1,47 @@
+import numpy as np
+
+from ..structures import alphabet, sequence
+from ..structures.cicada3301 import english_to_runes
+from .isomorph import InvertedIndex, IsomorphIndex, all_isomorphs, isomorph, signatures
+
+
+def test_isomorph():
+    attack = sequence.Sequence("ATTACK", alphabet=alphabet.UPPERCASE_ALPHABET)
+    effect = sequence.Sequence("EFFECT", alphabet=alphabet.UPPERCASE_ALPHABET)
+    assert isomorph(attack) == isomorph(effect) == "ABBACD"
+    assert signatures(attack.data, 6).tolist() == [[0, 0, 1, 3, 0, 0]]
+    # no cap on the number of distinct symbols
+    assert len(set(isomorph(list(range(0, 60))))) == 60
+
+
+def test_isomorph_index():
+    data = np.array([0, 1, 1, 0, 2, 3, 4, 4, 3, 5, 6, 6, 5])
+    index = IsomorphIndex(data)
+    assert index.repeated(4)["ABBA"] == [0, 5, 9]
+    assert index.repeated(6) == {"ABBACD": [0, 5], "ABCDDC": [3, 7]}
+    assert index.repeated(7) == {}
+    assert len(index.repeated_isomorphs(5)) == 6
+    for length in range(1, len(data) + 1):
+        isos = all_isomorphs(data, length)
+        assert index.distinct(length) == len(isos)
+        assert index.duplicates(length) == sum(len(p) for p in isos.values() if len(p) > 1)
+
+
+def test_inverted_index():
+    texts = [
+        sequence.Sequence("ATTACKATDAWN", alphabet=alphabet.UPPERCASE_ALPHABET),
+        sequence.Sequence("EFFECT", alphabet=alphabet.UPPERCASE_ALPHABET),
+        sequence.Sequence("BOOBOO", alphabet=alphabet.UPPERCASE_ALPHABET),
+    ]
+    index = InvertedIndex(texts, length=3)
+    assert len(index) == 3
+    assert index.find("ABBACD") == [(0, 0), (1, 0)]
+    assert index.find("ABBACD", whole=True) == [(1, 0)]
+    # overlapping, and shorter than the indexed windows
+    assert index.find("ABBA") == [(0, 0), (1, 0), (2, 0)]
+    assert index.find("AA") == [(0, 1), (1, 1), (2, 1), (2, 4)]
+    # a previous occurrence in another sequence is no repeat
+    assert index.find("ABC") == [(0, p) for p in range(2, 10)] + [(1, 2), (1, 3)]
+    # K and C are the same rune
+    assert index.find(english_to_runes("ATTACK")) == []
+    assert index.find(english_to_runes("EFFECT")) == [(0, 0), (1, 0)]
@@ -3,7 +3,7 @@ import numpy as np
 from ..structures import sequence, alphabet
 from ..stats import repeats
 
-from .kappa import print_kappa
+from .kappa import coincidence_spectrum, kappa_peaks, kappa_spectrum, print_kappa
 
 """
 """
@@ -14,3 +14,17 @@ EXAMPLE = "CVJTNAFENMCDMKBXFSTKLHGSOJWHOFUISFYFBEXEINFIMAYSSDYYIJNPWTOKFRHWVWTZF
 def test_kappa():
     ciphertext = sequence.Sequence(EXAMPLE, alphabet=alphabet.UPPERCASE_ALPHABET)
     print_kappa(ciphertext)
+
+
+def test_kappa_spectrum():
+    ciphertext = sequence.Sequence(EXAMPLE, alphabet=alphabet.UPPERCASE_ALPHABET)
+    data = ciphertext.data
+    N = len(data)
+    coincidences, kappa = kappa_spectrum(ciphertext)
+    assert coincidences[0] == N
+    for k in range(1, N):
+        assert coincidences[k] == np.count_nonzero(data[:-k] == data[k:])
+    assert kappa[7] == coincidences[7] / (N - 7) * 26
+    peaks = kappa_peaks(kappa, threshold=1.5)
+    assert (kappa[peaks] > 1.5).all() and len(peaks) > 0
+    assert len(coincidence_spectrum(ciphertext[:0])) == 0
@@ -0,0 +1,35 @@
+from ..structures import sequence, alphabet
+
+from .words import (
+    first_rune_of_words,
+    last_rune_of_words,
+    nth_rune_of_words,
+    runes_before_words_of_length,
+    word_lengths,
+    words_with_doublets,
+)
+
+TEXT = "A GOOD TREE IS KNOWN BY ITS FRUIT"
+
+
+def test_word_streams():
+    runes = sequence.Sequence(TEXT, alphabet=alphabet.UPPERCASE_ALPHABET)
+    assert word_lengths(runes).tolist() == [1, 4, 4, 2, 5, 2, 3, 5]
+    assert str(first_rune_of_words(runes)) == "AGTIKBIF"
+    assert str(last_rune_of_words(runes)) == "ADESNYST"
+    assert str(nth_rune_of_words(runes, 3)) == "DEWI"
+    assert words_with_doublets(runes).tolist() == [1, 2]
+    assert str(first_rune_of_words(runes[2:11])) == "OTI"
+
+
+def test_doublets_at_word_end():
+    # EE ends a word, E-E across the boundary doesn't count, LL ends the text
+    runes = sequence.Sequence("SEE EAT ALL", alphabet=alphabet.UPPERCASE_ALPHABET)
+    assert words_with_doublets(runes).tolist() == [0, 2]
+
+
+def test_runes_before_single_rune_words():
+    runes = sequence.Sequence("THE X IS A Y", alphabet=alphabet.UPPERCASE_ALPHABET)
+    before, current = runes_before_words_of_length(runes, 1)
+    assert before.tolist() == [4, 18, 0]
+    assert current.tolist() == [23, 0, 24]
@@ -0,0 +1,100 @@
+"""Streams derived from the word structure of a Sequence.
+
+All of these work on the `boundaries` of a Sequence, so they take single
+gathers over the whole text. `unit` selects the offset table, by default
+"words", but "lines", "pages", ... work the same where they are available.
+"""
+
+import numpy as np
+
+from ..structures import sequence
+
+
+def unit_offsets(runes: sequence.Sequence, unit: str = "words") -> np.ndarray:
+    """
+    Offset table of this unit, unit i covers runes[offsets[i]:offsets[i+1]]
+    """
+    try:
+        return runes.boundaries[unit]
+    except KeyError:
+        raise ValueError(f"Sequence has no {unit} boundaries")
+
+
+def word_lengths(runes: sequence.Sequence, unit: str = "words") -> np.ndarray:
+    """
+    Length of every word
+    """
+    return np.diff(unit_offsets(runes, unit))
+
+
+def nth_rune_of_words(
+    runes: sequence.Sequence, n: int, unit: str = "words"
+) -> sequence.Sequence:
+    """
+    The n'th rune of every word that is long enough. Negative n counts from
+    the end of the word, n=-1 is the last rune
+    """
+    offsets = unit_offsets(runes, unit)
+    starts, ends = offsets[:-1], offsets[1:]
+    if n >= 0:
+        positions = starts + n
+        positions = positions[positions < ends]
+    else:
+        positions = ends + n
+        positions = positions[positions >= starts]
+    return sequence.Sequence.wrap(runes.data[positions], runes.alphabet)
+
+
+def first_rune_of_words(
+    runes: sequence.Sequence, unit: str = "words"
+) -> sequence.Sequence:
+    """
+    The first rune of every word
+    """
+    return nth_rune_of_words(runes, 0, unit)
+
+
+def last_rune_of_words(
+    runes: sequence.Sequence, unit: str = "words"
+) -> sequence.Sequence:
+    """
+    The last rune of every word
+    """
+    return nth_rune_of_words(runes, -1, unit)
+
+
+def words_with_doublets(runes: sequence.Sequence, unit: str = "words") -> np.ndarray:
+    """
+    Indices of all words that contain a doublet, a rune followed by the same
+    rune. Doublets across a word boundary don't count.
+    """
+    offsets = unit_offsets(runes, unit)
+    data = runes.data
+    doublets = np.flatnonzero(data[:-1] == data[1:])
+    words = np.searchsorted(offsets, doublets, side="right") - 1
+    # the second rune of the doublet has to be in the same word
+    inside = doublets + 1 < offsets[words + 1]
+    return np.unique(words[inside])
+
+
+def words_of_length(
+    runes: sequence.Sequence, length: int, unit: str = "words"
+) -> np.ndarray:
+    """
+    Indices of all words with this many runes
+    """
+    return np.flatnonzero(word_lengths(runes, unit) == length)
+
+
+def runes_before_words_of_length(
+    runes: sequence.Sequence, length: int = 1, unit: str = "words"
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    For every word with this many runes, except at the very start, the rune
+    before it and its first rune. With length=1 this gives the pairs of
+    rune before a one-rune word and the one-rune word itself.
+    """
+    offsets = unit_offsets(runes, unit)
+    starts = offsets[words_of_length(runes, length, unit)]
+    starts = starts[starts > 0]
+    return runes.data[starts - 1], runes.data[starts]
@@ -1,11 +1,59 @@
-from collections import Counter, defaultdict
-from typing import Dict
+"""
+Bigram diagrams.
 
+bigram_tensor() counts the pairs of runes `skip` positions apart for all
+skips 1..K at once, as a dense tensor of skip x first rune x second rune.
+Printing, plotting and statistics take their tables from that tensor.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from ..stats.ngrams import ngram_codes
 from ..structures import sequence
 
 from .color import colors
 
 
+def bigram_tensor(runes: sequence.Sequence, maxskip: int = 1, cut: int = 0) -> np.ndarray:
+    """
+    Count of every pair of runes `skip` positions apart, for skip 1..maxskip,
+    as array of maxskip x M x M: tensor[skip-1][a][b] counts rune a followed
+    by rune b `skip` positions later. Skip 1 are the bigrams.
+
+    Specify `cut=0` and it operates on sliding pairs: AB, BC, CD, DE
+    Specify `cut=1` and it operates on non-overlapping pairs: AB, CD, EF
+    Specify `cut=2` and it operates on non-overlapping pairs: BC, DE, FG
+    """
+    if cut not in (0, 1, 2):
+        raise Exception("`cut` variable can be 0, 1 or 2")
+    M = len(runes.alphabet)
+    size = M * M
+    codes = np.concatenate(
+        [
+            ngram_codes(runes, 2, cut=cut, gap=skip) + (skip - 1) * size
+            for skip in range(1, maxskip + 1)
+        ]
+    )
+    return np.bincount(codes, minlength=maxskip * size).reshape(maxskip, M, M)
+
+
+def partial_ioc(counts: np.ndarray) -> np.ndarray:
+    """
+    Share of every rune in the normalized IoC, along the last axis of
+    counts: M * c(c-1) / (N(N-1)). The sum is the normalized IoC.
+    Takes rune frequencies, or the marginals of a bigram tensor.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    M = counts.shape[-1]
+    N = counts.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # runes that don't occur give 0, not -0
+        pioc = M * counts * np.maximum(counts - 1, 0) / (N * (N - 1))
+    return np.where(N < 2, 0.0, pioc)
+
+
 def print_bigram_diagram(runes: sequence.Sequence) -> None:
     """
     Input is a list of integers, from 0 to MAX-1
@@ -15,16 +63,10 @@ def print_bigram_diagram(runes: sequence.Sequence) -> None:
         return
     MAX = len(runes.alphabet)
 
-    count = Counter(runes)
+    pioc = partial_ioc(np.bincount(runes.data, minlength=MAX))
     ioc: float = 0.0
-    res = Counter(
-        f"{runes[idx]:02d}-{runes[idx + 1]:02d}" for idx in range(len(runes) - 1)
-    )
-
-    bigram: Dict = defaultdict(dict)
-    for k in res.keys():
-        x, y = k.split("-")
-        bigram[int(y)][int(x)] = res[k]
+    # row is the second rune of the bigram, column the first
+    bigram = bigram_tensor(runes)[0].T.tolist()
 
     print("   | ", end="")
     for i in range(0, MAX):
@@ -40,11 +82,7 @@ def print_bigram_diagram(runes: sequence.Sequence) -> None:
     for i in range(0, MAX):
         print(f"{i:02} | ", end="")
         for j in range(0, MAX):
-            # for j in sorted(bigram[i]):
-            try:
-                v = bigram[i][j]
-            except KeyError:
-                v = 0
+            v = bigram[i][j]
             if v == 0:
                 print(colors.bgRed, end="")
             elif v < 5:
@@ -57,13 +95,8 @@ def print_bigram_diagram(runes: sequence.Sequence) -> None:
             print(colors.reset, end=" ")
 
         # partial IOC (one rune), and total IOC
-        pioc = (
-            (count[int(i)] * (count[int(i)] - 1))
-            / (len(runes) * (len(runes) - 1))
-            * MAX
-        )
-        ioc += pioc
-        print(f"| {pioc:.3f} | {MAX*pioc:.3f}")
+        ioc += pioc[i]
+        print(f"| {pioc[i]:.3f} | {MAX*pioc[i]:.3f}")
 
     print("---+-", end="")
     for i in range(0, MAX):
@@ -87,39 +120,12 @@ def bigram_diagram(runes: sequence.Sequence, cut: int = 0) -> list[list[int]]:
     """
     if len(runes) < 2:
         return []
-    MAX = len(runes.alphabet)
 
-    count = Counter(runes)
-    ioc: float = 0.0
-    if cut == 0:
-        res = Counter(
-            f"{runes[idx]:02d}-{runes[idx + 1]:02d}" for idx in range(0, len(runes) - 1)
-        )
-    elif cut == 1:
-        res = Counter(
-            f"{runes[idx]:02d}-{runes[idx + 1]:02d}"
-            for idx in range(0, len(runes) - 1, 2)
-        )
-    elif cut == 2:
-        res = Counter(
-            f"{runes[idx]:02d}-{runes[idx + 1]:02d}"
-            for idx in range(1, len(runes) - 1, 2)
-        )
-    else:
+    if cut not in (0, 1, 2):
         raise Exception("`cut` variable can be 0, 1 or 2")
 
-    bigram: Dict = defaultdict(dict)
-    for k in res.keys():
-        x, y = k.split("-")
-        bigram[int(y)][int(x)] = res[k]
-
-    output: list[list[int]] = [([0] * MAX) for i in range(MAX)]
-    for x in range(0, MAX):
-        for y in range(0, MAX):
-            try:
-                output[x][y] = bigram[x][y]
-            except KeyError:
-                pass
+    # row is the second rune of the bigram, column the first
+    output: list[list[int]] = bigram_tensor(runes, cut=cut)[0].T.tolist()
 
     return output
 
@@ -132,16 +138,10 @@ def bigram_diagram_skip(runes: sequence.Sequence, skip: int = 1) -> None:
     if len(runes) < 2:
         return
     MAX = len(runes.alphabet)
-    count = Counter(runes)
+    pioc = partial_ioc(np.bincount(runes.data, minlength=MAX))
     ioc = 0.0
-    res = Counter(
-        f"{runes[idx]:02d}-{runes[idx + skip]:02d}" for idx in range(len(runes) - skip)
-    )
-    bigram: Dict = defaultdict(dict)
-
-    for k in res.keys():
-        x, y = k.split("-")
-        bigram[int(x)][int(y)] = res[k]
+    # row is the first rune, column the rune `skip` positions later
+    bigram = bigram_tensor(runes, skip)[skip - 1].tolist()
 
     print(
         "   | 00 01 02 03 04 05 06 07 08 09 10 11 12 13 14 15 16 17 18 19 20 21 22 23 24 25 26 27 28 | IOC"
@@ -155,11 +155,7 @@ def bigram_diagram_skip(runes: sequence.Sequence, skip: int = 1) -> None:
         print(f"{i:02} | ", end="")
         j: int
         for j in range(0, MAX):
-            # for j in sorted(bigram[i]):
-            try:
-                v = bigram[i][j]
-            except KeyError:
-                v = 0
+            v = bigram[i][j]
             if v == 0:
                 print(colors.bgRed, end="")
             elif v < 5:
@@ -168,13 +164,8 @@ def bigram_diagram_skip(runes: sequence.Sequence, skip: int = 1) -> None:
             print(colors.reset, end=" ")
 
         # partial IOC (one rune), and total IOC
-        pioc = (
-            (count[int(i)] * (count[int(i)] - 1))
-            / (len(runes) * (len(runes) - 1))
-            * MAX
-        )
-        ioc += pioc
-        print(f"| {pioc:.3f}")
+        ioc += pioc[i]
+        print(f"| {pioc[i]:.3f}")
 
     print(
         "--------------------------------------------------------------------------------------------+----"
@@ -185,3 +176,35 @@ def bigram_diagram_skip(runes: sequence.Sequence, skip: int = 1) -> None:
         )
     )
     print("\n")
+
+
+def plot_bigram_diagram(
+    table: np.ndarray,
+    alphabet: list,
+    title: str = "Bigram Plot",
+    ax: Optional[object] = None,
+    fontsize: Optional[float] = None,
+) -> None:
+    """
+    plot a bigram table with matplotlib, row i is table[i]. Pass
+    bigram_tensor(runes)[0].T for the layout of bigram_diagram(), row is
+    the second rune, column the first. The runes label the bottom and right.
+    """
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        _, ax = plt.subplots()
+    ax.set_title(title)
+    ax.matshow(table, cmap=plt.cm.Blues)
+    ticks = range(0, len(alphabet))
+    sx = ax.secondary_xaxis("bottom")
+    sy = ax.secondary_yaxis("right")
+    ax.set_xticks(ticks)
+    ax.set_yticks(ticks)
+    sx.set_xticks(ticks)
+    sy.set_yticks(ticks)
+    sx.set_xticklabels(alphabet)
+    sy.set_yticklabels(alphabet)
+    for i in ticks:
+        for j in ticks:
+            ax.text(j, i, str(table[i][j]), va="center", ha="center", fontsize=fontsize)
@@ -0,0 +1,44 @@
+"""
+test bigram_diagram
+"""
+
+import numpy as np
+import pytest
+
+from ..stats.ioc import normalized_ioc
+from ..stats.ngrams import ngram_table
+from ..structures import alphabet, sequence
+from .bigram_diagram import bigram_diagram, bigram_tensor, partial_ioc, print_bigram_diagram
+
+text = sequence.Sequence(
+    "NOTIFYQUARTERMASTERTHEQUICKBROWNFOXJUMPSOVERTHELAZYDOG",
+    alphabet=alphabet.UPPERCASE_ALPHABET,
+)
+
+
+def test_bigram_tensor():
+    tensor = bigram_tensor(text, maxskip=4)
+    assert tensor.shape == (4, 26, 26)
+    for skip in range(1, 5):
+        assert (tensor[skip - 1] == ngram_table(text, 2, gap=skip)).all()
+        assert tensor[skip - 1].sum() == len(text) - skip
+    for cut in (0, 1, 2):
+        assert (bigram_tensor(text, cut=cut)[0] == ngram_table(text, 2, cut=cut)).all()
+        assert bigram_diagram(text, cut=cut) == bigram_tensor(text, cut=cut)[0].T.tolist()
+
+
+def test_partial_ioc():
+    frequencies = np.bincount(text.data, minlength=26)
+    assert partial_ioc(frequencies).sum() == pytest.approx(normalized_ioc(text))
+    # the first runes of the pairs of every skip
+    marginals = partial_ioc(bigram_tensor(text, maxskip=3).sum(axis=2))
+    assert marginals.shape == (3, 26)
+    assert marginals[2].sum() == pytest.approx(normalized_ioc(text[:-3]))
+
+
+def test_absent_runes(capsys):
+    sparse = sequence.Sequence("ABBAABAB", alphabet=alphabet.UPPERCASE_ALPHABET)
+    pioc = partial_ioc(np.bincount(sparse.data, minlength=26))
+    assert not np.signbit(pioc).any()
+    print_bigram_diagram(sparse)
+    assert "-0.000" not in capsys.readouterr().out
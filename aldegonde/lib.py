@@ -1,5 +1,13 @@
 from collections import Counter
 
+import numpy as np
+
+from .algorithm.autokey import AUTOKEY_ALGORITHMS, autokey_decrypt_batch
+from .stats.batch import BATCH_ELEMENTS, batch_ioc
+from .stats.ioc import normalized_ioc
+from .structures.keyspace import keyspace
+from .structures.sequence import Sequence
+
 # There are 29 runes. Generally counted 0-28
 MAX = 29
 
@@ -68,20 +76,16 @@ def run_test2a(ciphertext):
 
 
 # assume fixed length key. find period
-def run_test3(ciphertext: list[int], trace: bool = False):
+def run_test3(ciphertext: Sequence, trace: bool = False):
     print("testing for fixed size periodicity")
+    data = ciphertext.data
+    N = len(data)
     for period in range(1, 30):
-        group: dict[int, list[int]] = {}
-        for i in range(period):
-            group[i] = []
-
-        for i in range(0, len(ciphertext)):
-            group[i % period].append(ciphertext[i])
-
-        iocsum = 0.0
-        for k in group.keys():
-            iocsum += float(normalized_ioc(group[k]))
-            # print("ioc of runes {}/{} = {}".format(k, period, ioc(group[k])))
+        # group i % period as the rows of one ragged batch
+        residue = np.arange(0, N) % period
+        order = np.argsort(residue, kind="stable")
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(residue, minlength=period))))
+        iocsum = float(batch_ioc(data[order], len(ciphertext.alphabet), offsets).sum())
 
         if trace is True or iocsum / period > 1.0:
             print(f"avgioc period {period} = {iocsum/period:.2f}")
@@ -206,7 +210,7 @@ def ignore():
 
 
 def bruteforce_autokey(
-    ciphertext: list[int],
+    ciphertext: Sequence,
     minkeylength: int = 1,
     maxkeylength: int = 1,
     iocthreshold: float = 1.2,
@@ -214,22 +218,21 @@ def bruteforce_autokey(
 ) -> None:
     """
     bruteforce vigenere autokey and variants
+    keys are enumerated in chunks, every chunk is decrypted and scored as
+    one batch per algorithm, hits are printed by key, then by algorithm
     """
-    algs = {
-        "ciphertext_vigenere": ciphertext_autokey_vigenere_decrypt,
-        "ciphertext_beaufort": ciphertext_autokey_beaufort_decrypt,
-        "ciphertext_minuend": ciphertext_autokey_minuend_decrypt,
-        "plaintext_vigenere": plaintext_autokey_vigenere_decrypt,
-        "plaintext_beaufort": plaintext_autokey_beaufort_decrypt,
-        "plaintext_minuend": plaintext_autokey_minuend_decrypt,
-    }
+    MAX = len(ciphertext.alphabet)
+    algorithms = list(AUTOKEY_ALGORITHMS.keys())
+    # the batches of all algorithms together stay within BATCH_ELEMENTS
+    chunksize = max(1, BATCH_ELEMENTS // (max(len(ciphertext), 1) * len(algorithms)))
     for keylength in range(minkeylength, maxkeylength + 1):
-        for key in RuneIterator(keylength):
-            for a in algs.keys():
-                p = algs[a](ciphertext, key)
-                ic = normalized_ioc(p)
-                if ic > iocthreshold or trace:
-                    print(f"key {key}: {ic}: ")
-                    english_output(p, limit=30)
+        for chunk in keyspace(keylength, MAX).chunks(chunksize=chunksize):
+            plains = [autokey_decrypt_batch(ciphertext, chunk, a) for a in algorithms]
+            iocs = np.array([batch_ioc(plain, MAX) for plain in plains])
+            hits = np.ones_like(iocs, dtype=bool) if trace else iocs > iocthreshold
+            for i, j in np.argwhere(hits.T):
+                p = Sequence.from_buffer(plains[j][i], ciphertext.alphabet)
+                print(f"{algorithms[j]} key {chunk[i].tolist()}: {iocs[j, i]}: ")
+                print(str(p[0:30]))
 
     return
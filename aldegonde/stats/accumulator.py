@@ -0,0 +1,243 @@
+"""
+Streaming statistics that merge.
+
+An Accumulator holds the counts of one contiguous stretch of text: rune
+frequencies, n-gram counts for every cut, doublets and triplets. Text is
+added chunk by chunk, and two accumulators of adjacent stretches merge into
+the accumulator of both. Each keeps its first and last `maxlength` runes,
+at least 2 for the triplets, so the n-grams that straddle the seam are
+counted when merging.
+
+Merging is associative but not commutative: the left accumulator has to
+be the stretch of text that comes first. Workers can each accumulate a
+shard of a corpus, and the partial accumulators are then reduced in order:
+
+    >>> parts = [Accumulator(29).update(shard) for shard in shards]
+    >>> total = combine(parts)
+    >>> total.ioc(2)
+"""
+
+from functools import reduce
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from ..structures import sequence
+from .entropy import entropy_from_counts
+from .ioc import ioc_from_counts
+from .ngrams import count_codes
+from .profile import Profile
+
+Chunk = Union[sequence.Sequence, np.ndarray, list[int]]
+
+
+def merge_counts(
+    a: tuple[np.ndarray, np.ndarray], b: tuple[np.ndarray, np.ndarray]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sum of two tables of (codes, counts), codes in order
+    """
+    if len(a[0]) == 0:
+        return b
+    if len(b[0]) == 0:
+        return a
+    codes, inverse = np.unique(np.concatenate((a[0], b[0])), return_inverse=True)
+    counts = np.bincount(
+        inverse.reshape(-1), weights=np.concatenate((a[1], b[1])), minlength=len(codes)
+    )
+    return codes, counts.astype(np.int64)
+
+
+def empty_counts() -> tuple[np.ndarray, np.ndarray]:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+
+class Accumulator:
+    """
+    Counts over a stretch of text, for n-grams up to `maxlength` runes.
+
+    counts[length][r] are the (codes, counts) of the n-grams of this length
+    that start at a position p with p % length == r, so both the sliding
+    n-grams (all r) and every cut (a single r) are available.
+    """
+
+    def __init__(self, alphabetsize: int, maxlength: int = 5) -> None:
+        if maxlength < 1:
+            raise ValueError("maxlength must be at least 1")
+        self.alphabetsize = alphabetsize
+        self.maxlength = maxlength
+        # runes kept at each edge, a triplet spans 3
+        self.edge = max(maxlength, 2)
+        self.length: int = 0
+        self.head = np.empty(0, dtype=np.int64)
+        self.tail = np.empty(0, dtype=np.int64)
+        self.counts: dict[int, list[tuple[np.ndarray, np.ndarray]]] = {
+            n: [empty_counts() for r in range(0, n)] for n in range(1, maxlength + 1)
+        }
+        self.doublets: dict[int, int] = {k: 0 for k in range(1, maxlength + 1)}
+        self.triplets: int = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __add__(self, other: "Accumulator") -> "Accumulator":
+        return self.merge(other)
+
+    def update(self, chunk: Chunk) -> "Accumulator":
+        """
+        Add the next chunk of text, in place. Returns the accumulator itself
+        """
+        merged = self.merge(self.of(chunk))
+        self.__dict__.update(merged.__dict__)
+        return self
+
+    def of(self, chunk: Chunk) -> "Accumulator":
+        """
+        New accumulator, with the same settings, of a single chunk
+        """
+        if isinstance(chunk, sequence.Sequence):
+            data = chunk.data.astype(np.int64)
+        else:
+            data = np.asarray(chunk, dtype=np.int64)
+        result = self.counted(data, 0)
+        result.length = len(data)
+        result.head = data[: self.edge].copy()
+        result.tail = data[-self.edge :].copy() if len(data) else data.copy()
+        return result
+
+    def counted(
+        self, data: np.ndarray, offset: int, split: Optional[int] = None
+    ) -> "Accumulator":
+        """
+        Accumulator with only the counts of `data`, where data[0] is at
+        position `offset` in the text. With `split` only what crosses the
+        split is counted: n-grams and pairs with elements on both sides.
+        """
+        M = self.alphabetsize
+        N = len(data)
+        result = Accumulator(M, self.maxlength)
+
+        def starts(span: int) -> tuple[int, int]:
+            # range of start positions of items spanning `span` elements
+            if split is None:
+                return 0, N - span + 1
+            return max(0, split - span + 1), min(split, N - span + 1)
+
+        codes = data
+        for n in range(1, self.maxlength + 1):
+            if n > 1:
+                codes = codes[:-1] * M + data[n - 1 :]
+            lo, hi = starts(n)
+            for s in range(lo, min(lo + n, hi)):
+                r = (offset + s) % n
+                result.counts[n][r] = count_codes(codes[s:hi:n], pow(M, n))
+        for k in range(1, self.maxlength + 1):
+            lo, hi = starts(k + 1)
+            if hi > lo:
+                result.doublets[k] = int(
+                    np.count_nonzero(data[lo:hi] == data[lo + k : hi + k])
+                )
+        lo, hi = starts(3)
+        if hi > lo:
+            triples = (data[lo:hi] == data[lo + 1 : hi + 1]) & (
+                data[lo:hi] == data[lo + 2 : hi + 2]
+            )
+            result.triplets = int(np.count_nonzero(triples))
+        return result
+
+    def merge(self, other: "Accumulator") -> "Accumulator":
+        """
+        Accumulator of the text of self followed by the text of other
+        """
+        if (other.alphabetsize, other.maxlength) != (self.alphabetsize, self.maxlength):
+            raise ValueError("can't merge accumulators with different settings")
+        # the n-grams that start in self.tail and end in other.head
+        joined = np.concatenate((self.tail, other.head))
+        seam = self.counted(joined, self.length - len(self.tail), len(self.tail))
+
+        result = Accumulator(self.alphabetsize, self.maxlength)
+        result.length = self.length + other.length
+        result.head = np.concatenate((self.head, other.head))[: self.edge]
+        result.tail = np.concatenate((self.tail, other.tail))[-self.edge :]
+        for n in range(1, self.maxlength + 1):
+            for r in range(0, n):
+                shifted = other.counts[n][(r - self.length) % n]
+                result.counts[n][r] = merge_counts(
+                    merge_counts(self.counts[n][r], shifted), seam.counts[n][r]
+                )
+        for k in range(1, self.maxlength + 1):
+            result.doublets[k] = self.doublets[k] + other.doublets[k] + seam.doublets[k]
+        result.triplets = self.triplets + other.triplets + seam.triplets
+        return result
+
+    def ngram_counts(self, length: int, cut: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The distinct n-grams as integer codes and how often each occurs,
+        for the sliding n-grams (cut=0) or a single cut
+        """
+        if cut == 0:
+            return reduce(merge_counts, self.counts[length])
+        return self.counts[length][cut - 1]
+
+    def frequencies(self) -> np.ndarray:
+        """
+        Count of every rune
+        """
+        codes, counts = self.counts[1][0]
+        output = np.zeros(self.alphabetsize, dtype=np.int64)
+        output[codes] = counts
+        return output
+
+    def ioc(self, length: int = 1, cut: int = 0) -> tuple[float, float]:
+        """
+        Normalized IoC and sigmage, like ioc_general
+        """
+        _, counts = self.ngram_counts(length, cut)
+        return ioc_from_counts(counts, pow(self.alphabetsize, length))
+
+    def entropy(self, length: int = 1) -> float:
+        """
+        Entropy of the sliding n-grams in bits
+        """
+        return entropy_from_counts(self.ngram_counts(length)[1])
+
+    def repeats(self, length: int) -> int:
+        """
+        Number of distinct n-grams of this length that occur more than once
+        """
+        return int(np.count_nonzero(self.ngram_counts(length)[1] > 1))
+
+    def profile(self, alphabet: list) -> Profile:
+        """
+        The accumulated statistics as a Profile, the same as profile() of
+        the whole text
+        """
+        result = Profile(
+            length=self.length, alphabet=alphabet, frequencies=self.frequencies()
+        )
+        for n in range(1, self.maxlength + 1):
+            for cut in range(0, n + 1):
+                result.ioc[(n, cut)] = self.ioc(n, cut)
+            result.entropy[n] = self.entropy(n)
+        result.doublets = dict(self.doublets)
+        result.triplets = self.triplets
+        return result
+
+
+def combine(parts: Iterable[Accumulator]) -> Accumulator:
+    """
+    Merge accumulators of consecutive stretches of text, in order
+    """
+    return reduce(Accumulator.merge, parts)
+
+
+def accumulate(
+    chunks: Iterable[Chunk], alphabetsize: int, maxlength: int = 5
+) -> Accumulator:
+    """
+    Accumulate a text that comes in chunks, like a file read piece by piece
+    """
+    result = Accumulator(alphabetsize, maxlength)
+    for chunk in chunks:
+        result.update(chunk)
+    return result
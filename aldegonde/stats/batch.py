@@ -0,0 +1,147 @@
+"""
+Scores for a batch of candidate texts at once.
+
+A batch is either a 2-D array with one candidate per row, or a flat array
+with an offset table, like the boundaries of a Sequence: row i is
+batch[offsets[i]:offsets[i+1]]. Rows then can have different lengths.
+
+The counts of all rows come from a single bincount over row * M + rune,
+after which IoC, chi and fitness are a few array operations for the whole
+batch. This is the inner loop of keyspace searches: decrypt a chunk of keys
+into a batch, score it, keep the rows over a threshold.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from ..structures import sequence
+from .ngrams import ngram_table
+
+# number of elements in a batch, searches size their batches to this
+BATCH_ELEMENTS: int = 1 << 22
+
+
+def rows_of(
+    batch: np.ndarray, offsets: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Flat elements of the batch, the row of every element and the number
+    of rows
+    """
+    if offsets is None:
+        batch = np.atleast_2d(batch)
+        rows, length = batch.shape
+        return batch.reshape(-1), np.repeat(np.arange(0, rows), length), rows
+    offsets = np.asarray(offsets, dtype=np.int64)
+    rows = len(offsets) - 1
+    return batch[offsets[0] : offsets[-1]], np.repeat(np.arange(0, rows), np.diff(offsets)), rows
+
+
+def batch_counts(
+    batch: np.ndarray, alphabetsize: int, offsets: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Count of every rune in every row, as array of rows x alphabetsize
+    """
+    flat, row, rows = rows_of(batch, offsets)
+    counts = np.bincount(
+        row * alphabetsize + flat.astype(np.int64), minlength=rows * alphabetsize
+    )
+    return counts.reshape(rows, alphabetsize)
+
+
+def batch_ioc(
+    batch: np.ndarray, alphabetsize: int, offsets: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Normalized IoC of every row, like normalized_ioc()
+    """
+    counts = batch_counts(batch, alphabetsize, offsets)
+    N = counts.sum(axis=1)
+    pairs = (counts * (counts - 1)).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ic = alphabetsize * pairs / (N * (N - 1))
+    return np.where(N < 2, 0.0, ic)
+
+
+def batch_chi(
+    batch: np.ndarray,
+    reference: np.ndarray,
+    offsets: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    chi() of every row against a reference: the chance that a rune from the
+    row and a rune from the reference are the same. `reference` holds the
+    count or frequency of every rune of the reference text.
+    """
+    reference = np.asarray(reference, dtype=np.float64)
+    counts = batch_counts(batch, len(reference), offsets)
+    N = counts.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        chi = counts @ reference / (N * reference.sum())
+    return np.where(N == 0, 0.0, chi)
+
+
+def fitness_table(
+    reference: sequence.Sequence, length: int = 4, floor: float = 0.01
+) -> np.ndarray:
+    """
+    Log probability of every n-gram in a reference text, as table with one
+    axis per position. N-grams that don't occur count as `floor` occurrences.
+    """
+    counts = ngram_table(reference, length).astype(np.float64)
+    counts[counts == 0] = floor
+    return np.log(counts / counts.sum())
+
+
+def batch_ngrams(
+    batch: np.ndarray,
+    alphabetsize: int,
+    length: int,
+    offsets: Optional[np.ndarray] = None,
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    The sliding n-grams of every row as integer codes, like ngram_codes(),
+    the row of every n-gram and the number of rows. N-grams don't cross rows.
+    """
+    flat, row, rows = rows_of(batch, offsets)
+    flat = flat.astype(np.int64)
+    codes = np.zeros(max(len(flat) - length + 1, 0), dtype=np.int64)
+    for j in range(0, length):
+        codes = codes * alphabetsize + flat[j : j + len(codes)]
+    # only n-grams that start and end in the same row
+    valid = row[: len(codes)] == row[length - 1 :]
+    return codes[valid], row[: len(codes)][valid], rows
+
+
+def batch_ngram_counts(
+    batch: np.ndarray,
+    alphabetsize: int,
+    length: int = 1,
+    offsets: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Count of every n-gram in every row, as array of rows x alphabetsize^length
+    """
+    size = pow(alphabetsize, length)
+    codes, row, rows = batch_ngrams(batch, alphabetsize, length, offsets)
+    counts = np.bincount(row * size + codes, minlength=rows * size)
+    return counts.reshape(rows, size)
+
+
+def batch_fitness(
+    batch: np.ndarray,
+    table: np.ndarray,
+    offsets: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Average log probability of the n-grams of every row, with n-gram
+    probabilities from fitness_table(). N-grams don't cross rows.
+    Higher is more like the reference.
+    """
+    codes, row, rows = batch_ngrams(batch, table.shape[0], table.ndim, offsets)
+    scores = np.bincount(row, weights=table.reshape(-1)[codes], minlength=rows)
+    number = np.bincount(row, minlength=rows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(number == 0, -np.inf, scores / number)
@@ -1,5 +1,7 @@
 from collections import Counter
 
+import numpy as np
+
 from ..structures import sequence
 
 
@@ -7,15 +9,22 @@ def print_dist(runes: sequence.Sequence) -> None:
     """
     print frequency distribution
     """
-    N = len(runes)
+    freqs = np.bincount(runes.data, minlength=len(runes.alphabet))
+    print_frequencies(freqs, runes.alphabet)
+
+
+def print_frequencies(freqs: np.ndarray, alphabet) -> None:
+    """
+    print frequency distribution from the count of every rune
+    """
+    N = int(freqs.sum())
     col = 0
-    freqs = Counter(runes)
     print("frequency distribution:")
-    for rune in range(0, len(runes.alphabet)):
+    for rune in range(0, len(alphabet)):
         if col > 0 and col % 5 == 0:
             print("")
         print(
-            f"{rune:02d}: {runes.alphabet[rune]}: {freqs[rune]:03d}: {freqs[rune]/N*100:.3f}% | ",
+            f"{rune:02d}: {alphabet[rune]}: {freqs[rune]:03d}: {freqs[rune]/N*100:.3f}% | ",
             end="",
         )
         col = col + 1
@@ -3,25 +3,29 @@ Code to analyse doublets, triplets, etc
 """
 
 import math
+from typing import Optional
 
-from scipy.stats import poisson
+import numpy as np
 
+from ..analysis.kappa import coincidence_spectrum
 from ..structures import sequence
+from . import significance
 
 
-def print_doublets_statistics(runes: sequence.Sequence, skip: int = 1) -> None:
+def print_doublets_statistics(
+    runes: sequence.Sequence, skip: int = 1, spectrum: Optional[np.ndarray] = None
+) -> None:
     """
-    find the number of doublets. doublet is X followed by X for any X
+    find the number of doublets. doublet is X followed by X for any X.
+    The count is read from the coincidence spectrum, pass `spectrum` to
+    reuse one for several skips.
     """
     MAX: int = len(runes.alphabet)
     N: int = len(runes)
-    dbls: list[int] = []
-    for index in range(0, N - skip):
-        if runes[index] == runes[index + skip]:
-            dbls.append(index)
-    l: int = len(dbls)
-    mu = N / MAX
-    mean, var = poisson.stats(mu, loc=0, moments="mv")
+    if spectrum is None:
+        spectrum = coincidence_spectrum(runes)
+    l: int = int(spectrum[skip]) if skip < N else 0
+    mean, var = significance.expected("doublets", N, MAX, skip)
     sigmage: float = abs(l - mean) / math.sqrt(var)
     print(f"doublets={l} (skip={skip}) expected={mean:.2f} S={sigmage:.2f}σ")
 
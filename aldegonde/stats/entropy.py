@@ -1,41 +1,143 @@
-from collections import Counter
+"""
+Entropy of n-grams.
+
+The block entropy H_n is the entropy of the n-grams of a text. The
+conditional entropy h_n = H_n - H_(n-1) is the uncertainty of a rune given
+the n-1 runes before it, and both h_n and H_n / n estimate the entropy rate
+of the source. Natural language has a falling curve, random text and good
+polyalphabetic ciphertext stay flat at log2(M) until the n-grams run out.
+
+Block entropies of all lengths come from the integer n-gram codes of ngrams,
+each length built from the one below. For a batch of texts, like candidate
+decryptions, all rows are counted at once as in batch.py.
+"""
+
+from dataclasses import dataclass
 import math
+from typing import Optional
+
+import numpy as np
 
 from ..structures import sequence
+from .batch import rows_of
+from .ngrams import count_codes, ngram_frequencies
+
+
+@dataclass
+class EntropyCurve:
+    """
+    Entropies of a text for n-gram lengths 1..maxlength, position n-1 holds
+    the value for n-grams of length n: block H_n, conditional h_n and the
+    rate H_n / n
+    """
+
+    block: np.ndarray
+    conditional: np.ndarray
+    rate: np.ndarray
+
+
+def entropy_from_counts(counts: np.ndarray, base: int = 2) -> float:
+    """
+    Shannon entropy of a table of counts, by default in bits
+    """
+    total = counts.sum()
+    if total == 0:
+        return 0.0
+    p = counts[counts > 0] / total
+    return float(-(p * np.log(p)).sum() / math.log(base))
 
 
 def shannon_entropy(ciphertext: sequence.Sequence, base: int = 2) -> float:
     """
     shannon entropy. by default in bits.
     """
-    f = Counter(ciphertext)
-    N = len(ciphertext)
-    H: float = 0.0
-    for k in f.keys():
-        H = H - f[k] / N * math.log(f[k] / N, base)
-    print(f"Shannon Entropy = {H:.3f} bits (size={N})")
-    return H
+    return entropy_from_counts(np.bincount(ciphertext.data), base)
 
 
 def shannon2_entropy(runes: sequence.Sequence, base: int = 2, cut: int = 0) -> float:
     """
-    shannon entropy. by default in bits.
+    shannon entropy of bigrams. by default in bits.
     """
-    N = len(runes)
-    if N < 3:
+    if len(runes) < 3:
         return 0.0
-    l: list = []
-    if cut == 0:
-        for i in range(0, N - 1):
-            l.append(f"{runes[i]}-{runes[i+1]}")
-    elif cut == 1 or cut == 2:
-        for i in range(cut - 1, N - 1, 2):
-            l.append(f"{runes[i]}-{runes[i+1]}")
-    else:
+    if not (cut == 0 or cut == 1 or cut == 2):
         raise Exception
-    f = Counter(l)
-    H: float = 0.0
-    for k in f.keys():
-        H = H - f[k] / N * math.log(f[k] / N, base)
-    print(f"S = {H:.3f} bits (size={N})")
-    return H
+    _, f = ngram_frequencies(runes, length=2, cut=cut)
+    return entropy_from_counts(f, base)
+
+
+def batch_block_entropies(
+    batch: np.ndarray,
+    alphabetsize: int,
+    maxlength: int = 5,
+    offsets: Optional[np.ndarray] = None,
+    sliding: bool = True,
+    base: int = 2,
+) -> np.ndarray:
+    """
+    Block entropy of every row for n-gram lengths 1..maxlength, as array of
+    rows x maxlength. N-grams don't cross rows. With `sliding` False only
+    the non-overlapping n-grams from the start of each row are counted.
+    Rows without n-grams of a length have entropy 0.
+    """
+    M = alphabetsize
+    if pow(M, maxlength) >= 1 << 63:
+        raise ValueError(f"{maxlength}-grams don't fit in 64 bits")
+    flat, row, rows = rows_of(batch, offsets)
+    flat = flat.astype(np.int64)
+    # position of every element within its row
+    firsts = np.searchsorted(row, np.arange(0, rows))
+    position = np.arange(0, len(flat)) - firsts[row] if len(flat) else row
+
+    output = np.zeros((rows, maxlength))
+    codes = flat
+    for n in range(1, maxlength + 1):
+        if n > 1:
+            codes = codes[:-1] * M + flat[n - 1 :]
+        C = pow(M, n)
+        valid = row[: len(codes)] == row[n - 1 :]
+        if not sliding:
+            valid &= position[: len(codes)] % n == 0
+        rowcodes = row[: len(codes)][valid]
+        if rows * C < 1 << 63:
+            keys, counts = count_codes(rowcodes * C + codes[valid], rows * C)
+            owner = keys // C
+        else:
+            (owner, _), counts = np.unique(
+                np.stack((rowcodes, codes[valid])), axis=1, return_counts=True
+            )
+        # H = log N - sum(c log c) / N for every row
+        total = np.bincount(owner, weights=counts, minlength=rows)
+        clogc = np.bincount(owner, weights=counts * np.log(counts), minlength=rows)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            H = (np.log(total) - clogc / total) / math.log(base)
+        output[:, n - 1] = np.where(total > 0, H, 0.0)
+    return output
+
+
+def conditional_entropies(block: np.ndarray) -> np.ndarray:
+    """
+    h_n = H_n - H_(n-1) along the last axis of block entropies, h_1 = H_1
+    """
+    return np.diff(block, axis=-1, prepend=0.0)
+
+
+def entropy_rates(block: np.ndarray) -> np.ndarray:
+    """
+    H_n / n along the last axis of block entropies
+    """
+    return block / np.arange(1, block.shape[-1] + 1)
+
+
+def entropy_curve(
+    runes: sequence.Sequence, maxlength: int = 5, sliding: bool = True, base: int = 2
+) -> EntropyCurve:
+    """
+    Block and conditional entropies and rate estimates of a Sequence
+    """
+    block = batch_block_entropies(
+        runes.data[np.newaxis, :], len(runes.alphabet), maxlength, sliding=sliding, base=base
+    )[0]
+    return EntropyCurve(
+        block=block, conditional=conditional_entropies(block), rate=entropy_rates(block)
+    )
@@ -1,3 +1,160 @@
 """
+Goodness of fit of texts against a reference language profile.
 https://en.wikipedia.org/wiki/G-test
+
+A reference is a table of n-gram probabilities with one axis per position,
+shape (M,) for monograms and (M, M) for bigrams, like fitness_table().
+The G statistic is 2 * sum O ln(O/E) and Pearson's chi^2 is
+sum (O-E)^2 / E, both over every n-gram with observed count O and expected
+count E. For a text drawn from the reference both follow a chi^2
+distribution with M^n - 1 degrees of freedom, which gives the p-value.
+A lower statistic is a better fit, so candidate plaintexts of a search can
+be ranked on G against English rather than on IoC alone.
 """
+
+from typing import Optional
+
+import numpy as np
+from scipy.stats import chi2
+
+from ..structures import sequence
+from ..structures.cicada3301 import CICADA_ENGLISH_ALIASES, CICADA_ENGLISH_ALPHABET
+from .batch import batch_ngram_counts
+from .ngrams import ngram_table
+
+# frequency of letters in English text, in percent
+ENGLISH_LETTERS: dict[str, float] = {
+    "A": 8.167,
+    "B": 1.492,
+    "C": 2.782,
+    "D": 4.253,
+    "E": 12.702,
+    "F": 2.228,
+    "G": 2.015,
+    "H": 6.094,
+    "I": 6.966,
+    "J": 0.153,
+    "K": 0.772,
+    "L": 4.025,
+    "M": 2.406,
+    "N": 6.749,
+    "O": 7.507,
+    "P": 1.929,
+    "Q": 0.095,
+    "R": 5.987,
+    "S": 6.327,
+    "T": 9.056,
+    "U": 2.758,
+    "V": 0.978,
+    "W": 2.360,
+    "X": 0.150,
+    "Y": 1.974,
+    "Z": 0.074,
+}
+
+# frequency of the bigrams that are written as a single rune, in percent of
+# all bigrams in English text. The rarer ones are left out.
+ENGLISH_DIGRAPHS: dict[str, float] = {
+    "TH": 3.56,
+    "IO": 0.83,
+    "NG": 0.95,
+    "EA": 0.69,
+}
+
+
+def english_reference(floor: float = 0.01) -> np.ndarray:
+    """
+    Approximate rune frequencies of English in the gematria primus, from
+    letter and digraph frequencies: every digraph rune takes its letters out
+    of the letter counts. Runes without an estimate get `floor` percent.
+    """
+    index = {e: i for i, e in enumerate(CICADA_ENGLISH_ALPHABET)}
+    percent = np.zeros(len(CICADA_ENGLISH_ALPHABET))
+    for letter, p in ENGLISH_LETTERS.items():
+        percent[index[CICADA_ENGLISH_ALIASES.get(letter, letter)]] += p
+    for digraph, p in ENGLISH_DIGRAPHS.items():
+        percent[index[CICADA_ENGLISH_ALIASES.get(digraph, digraph)]] += p
+        for letter in digraph:
+            percent[index[CICADA_ENGLISH_ALIASES.get(letter, letter)]] -= p
+    percent[percent <= 0] = floor
+    return percent / percent.sum()
+
+
+def uniform_reference(alphabetsize: int, length: int = 1) -> np.ndarray:
+    """
+    Every n-gram equally likely, like random text
+    """
+    return np.full((alphabetsize,) * length, 1.0 / pow(alphabetsize, length))
+
+
+def corpus_reference(
+    corpus: sequence.Sequence, length: int = 1, floor: float = 0.5
+) -> np.ndarray:
+    """
+    N-gram probabilities of a corpus. N-grams that don't occur count as
+    `floor` occurrences.
+    """
+    counts = ngram_table(corpus, length).astype(np.float64)
+    counts[counts == 0] = floor
+    return counts / counts.sum()
+
+
+def observed_expected(
+    batch: np.ndarray, reference: np.ndarray, offsets: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Observed and expected count of every n-gram in every row, as arrays of
+    rows x M^n
+    """
+    M = reference.shape[0]
+    observed = batch_ngram_counts(batch, M, reference.ndim, offsets)
+    p = reference.reshape(-1) / reference.sum()
+    expected = observed.sum(axis=1, keepdims=True) * p
+    return observed, expected
+
+
+def pvalues(statistic: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    return chi2.sf(statistic, np.count_nonzero(reference) - 1)
+
+
+def batch_gtest(
+    batch: np.ndarray, reference: np.ndarray, offsets: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    G statistic and p-value of every row against the reference
+    """
+    observed, expected = observed_expected(batch, reference, offsets)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(observed > 0, observed * np.log(observed / expected), 0.0)
+    G = 2 * terms.sum(axis=1)
+    return G, pvalues(G, reference)
+
+
+def batch_chisquare(
+    batch: np.ndarray, reference: np.ndarray, offsets: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson chi^2 statistic and p-value of every row against the reference
+    """
+    observed, expected = observed_expected(batch, reference, offsets)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(expected > 0, (observed - expected) ** 2 / expected, np.inf)
+    terms[(observed == 0) & (expected == 0)] = 0.0
+    X = terms.sum(axis=1)
+    return X, pvalues(X, reference)
+
+
+def gtest(runes: sequence.Sequence, reference: np.ndarray) -> tuple[float, float]:
+    """
+    G statistic and p-value of a Sequence against the reference
+    """
+    G, p = batch_gtest(runes.data[np.newaxis, :], reference)
+    return float(G[0]), float(p[0])
+
+
+def chisquare(runes: sequence.Sequence, reference: np.ndarray) -> tuple[float, float]:
+    """
+    Pearson chi^2 statistic and p-value of a Sequence against the reference
+    """
+    X, p = batch_chisquare(runes.data[np.newaxis, :], reference)
+    return float(X[0]), float(p[0])
@@ -1,3 +1,21 @@
+"""
+Hamming distance and coincidences between blocks of equal length.
+
+The coincidences of two blocks are the positions where they hold the same
+symbol, and the Hamming distance is the length minus the coincidences.
+Blocks enciphered with the same periodic key, aligned on the key, have as
+many coincidences as the plaintext, well above length / M for random blocks.
+
+For all pairs of a set of blocks every block is one-hot encoded: a 0/1 row
+with a column for every (position, symbol). The product of that matrix with
+its own transpose counts the positions where two blocks hold the same symbol,
+the coincidences of every pair in a single matrix product.
+"""
+
+from typing import Optional
+
+import numpy as np
+
 from ..structures import sequence
 
 
@@ -9,4 +27,61 @@ def hamming_distance(s1: sequence.Sequence, s2: sequence.Sequence) -> int:
     """
     if len(s1) != len(s2):
         raise ValueError("Undefined for sequences of unequal length.")
-    return sum(el1 != el2 for el1, el2 in zip(s1, s2))
+    return int(np.count_nonzero(s1.data != s2.data))
+
+
+def blocks(runes: sequence.Sequence, length: int, step: Optional[int] = None) -> np.ndarray:
+    """
+    Blocks of `length` runes as array of blocks x length, by default
+    consecutive, or one starting every `step` runes
+    """
+    if step is None:
+        step = length
+    data = runes.data
+    if len(data) < length:
+        return np.empty((0, length), dtype=data.dtype)
+    return np.lib.stride_tricks.sliding_window_view(data, length)[::step]
+
+
+def truncated(units: list[sequence.Sequence], length: int) -> np.ndarray:
+    """
+    The first `length` runes of every unit, like lines or pages, as array of
+    blocks x length. Units shorter than `length` are left out.
+    """
+    return np.array(
+        [u.data[:length] for u in units if len(u) >= length], dtype=np.int64
+    ).reshape(-1, length)
+
+
+def coincidence_matrix(data: np.ndarray, alphabetsize: int) -> np.ndarray:
+    """
+    Number of positions where block i and block j hold the same symbol,
+    for every pair of rows of data
+    """
+    data = np.atleast_2d(data)
+    rows, length = data.shape
+    onehot = np.zeros((rows, length * alphabetsize), dtype=np.float32)
+    columns = np.arange(0, length) * alphabetsize + data.astype(np.int64)
+    onehot[np.arange(0, rows)[:, np.newaxis], columns] = 1
+    # float32 counts exactly up to 2**24
+    return np.rint(onehot @ onehot.T).astype(np.int64)
+
+
+def hamming_matrix(data: np.ndarray, alphabetsize: int) -> np.ndarray:
+    """
+    Hamming distance between every pair of rows of data
+    """
+    data = np.atleast_2d(data)
+    return data.shape[1] - coincidence_matrix(data, alphabetsize)
+
+
+def matching_blocks(
+    coincidences: np.ndarray, minimum: int
+) -> list[tuple[int, int, int]]:
+    """
+    Pairs of different blocks (i, j, coincidences) with at least `minimum`
+    coincidences, most coincidences first
+    """
+    i, j = np.nonzero(np.triu(coincidences >= minimum, k=1))
+    order = np.argsort(-coincidences[i, j], kind="stable")
+    return [(int(a), int(b), int(coincidences[a, b])) for a, b in zip(i[order], j[order])]
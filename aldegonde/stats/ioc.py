@@ -1,22 +1,39 @@
-from collections import Counter
 from math import sqrt
 from typing import Tuple
 
+import numpy as np
+
 from ..structures import sequence
-from .ngrams import ngrams
+from .ngrams import ngram_frequencies
+from .window import sliding_window_statistics
 
 
 def print_ioc_statistics(runes: sequence.Sequence) -> None:
     """
     print IOC statistics
     """
+    from .profile import profile
+
+    p = profile(runes, maxlength=5)
     for length in range(1, 6):
         for cut in range(0, length + 1):
-            g = ioc_general(runes, length=length, cut=cut)
+            g = p.ioc[(length, cut)]
             print(f"ΔIC{length} (cut={cut}) = {g[0]:.3f} S={g[1]:.3f}σ ", end="|")
         print()
 
 
+def coincidence_rate(runes: sequence.Sequence, length: int, cut: int = 0) -> float:
+    """
+    Chance that two n-grams picked from the sequence are the same,
+    not normalized to alphabet size
+    """
+    _, counts = ngram_frequencies(runes, length=length, cut=cut)
+    L = int(counts.sum())
+    if L < 2:
+        return 0.0
+    return float((counts * (counts - 1)).sum()) / (L * (L - 1))
+
+
 def ioc(runes: sequence.Sequence) -> float:
     """
     Monographic Index of Coincidence: ΔIC
@@ -29,10 +46,8 @@ def ioc(runes: sequence.Sequence) -> float:
     N = len(runes)
     if N < 2:
         return 0.0
-    freqs = Counter(runes)
-    freqsum = 0.0
-    for rune in range(0, N):
-        freqsum += freqs[rune] * (freqs[rune] - 1)
+    freqs = np.bincount(runes.data).astype(np.int64)
+    freqsum = float((freqs * (freqs - 1)).sum())
     IC = freqsum / (N * (N - 1))
     return IC
 
@@ -59,24 +74,9 @@ def ioc2(runes: sequence.Sequence, cut: int = 0) -> float:
     N = len(runes)
     if N < 3:
         return 0.0
-    l: list = []
-    if cut == 0:
-        for i in range(0, N - 1):
-            l.append(f"{runes[i]}-{runes[i+1]}")
-    elif cut == 1 or cut == 2:
-        for i in range(cut - 1, N - 1, 2):
-            l.append(f"{runes[i]}-{runes[i+1]}")
-    else:
+    if not (cut == 0 or cut == 1 or cut == 2):
         raise Exception
-    freqs = Counter(l)
-    freqsum = 0.0
-    for r in freqs.keys():
-        freqsum += freqs[r] * (freqs[r] - 1)
-    try:
-        IC = freqsum / (len(l) * (len(l) - 1))
-    except ZeroDivisionError:
-        IC = 0.0
-    return IC
+    return coincidence_rate(runes, length=2, cut=cut)
 
 
 def normalized_ioc2(runes: sequence.Sequence, cut: int = 0) -> float:
@@ -99,23 +99,20 @@ def ioc_general(runes: sequence.Sequence, length: int, cut: int = 0) -> Tuple[fl
     Specify `cut=1` and it operates on non-overlapping blocks of 3 runes: ABC, DEF, ...
     Specify `cut=2` and it operates on non-overlapping blocks of 3 runes: BCD, EFG, ...
     """
-    C = pow(len(runes.alphabet), length)  # size of alphabet
+    _, counts = ngram_frequencies(runes, length=length, cut=cut)
+    return ioc_from_counts(counts, pow(len(runes.alphabet), length))
 
-    grams = ngrams(runes, length=length, cut=cut)
-    l: list[str] = []
-    for g in grams:
-        l.append("-".join([str(x) for x in g]))
 
-    # print(f"ioc general debug: {l}")
+def ioc_from_counts(counts: np.ndarray, C: int) -> Tuple[float, float]:
+    """
+    Normalized Index of Coincidence and sigmage from a table of counts,
+    for C possible items
+    """
     # L is the number of items we have counted
-    L = len(l)
+    L = int(counts.sum())
     if L < 2:
         return (0.0, 0.0)
-
-    freqs = Counter(l)
-    freqsum: float = 0.0
-    for r in freqs.keys():
-        freqsum += freqs[r] * (freqs[r] - 1)
+    freqsum = float((counts * (counts - 1)).sum())
 
     IC = C * freqsum / (L * (L - 1))
     sd = sqrt(2 * (C - 1)) / sqrt(L * (L - 1))
@@ -139,24 +136,9 @@ def ioc3(runes: sequence.Sequence, cut: int = 0) -> float:
     N = len(runes)
     if N < 4:
         return 0.0
-    l: list = []
-    if cut == 0:
-        for i in range(0, N - 2):
-            l.append(f"{runes[i]}-{runes[i+1]}-{runes[i+2]}")
-    elif cut == 1 or cut == 2 or cut == 3:
-        for i in range(cut - 1, N - 2, 3):
-            l.append(f"{runes[i]}-{runes[i+1]}-{runes[i+2]}")
-    else:
+    if not (cut == 0 or cut == 1 or cut == 2 or cut == 3):
         raise Exception
-    freqs = Counter(l)
-    freqsum = 0.0
-    for r in freqs.keys():
-        freqsum += freqs[r] * (freqs[r] - 1)
-    try:
-        IC = freqsum / (len(l) * (len(l) - 1))
-    except ZeroDivisionError:
-        IC = 0.0
-    return IC
+    return coincidence_rate(runes, length=3, cut=cut)
 
 
 def normalized_ioc3(runes: sequence.Sequence, cut: int = 0) -> float:
@@ -182,24 +164,9 @@ def ioc4(runes: sequence.Sequence, cut: int = 0) -> float:
     N = len(runes)
     if N < 6:
         return 0.0
-    l: list = []
-    if cut == 0:
-        for i in range(0, N - 3):
-            l.append(f"{runes[i]}-{runes[i+1]}-{runes[i+2]}-{runes[i+3]}")
-    elif cut == 1 or cut == 2 or cut == 3 or cut == 4:
-        for i in range(cut - 1, N - 3, 4):
-            l.append(f"{runes[i]}-{runes[i+1]}-{runes[i+2]}-{runes[i+3]}")
-    else:
+    if not (cut == 0 or cut == 1 or cut == 2 or cut == 3 or cut == 4):
         raise Exception
-    freqs = Counter(l)
-    freqsum = 0.0
-    for r in freqs.keys():
-        freqsum += freqs[r] * (freqs[r] - 1)
-    try:
-        IC = freqsum / (len(l) * (len(l) - 1))
-    except ZeroDivisionError:
-        IC = 0.0
-    return IC
+    return coincidence_rate(runes, length=4, cut=cut)
 
 
 def normalized_ioc4(runes: sequence.Sequence, cut: int = 0) -> float:
@@ -211,10 +178,8 @@ def normalized_ioc4(runes: sequence.Sequence, cut: int = 0) -> float:
 
 def sliding_window_ioc(runes: sequence.Sequence, window: int = 100) -> list[float]:
     """
-    calculate sliding window IOC of a large data set
+    calculate sliding window IOC of a large data set, normalized to
+    alphabet size, for every window position.
+    See window.sliding_window_statistics for several windows at once
     """
-    C = len(runes.alphabet)
-    output: list[float] = []
-    for i in range(0,len(runes)-window):
-        output.append(C*ioc(runes[i:i+window]))
-    return output
+    return sliding_window_statistics(runes, [window])[window].ioc.tolist()
@@ -0,0 +1,129 @@
+"""
+Monte Carlo estimates of statistics on surrogate texts.
+
+A run draws `samples` surrogates of N runes from a null model and computes
+a vector of statistics on every surrogate, like the isomorph counts of every
+length in one go. Surrogates are drawn in chunks of CHUNK, every chunk with
+its own seed spawned from the seed of the run, so the outcome doesn't depend
+on the number of workers. Large runs can fan the chunks out over a process
+pool, the statistic has to be a module level function or a functools.partial
+of one to get there.
+
+The pool is opt-in: pass `workers`, or set the environment variable
+ALDEGONDE_WORKERS. Under the spawn start method, the default on macOS and
+Windows, every worker imports the main module again, so a script that uses
+the pool has to keep its driver code under `if __name__ == "__main__":`.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+import math
+import os
+from typing import Callable, Optional
+
+import numpy as np
+from scipy.stats import norm
+
+from . import surrogates
+
+# surrogates per chunk, the unit of work of a worker
+CHUNK: int = 50
+
+# runs with fewer runes than this in all surrogates together stay in process
+PARALLEL_ELEMENTS: int = 1 << 21
+
+
+def uniform(N: int, samples: int, alphabetsize: int, seed: surrogates.Seed) -> np.ndarray:
+    return surrogates.uniform(N, samples, alphabetsize, seed=seed)
+
+
+def low_doublets(N: int, samples: int, alphabetsize: int, seed: surrogates.Seed) -> np.ndarray:
+    return surrogates.low_doublets(N, samples, alphabetsize, seed=seed)
+
+
+NULL_MODELS: dict[str, Callable[[int, int, int, surrogates.Seed], np.ndarray]] = {
+    "uniform": uniform,
+    "low_doublets": low_doublets,
+}
+
+
+@dataclass
+class Summary:
+    """
+    Mean and variance of every statistic over the samples of a run
+    """
+
+    mean: np.ndarray
+    variance: np.ndarray
+    samples: int
+
+    def interval(self, confidence: float = 0.95) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Confidence interval of the mean, low and high
+        """
+        half = norm.ppf((1 + confidence) / 2) * np.sqrt(self.variance / self.samples)
+        return self.mean - half, self.mean + half
+
+
+def summarize(values: np.ndarray) -> Summary:
+    """
+    Summary of an array of samples x statistics
+    """
+    samples = len(values)
+    variance = values.var(axis=0, ddof=1) if samples > 1 else np.zeros(values.shape[1:])
+    return Summary(mean=values.mean(axis=0), variance=variance, samples=samples)
+
+
+def default_workers() -> int:
+    """
+    Number of worker processes from the environment, 1 when unset
+    """
+    try:
+        return max(int(os.environ.get("ALDEGONDE_WORKERS", "1")), 1)
+    except ValueError:
+        raise ValueError("ALDEGONDE_WORKERS has to be a number")
+
+
+def chunk(
+    statistic: Callable[[np.ndarray], np.ndarray],
+    N: int,
+    alphabetsize: int,
+    model: str,
+    count: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """
+    The statistic of `count` surrogates, as array of count x statistics
+    """
+    batch = NULL_MODELS[model](N, count, alphabetsize, np.random.default_rng(seed))
+    return np.array([statistic(row) for row in batch], dtype=np.float64)
+
+
+def sample(
+    statistic: Callable[[np.ndarray], np.ndarray],
+    N: int,
+    alphabetsize: int,
+    samples: int,
+    model: str = "uniform",
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    The statistic of `samples` surrogates of N runes from a null model, as
+    array of samples x statistics. `workers` defaults to ALDEGONDE_WORKERS,
+    or 1, which runs in process.
+    """
+    if model not in NULL_MODELS:
+        raise ValueError(f"no null model {model}")
+    chunks = max(math.ceil(samples / CHUNK), 1)
+    sizes = [min(CHUNK, samples - i * CHUNK) for i in range(0, chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(chunks)
+    if workers is None:
+        workers = default_workers()
+    jobs = ([statistic] * chunks, [N] * chunks, [alphabetsize] * chunks, [model] * chunks, sizes, seeds)
+    if workers > 1 and chunks > 1 and samples * N >= PARALLEL_ELEMENTS:
+        with ProcessPoolExecutor(min(workers, chunks)) as pool:
+            parts = list(pool.map(chunk, *jobs))
+    else:
+        parts = list(map(chunk, *jobs))
+    return np.concatenate(parts)
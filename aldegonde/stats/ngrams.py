@@ -1,9 +1,109 @@
 """
 ngrams
+
+The counting core encodes every n-gram as an integer in base |alphabet|,
+(a, b, c) -> a*M*M + b*M + c, so n-grams are counted without building keys.
+Counting is dense with bincount while M^n is small, sparse with a sort above.
 """
 
+from typing import Optional
+
+import numpy as np
+
 from ..structures import sequence
 
+# largest number of possible n-grams that is counted in a dense table
+DENSE_NGRAM_LIMIT: int = 1 << 20
+
+
+def ngram_codes(
+    runes: sequence.Sequence,
+    length: int,
+    cut: int = 0,
+    stride: Optional[int] = None,
+    gap: int = 1,
+) -> np.ndarray:
+    """
+    All n-grams of the Sequence as integers in base |alphabet|, in order.
+
+    Specify `cut=0` and it operates on sliding blocks: ABC, BCD, CDE, ...
+    Specify `cut=1` and it operates on non-overlapping blocks: ABC, DEF, ...
+    Specify `cut=2` and it operates on non-overlapping blocks: BCD, EFG, ...
+    `stride` overrides the step between n-grams, `gap` is the distance
+    between the elements of one n-gram: length=2, gap=3 takes A..D pairs.
+    """
+    M = len(runes.alphabet)
+    if pow(M, length) >= 1 << 63:
+        raise ValueError(f"{length}-grams don't fit in 64 bits")
+    if cut == 0:
+        start, step = 0, 1
+    elif cut in range(1, length + 1):
+        start, step = cut - 1, length
+    else:
+        return np.empty(0, dtype=np.int64)
+    if stride is not None:
+        step = stride
+
+    data = runes.data
+    span = (length - 1) * gap + 1
+    count = len(range(start, len(data) - span + 1, step))
+    codes = np.zeros(count, dtype=np.int64)
+    if count == 0:
+        return codes
+    for j in range(0, length):
+        first = start + j * gap
+        codes *= M
+        codes += data[first : first + (count - 1) * step + 1 : step]
+    return codes
+
+
+def count_codes(codes: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Count integer codes in range(0, size).
+    Returns the distinct codes that occur, in order, and how often each occurs
+    """
+    if size <= DENSE_NGRAM_LIMIT:
+        counts = np.bincount(codes, minlength=size)
+        found = np.flatnonzero(counts)
+        return found, counts[found]
+    return np.unique(codes, return_counts=True)
+
+
+def ngram_frequencies(
+    runes: sequence.Sequence, length: int, cut: int = 0, gap: int = 1
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The distinct n-grams as integer codes and how often each occurs
+    """
+    codes = ngram_codes(runes, length=length, cut=cut, gap=gap)
+    return count_codes(codes, pow(len(runes.alphabet), length))
+
+
+def ngram_table(
+    runes: sequence.Sequence, length: int, cut: int = 0, gap: int = 1
+) -> np.ndarray:
+    """
+    Dense table of n-gram counts with one axis per position in the n-gram:
+    ngram_table(runes, 2)[a, b] is the number of times a is followed by b
+    """
+    M = len(runes.alphabet)
+    if pow(M, length) > DENSE_NGRAM_LIMIT:
+        raise ValueError(f"table of {length}-grams is too large")
+    codes = ngram_codes(runes, length=length, cut=cut, gap=gap)
+    counts = np.bincount(codes, minlength=pow(M, length))
+    return counts.reshape((M,) * length)
+
+
+def decode_ngram(code: int, length: int, alphabetsize: int) -> list[int]:
+    """
+    The elements of an n-gram from its integer code
+    """
+    output: list[int] = []
+    for _ in range(0, length):
+        code, element = divmod(int(code), alphabetsize)
+        output.append(element)
+    return output[::-1]
+
 
 def ngrams(runes: sequence.Sequence, length: int, cut: int = 0) -> list[list[int]]:
     """
@@ -15,14 +115,14 @@ def ngrams(runes: sequence.Sequence, length: int, cut: int = 0) -> list[list[int
     Specify `cut=2` and it operates on non-overlapping blocks of 3 runes: BCD, EFG, ...
     """
     N = len(runes)  # size of sequence
-    l: list[list[int]] = []
+    if N < length:
+        return []
+    windows = np.lib.stride_tricks.sliding_window_view(runes.data, length)
     if cut == 0:
-        for i in range(0, N - length + 1):
-            l.append(runes[i : i + length])
+        return windows.tolist()
     elif cut in range(1, length + 1):
-        for i in range(cut - 1, N - length + 1, length):
-            l.append(runes[i : i + length])
-    return l
+        return windows[cut - 1 :: length].tolist()
+    return []
 
 
 def digraphs(runes: sequence.Sequence, cut: int = 0) -> list[list[int]]:
@@ -0,0 +1,98 @@
+"""
+Profile of a Sequence: the common statistics in a single pass.
+
+The n-gram codes of every length are built from the codes of the length
+below, (a, b) -> a*M + b, and every cut is a strided slice of the sliding
+codes. Every count table is built once and shared by the IoC, entropy,
+doublet and distribution figures.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from ..structures import sequence
+from . import significance
+from .dist import print_frequencies
+from .entropy import entropy_from_counts
+from .ioc import ioc_from_counts
+from .ngrams import count_codes
+
+
+@dataclass
+class Profile:
+    """
+    Statistics of a Sequence.
+
+    ioc[(length, cut)] is (normalized IoC, sigmage) as from ioc_general,
+    entropy[length] the entropy of the sliding n-grams in bits,
+    doublets[skip] the number of runes equal to the rune `skip` further on
+    """
+
+    length: int
+    alphabet: list
+    frequencies: np.ndarray
+    ioc: dict[tuple[int, int], tuple[float, float]] = field(default_factory=dict)
+    entropy: dict[int, float] = field(default_factory=dict)
+    doublets: dict[int, int] = field(default_factory=dict)
+    triplets: int = 0
+
+    def coincidence(self, length: int, cut: int = 0) -> float:
+        """
+        IoC not normalized to alphabet size, as from ioc(), ioc2(), ...
+        """
+        return self.ioc[(length, cut)][0] / pow(len(self.alphabet), length)
+
+
+def profile(runes: sequence.Sequence, maxlength: int = 5) -> Profile:
+    """
+    IoC for all n-gram lengths up to `maxlength` and every cut, entropies,
+    doublets and the frequency distribution of the Sequence
+    """
+    M = len(runes.alphabet)
+    data = runes.data.astype(np.int64)
+    N = len(data)
+
+    frequencies = np.bincount(data, minlength=M)
+    result = Profile(length=N, alphabet=runes.alphabet, frequencies=frequencies)
+
+    codes = data
+    for length in range(1, maxlength + 1):
+        if length > 1:
+            codes = codes[:-1] * M + data[length - 1 :]
+        size = pow(M, length)
+        counts = frequencies if length == 1 else count_codes(codes, size)[1]
+        result.ioc[(length, 0)] = ioc_from_counts(counts, size)
+        result.entropy[length] = entropy_from_counts(counts)
+        for cut in range(1, length + 1):
+            _, counts = count_codes(codes[cut - 1 :: length], size)
+            result.ioc[(length, cut)] = ioc_from_counts(counts, size)
+
+    for skip in range(1, maxlength + 1):
+        result.doublets[skip] = int(np.count_nonzero(data[:-skip] == data[skip:]))
+    result.triplets = int(
+        np.count_nonzero((data[:-2] == data[1:-1]) & (data[1:-1] == data[2:]))
+    )
+    return result
+
+
+def print_profile(p: Profile) -> None:
+    """
+    print a Profile
+    """
+    M = len(p.alphabet)
+    print(f"length: {p.length} runes")
+    print_frequencies(p.frequencies, p.alphabet)
+    for length in range(1, max(n for n, _ in p.ioc) + 1):
+        for cut in range(0, length + 1):
+            g = p.ioc[(length, cut)]
+            print(f"ΔIC{length} (cut={cut}) = {g[0]:.3f} S={g[1]:.3f}σ ", end="|")
+        print()
+    for length, H in p.entropy.items():
+        print(f"H{length} = {H:.3f} bits ", end="|")
+    print()
+    for skip, count in p.doublets.items():
+        mu, _ = significance.expected("doublets", p.length, M, skip)
+        sigmage = significance.sigmage("doublets", count, p.length, M, skip)
+        print(f"doublets={count} (skip={skip}) expected={mu:.2f} S={sigmage:.2f}σ")
+    print(f"triplets={p.triplets}")
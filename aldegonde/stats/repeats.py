@@ -1,9 +1,11 @@
-from collections import Counter
+from dataclasses import dataclass
 import math
+from typing import Optional
 
-from scipy.stats import poisson
-
+import numpy as np
 from ..structures import sequence
+from . import significance
+from .suffixarray import SuffixArray
 
 
 # TODO: add `cut` parameter here
@@ -21,21 +23,12 @@ def print_repeat_statistics(
     The expected formula works best for length 3 or larger
     """
     MAX = len(ciphertext.alphabet)
+    suffixes = SuffixArray(ciphertext.data)
     for length in range(minimum, maximum + 1):
-        l = []
-        num = 0
-        for index in range(0, len(ciphertext) - length + 1):
-            k = "-".join([str(x) for x in ciphertext[index : index + length]])
-            l.append(k)
-        f = Counter(l)
-        for k in f.keys():
-            if f[k] > 1:
-                num = num + 1
+        num = len(suffixes.groups(length)[0])
 
         # first method, poisson distribution
-        mu: float = len(ciphertext) / pow(MAX, length)
-        expected1 = pow(MAX, length) * poisson.pmf(2, mu)
-        var = poisson.stats(mu, loc=0, moments="v") * pow(MAX, length)
+        expected1, var = significance.expected("repeats", len(ciphertext), MAX, length)
         sigmage1: float = abs(num - expected1) / math.sqrt(var)
         # sigmage: float = abs(num - expected1) / poisson.std(mu)
 
@@ -48,46 +41,131 @@ def print_repeat_statistics(
         )
 
 
+@dataclass
+class Repeats:
+    """
+    Repeated substrings as arrays. Repeat i occurs at the positions
+    sa[start[i]:stop[i]], it is every substring of lengths
+    shortest[i]..length[i] that starts there.
+    """
+
+    sa: np.ndarray
+    start: np.ndarray
+    stop: np.ndarray
+    length: np.ndarray
+    shortest: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def count(self) -> np.ndarray:
+        """
+        Number of occurrences of every repeat
+        """
+        return self.stop - self.start
+
+    def positions(self, i: int) -> np.ndarray:
+        """
+        Starting positions of repeat i, in order
+        """
+        return np.sort(self.sa[self.start[i] : self.stop[i]])
+
+
+def repeat_intervals(
+    ciphertext: sequence.Sequence,
+    minimum: int = 2,
+    maximum: Optional[int] = None,
+    maximal: bool = False,
+) -> Repeats:
+    """
+    Every substring of `minimum` up to `maximum` elements that occurs more
+    than once, of any length when `maximum` is None.
+    Substrings that always occur at the same positions come as one repeat:
+    if "3-14-2" only occurs inside "3-14-2-7" the repeat is "3-14-2-7" with
+    shortest length 3.
+    With `maximal=True` only maximal repeats are returned, those that can't
+    be extended to the left or right without losing an occurrence.
+    """
+    s = SuffixArray(ciphertext.data)
+    start, stop, length, shortest = s.intervals()
+    keep = length >= minimum
+    if maximum is not None:
+        if maximal:
+            keep &= length <= maximum
+        else:
+            keep &= shortest <= maximum
+            length = np.minimum(length, maximum)
+    if maximal:
+        keep &= s.left_diverse(start, stop)
+    shortest = np.maximum(shortest, minimum)
+    return Repeats(
+        sa=s.sa,
+        start=start[keep],
+        stop=stop[keep],
+        length=length[keep],
+        shortest=shortest[keep],
+    )
+
+
+def repeated_ngrams(
+    ciphertext: Optional[sequence.Sequence],
+    length: int,
+    suffixes: Optional[SuffixArray] = None,
+) -> list[tuple[str, np.ndarray]]:
+    """
+    All n-grams of this length that occur more than once, as a key like
+    "3-14-2" and the array of their starting positions.
+    Ordered by first occurrence. Pass `suffixes` to reuse a SuffixArray
+    over several lengths.
+    """
+    if suffixes is None:
+        suffixes = SuffixArray(ciphertext.data)
+    starts, stops = suffixes.groups(length)
+    groups = [np.sort(suffixes.sa[a:b]) for a, b in zip(starts, stops)]
+    groups.sort(key=lambda positions: positions[0])
+
+    data = suffixes.data
+    output: list[tuple[str, np.ndarray]] = []
+    for positions in groups:
+        first = positions[0]
+        key = "-".join(str(x) for x in data[first : first + length].tolist())
+        output.append((key, positions))
+    return output
+
+
 def repeat(
-    ciphertext: sequence.Sequence, minimum: int = 2, maximum: int = 10
+    ciphertext: sequence.Sequence, minimum: int = 2, maximum: Optional[int] = None
 ) -> dict[str, int]:
     """
-    Find repeating sequences in the list, up to `maximum`. Max defaults to 10
+    Find repeating sequences in the list, up to `maximum`, or up to the
+    longest repeat when `maximum` is None.
     Returns dictionary with as key the sequence as a string, and as value the number of occurences
     """
-    sequences = {}
-    for length in range(minimum, maximum + 1):
-        l = []
-        for index in range(0, len(ciphertext) - length + 1):
-            k = "-".join([str(x) for x in ciphertext[index : index + length]])
-            l.append(k)
-        f = Counter(l)
-        for k in f.keys():
-            if f[k] > 1:
-                sequences[k] = f[k]
-
-    return sequences
+    return {k: len(v) for k, v in repeat2(ciphertext, minimum, maximum).items()}
 
 
 def repeat2(
-    ciphertext: sequence.Sequence, minimum: int = 2, maximum: int = 10
+    ciphertext: sequence.Sequence, minimum: int = 2, maximum: Optional[int] = None
 ) -> dict[str, list[int]]:
     """
-    Find repeating sequences in the list, up to `maximum`. Max defaults to 10
+    Find repeating sequences in the list, up to `maximum`, or up to the
+    longest repeat when `maximum` is None.
     Returns dictionary with as key the sequence as a string, and as value the list of starting positions of that substring
     """
+    return repeated_substrings(SuffixArray(ciphertext.data), minimum, maximum)
+
+
+def repeated_substrings(
+    suffixes: SuffixArray, minimum: int = 2, maximum: Optional[int] = None
+) -> dict[str, list[int]]:
+    """
+    repeat2() on a SuffixArray, for plain arrays of integers
+    """
+    if maximum is None:
+        maximum = int(suffixes.lcp.max(initial=0))
     sequences = {}
     for length in range(minimum, maximum + 1):
-        l: dict[str, list[int]] = {}
-        for index in range(0, len(ciphertext) - length + 1):
-            k = "-".join([str(x) for x in ciphertext[index : index + length]])
-            if k in l.keys():
-                l[k].append(index)
-            else:
-                l[k] = [index]
-
-        for k in l.keys():
-            if len(l[k]) > 1:
-                sequences[k] = l[k].copy()
+        for k, positions in repeated_ngrams(None, length, suffixes):
+            sequences[k] = positions.tolist()
 
     return sequences
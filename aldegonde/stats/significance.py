@@ -0,0 +1,247 @@
+"""
+Expected values of statistics on random text, for significance scores.
+
+The null model is uniform random text of N runes over an alphabet of M. Every
+statistic has a mean and variance keyed by (statistic, N, M, length), where
+length is the n-gram length, skip or isomorph length.
+Statistics with a closed form are computed directly and memoized. The others
+are estimated from seeded Monte Carlo samples and stored in an on-disk cache,
+keyed by null model and number of samples as well. A single run estimates a
+statistic for all lengths at once, so repeated reports only pay for it once.
+
+The cache is a json file, by default ~/.cache/aldegonde/nulls.json, or the
+path in the environment variable ALDEGONDE_CACHE.
+"""
+
+from functools import lru_cache
+import json
+import math
+import os
+from typing import Callable, Optional
+import zlib
+
+from scipy.stats import norm
+
+# Monte Carlo samples per null model
+SAMPLES: int = 1000
+
+
+def default_path() -> str:
+    """
+    Location of the on-disk cache
+    """
+    return os.environ.get(
+        "ALDEGONDE_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "aldegonde", "nulls.json"),
+    )
+
+
+class NullCache:
+    """
+    Means and variances of Monte Carlo null models, in memory and on disk.
+    Entries are only ever added, and written out right away. If the file
+    can't be read or written the cache works from memory.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.entries: dict[str, list[float]] = {}
+        if path is None:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __getitem__(self, key: str) -> tuple[float, float]:
+        mean, var = self.entries[key]
+        return (mean, var)
+
+    def update(self, values: dict[str, tuple[float, float]]) -> None:
+        """
+        Add entries and write the cache
+        """
+        self.entries.update({k: list(v) for k, v in values.items()})
+        if self.path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+cache: Optional[NullCache] = None
+
+
+def default_cache() -> NullCache:
+    """
+    The shared cache, opened on first use
+    """
+    global cache
+    if cache is None:
+        cache = NullCache(default_path())
+    return cache
+
+
+def key(
+    statistic: str, N: int, alphabetsize: int, length: int, model: str, samples: int
+) -> str:
+    return f"{statistic}|{model}|{N}|{alphabetsize}|{length}|{samples}"
+
+
+def doublets(N: int, alphabetsize: int, skip: int) -> tuple[float, float]:
+    """
+    Number of runes equal to the rune `skip` further on: Poisson, N/M
+    """
+    mu = N / alphabetsize
+    return (mu, mu)
+
+
+def repeats(N: int, alphabetsize: int, length: int) -> tuple[float, float]:
+    """
+    Number of n-grams that occur exactly twice, every n-gram is Poisson
+    with mean N/M^length
+    """
+    C = pow(alphabetsize, length)
+    mu = N / C
+    return (C * math.exp(-mu) * mu * mu / 2, C * mu)
+
+
+def ioc(N: int, alphabetsize: int, length: int) -> tuple[float, float]:
+    """
+    Normalized IoC of the sliding n-grams
+    """
+    C = pow(alphabetsize, length)
+    L = N - length + 1
+    if L < 2:
+        return (1.0, 0.0)
+    return (1.0, 2 * (C - 1) / (L * (L - 1)))
+
+
+def isomorphs(
+    N: int, alphabetsize: int, length: int, model: str, samples: int, seed: int
+) -> dict[tuple[str, int], tuple[float, float]]:
+    """
+    Number of distinct isomorphs, and of isomorphs that occur more than once,
+    for all lengths up to at least `length`
+    """
+    from ..analysis.isomorph import NULL_MAXLENGTH, random_isomorph_baseline
+
+    maxlength = max(length, NULL_MAXLENGTH)
+    distinct, duplicate = random_isomorph_baseline(
+        N, alphabetsize, samples, model=model, maxlength=maxlength, seed=seed
+    )
+    output: dict[tuple[str, int], tuple[float, float]] = {}
+    for n in range(1, maxlength + 1):
+        output[("isomorphs_distinct", n)] = (
+            float(distinct.mean[n - 1]),
+            float(distinct.variance[n - 1]),
+        )
+        output[("isomorphs_duplicate", n)] = (
+            float(duplicate.mean[n - 1]),
+            float(duplicate.variance[n - 1]),
+        )
+    return output
+
+
+CLOSED_FORMS: dict[str, Callable[[int, int, int], tuple[float, float]]] = {
+    "doublets": doublets,
+    "repeats": repeats,
+    "ioc": ioc,
+}
+
+# sampler for every Monte Carlo statistic, a sampler can estimate several
+# statistics and lengths in one run
+MONTE_CARLO: dict[
+    str,
+    Callable[[int, int, int, str, int, int], dict[tuple[str, int], tuple[float, float]]],
+] = {
+    "isomorphs_distinct": isomorphs,
+    "isomorphs_duplicate": isomorphs,
+}
+
+
+@lru_cache(maxsize=None)
+def closed_form(statistic: str, N: int, alphabetsize: int, length: int) -> tuple[float, float]:
+    return CLOSED_FORMS[statistic](N, alphabetsize, length)
+
+
+def expected(
+    statistic: str,
+    N: int,
+    alphabetsize: int,
+    length: int = 1,
+    nulls: Optional[NullCache] = None,
+    model: str = "uniform",
+    samples: int = SAMPLES,
+) -> tuple[float, float]:
+    """
+    Mean and variance of a statistic on random text of N runes. Monte Carlo
+    statistics draw `samples` surrogates from the null `model`, closed forms
+    are for uniform text.
+    """
+    if statistic in CLOSED_FORMS:
+        return closed_form(statistic, N, alphabetsize, length)
+    if statistic not in MONTE_CARLO:
+        raise ValueError(f"no null model for {statistic}")
+    if nulls is None:
+        nulls = default_cache()
+    k = key(statistic, N, alphabetsize, length, model, samples)
+    if k not in nulls:
+        # the seed follows from the sampler and its parameters, so a cold
+        # cache gives the same values
+        sampler = MONTE_CARLO[statistic]
+        seed = zlib.crc32(key(sampler.__name__, N, alphabetsize, 0, model, samples).encode())
+        values = sampler(N, alphabetsize, length, model, samples, seed)
+        nulls.update(
+            {key(s, N, alphabetsize, n, model, samples): v for (s, n), v in values.items()}
+        )
+    return nulls[k]
+
+
+def interval(
+    statistic: str,
+    N: int,
+    alphabetsize: int,
+    length: int = 1,
+    confidence: float = 0.95,
+    nulls: Optional[NullCache] = None,
+    model: str = "uniform",
+    samples: int = SAMPLES,
+) -> tuple[float, float]:
+    """
+    Confidence interval of the expected value, low and high. Closed forms
+    are exact.
+    """
+    mean, var = expected(statistic, N, alphabetsize, length, nulls, model, samples)
+    if statistic in CLOSED_FORMS:
+        return (mean, mean)
+    half = norm.ppf((1 + confidence) / 2) * math.sqrt(var / samples)
+    return (float(mean - half), float(mean + half))
+
+
+def sigmage(
+    statistic: str,
+    observed: float,
+    N: int,
+    alphabetsize: int,
+    length: int = 1,
+    nulls: Optional[NullCache] = None,
+    model: str = "uniform",
+    samples: int = SAMPLES,
+) -> float:
+    """
+    Number of standard deviations the observed value is away from random
+    """
+    mean, var = expected(statistic, N, alphabetsize, length, nulls, model, samples)
+    if var <= 0:
+        return 0.0
+    return abs(observed - mean) / math.sqrt(var)
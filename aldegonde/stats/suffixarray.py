@@ -0,0 +1,125 @@
+"""
+Suffix array and LCP array of a text.
+
+The suffix array lists the start of every suffix of the text in sorted order,
+so equal substrings end up next to each other. lcp[k] is the length of the
+longest common prefix of the suffixes at sa[k-1] and sa[k]. Every substring
+that occurs more than once is a run of suffixes with lcp >= its length.
+
+The suffix array is built by prefix doubling: suffixes are ranked by their
+first 1, 2, 4, ... elements, each round one sort over pairs of ranks of the
+round before. The ranks of every round are kept, the LCP of two suffixes is
+then found by binary lifting over those rounds, for all pairs at once.
+"""
+
+import numpy as np
+
+
+class SuffixArray:
+    """
+    Suffix array, inverse suffix array and LCP array of an array of integers
+
+    Example:
+        >>> s = SuffixArray(np.array([1, 0, 1, 0, 2]))
+        >>> s.sa
+        array([1, 3, 0, 2, 4])
+        >>> s.lcp
+        array([0, 1, 0, 2, 0])
+    """
+
+    def __init__(self, data: np.ndarray) -> None:
+        self.data = np.asarray(data, dtype=np.int64)
+        N = len(self.data)
+        self.length: int = N
+
+        # levels[k] ranks every suffix by its first 2**k elements
+        _, rank = np.unique(self.data, return_inverse=True)
+        rank = rank.reshape(-1).astype(np.int64)
+        self.levels: list[np.ndarray] = [rank]
+        h = 1
+        while h < N and rank.max() < N - 1:
+            second = np.full(N, -1, dtype=np.int64)
+            second[: N - h] = rank[h:]
+            order = np.lexsort((second, rank))
+            changes = (np.diff(rank[order]) != 0) | (np.diff(second[order]) != 0)
+            rank = np.empty(N, dtype=np.int64)
+            rank[order] = np.concatenate(([0], np.cumsum(changes)))
+            self.levels.append(rank)
+            h *= 2
+
+        self.rank = rank
+        self.sa = np.argsort(rank, kind="stable")
+        self.lcp = self.longest_common_prefix(self.sa[:-1], self.sa[1:])
+        self.lcp = np.concatenate(([0], self.lcp))[:N].astype(np.int64)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def longest_common_prefix(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Length of the longest common prefix of the suffixes at a[i] and b[i],
+        for every i. a[i] and b[i] must be different positions.
+        """
+        N = self.length
+        common = np.zeros(len(a), dtype=np.int64)
+        for k in range(len(self.levels) - 1, -1, -1):
+            x = a + common
+            y = b + common
+            valid = (x < N) & (y < N)
+            rank = self.levels[k]
+            same = valid & (rank[np.minimum(x, N - 1)] == rank[np.minimum(y, N - 1)])
+            common += same * (1 << k)
+        return common
+
+    def groups(self, length: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        The substrings of this length that occur more than once, as runs
+        sa[start[i]:stop[i]] of suffixes that begin with the same substring
+        """
+        edges = np.flatnonzero(self.lcp < length)
+        starts = edges
+        stops = np.append(edges[1:], self.length)
+        repeated = stops - starts > 1
+        return starts[repeated], stops[repeated]
+
+    def intervals(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All LCP intervals: runs sa[start:stop] of suffixes that share a
+        prefix of `length` elements, and no longer one. The substrings of
+        lengths shortest..length all occur at exactly those positions.
+        Together they are every repeated substring of the text.
+        Returns arrays start, stop, length, shortest.
+        """
+        lcp = self.lcp.tolist() + [0]
+        start: list[int] = []
+        stop: list[int] = []
+        length: list[int] = []
+        shortest: list[int] = []
+        # stack of (lcp, left boundary) of the intervals still open
+        stack: list[tuple[int, int]] = [(0, 0)]
+        for i in range(1, self.length + 1):
+            left = i - 1
+            while lcp[i] < stack[-1][0]:
+                value, left = stack.pop()
+                start.append(left)
+                stop.append(i)
+                length.append(value)
+                shortest.append(max(lcp[i], stack[-1][0]) + 1)
+            if lcp[i] > stack[-1][0]:
+                stack.append((lcp[i], left))
+        return (
+            np.array(start, dtype=np.int64),
+            np.array(stop, dtype=np.int64),
+            np.array(length, dtype=np.int64),
+            np.array(shortest, dtype=np.int64),
+        )
+
+    def left_diverse(self, start: np.ndarray, stop: np.ndarray) -> np.ndarray:
+        """
+        For every run sa[start:stop]: whether the elements before the
+        suffixes differ, so the repeat can't be extended to the left.
+        A suffix at the start of the text counts as different from all.
+        """
+        before = np.where(self.sa > 0, self.data[self.sa - 1], -1 - self.sa)
+        changes = np.concatenate(([0], np.cumsum(np.diff(before) != 0)))
+        return changes[stop - 1] - changes[start] > 0
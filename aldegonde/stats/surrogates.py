@@ -0,0 +1,153 @@
+"""Surrogate texts for null models.
+
+Every generator returns a batch: a 2-D array with one surrogate per row, so
+thousands of surrogates cost a few array operations instead of a loop per
+rune. All take a `seed`, an int or a numpy Generator, for reproducible runs.
+
+Null models:
+    uniform      every rune independent and equally likely
+    shuffled     permutations of a given text, frequencies are preserved
+    low_doublets uniform, but a rune repeats the previous one with a set
+                 probability, like the low doublet rate of the Liber Primus
+    markov       order-k Markov chain fitted to a given text
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+
+from ..structures import sequence
+
+Seed = Union[int, np.random.Generator, None]
+
+# largest transition table markov() builds, in entries
+MARKOV_TABLE_LIMIT: int = 1 << 24
+
+
+def elements(runes: Union[sequence.Sequence, list[int], np.ndarray]) -> np.ndarray:
+    """
+    The elements of a Sequence, or of a plain list, as array
+    """
+    if isinstance(runes, sequence.Sequence):
+        return runes.data
+    return np.asarray(runes)
+
+
+def uniform(
+    length: int, samples: int = 1, alphabetsize: int = 29, seed: Seed = None
+) -> np.ndarray:
+    """
+    `samples` random texts of `length` runes, all runes equally likely
+    """
+    rng = np.random.default_rng(seed)
+    return rng.integers(
+        0, alphabetsize, size=(samples, length), dtype=np.int64
+    ).astype(sequence.storage_dtype(alphabetsize))
+
+
+def shuffled(
+    runes: Union[sequence.Sequence, list[int], np.ndarray],
+    samples: int = 1,
+    seed: Seed = None,
+) -> np.ndarray:
+    """
+    `samples` random permutations of the text, every row has exactly the
+    same rune frequencies as the input
+    """
+    rng = np.random.default_rng(seed)
+    data = elements(runes)
+    return rng.permuted(np.tile(data, (samples, 1)), axis=1)
+
+
+def low_doublets(
+    length: int,
+    samples: int = 1,
+    alphabetsize: int = 29,
+    doublets: Optional[float] = None,
+    seed: Seed = None,
+) -> np.ndarray:
+    """
+    `samples` random texts where a rune equals the previous one with
+    probability `doublets`, all other runes equally likely.
+    The default is what cicada3301.randomrunes_with_low_doublets produced:
+    a doublet is redrawn 5 out of 6 times.
+
+    The text is a running sum of random steps modulo the alphabet size,
+    with a step of 0 for a doublet.
+    """
+    if doublets is None:
+        doublets = (1 / 6 + 5 / 6 / alphabetsize) / alphabetsize
+    rng = np.random.default_rng(seed)
+    steps = rng.integers(1, alphabetsize, size=(samples, length), dtype=np.int64)
+    steps[rng.random((samples, length)) < doublets] = 0
+    if length > 0:
+        steps[:, 0] = rng.integers(0, alphabetsize, size=samples)
+    return (np.cumsum(steps, axis=1) % alphabetsize).astype(
+        sequence.storage_dtype(alphabetsize)
+    )
+
+
+def markov(
+    runes: Union[sequence.Sequence, list[int], np.ndarray],
+    length: int,
+    samples: int = 1,
+    order: int = 1,
+    alphabetsize: Optional[int] = None,
+    seed: Seed = None,
+) -> np.ndarray:
+    """
+    `samples` random texts from an order-k Markov chain fitted to the text:
+    every rune is drawn with the frequencies that followed the previous
+    `order` runes in the text. Contexts that never occur in the text fall
+    back to the overall rune frequencies. Every surrogate starts with
+    `order` consecutive runes taken from a random position in the text.
+    """
+    data = elements(runes).astype(np.int64)
+    if alphabetsize is None:
+        if isinstance(runes, sequence.Sequence):
+            alphabetsize = len(runes.alphabet)
+        else:
+            alphabetsize = int(data.max()) + 1
+    M = alphabetsize
+    contexts = M**order
+    if contexts * M > MARKOV_TABLE_LIMIT:
+        raise ValueError(f"order {order} needs a table of {contexts * M} entries")
+    if len(data) <= order:
+        raise ValueError("text is too short for this order")
+    rng = np.random.default_rng(seed)
+
+    # context of every position as integer in base M, and what follows it
+    context = np.zeros(len(data) - order, dtype=np.int64)
+    for i in range(0, order):
+        context = context * M + data[i : len(data) - order + i]
+    following = data[order:]
+    counts = np.bincount(context * M + following, minlength=contexts * M)
+    counts = counts.reshape(contexts, M).astype(np.float64)
+    unseen = counts.sum(axis=1) == 0
+    counts[unseen] = np.bincount(data, minlength=M)
+    # cumulative probabilities, row r shifted to [r, r+1) so one
+    # searchsorted looks up all samples at once
+    cumulative = np.cumsum(counts, axis=1) / counts.sum(axis=1)[:, None]
+    cumulative = (cumulative + np.arange(0, contexts)[:, None]).reshape(-1)
+
+    out = np.empty((samples, length), dtype=sequence.storage_dtype(M))
+    starts = rng.integers(0, len(data) - order + 1, size=samples)
+    state = np.zeros(samples, dtype=np.int64)
+    for i in range(0, min(order, length)):
+        out[:, i] = data[starts + i]
+    for i in range(0, order):
+        state = state * M + data[starts + i]
+    for i in range(order, length):
+        u = rng.random(samples)
+        found = np.searchsorted(cumulative, state + u, side="right")
+        rune = np.minimum(found - state * M, M - 1)
+        out[:, i] = rune
+        state = (state * M + rune) % contexts
+    return out
+
+
+def as_sequences(batch: np.ndarray, alphabet) -> list[sequence.Sequence]:
+    """
+    Every row of a batch as Sequence, without copying
+    """
+    return [sequence.Sequence.wrap(row, alphabet) for row in batch]
@@ -0,0 +1,50 @@
+"""tests for accumulator.py"""
+
+import numpy as np
+import pytest
+
+from ..structures import alphabet
+from .accumulator import Accumulator, accumulate, combine
+from .profile import profile
+from .surrogates import as_sequences, low_doublets
+
+data = low_doublets(400, 1, 26, 0.2, seed=11)[0]
+text = as_sequences(data[None, :], alphabet.UPPERCASE_ALPHABET)[0]
+
+
+def check(acc: Accumulator) -> None:
+    p = profile(text, maxlength=4)
+    q = acc.profile(alphabet.UPPERCASE_ALPHABET)
+    assert q.length == p.length
+    assert q.frequencies.tolist() == p.frequencies.tolist()
+    for k in p.ioc:
+        assert q.ioc[k] == pytest.approx(p.ioc[k])
+    for n in p.entropy:
+        assert q.entropy[n] == pytest.approx(p.entropy[n])
+    assert q.doublets == p.doublets
+    assert q.triplets == p.triplets
+
+
+def test_accumulate_chunks():
+    # chunks shorter than the n-grams, so some n-grams span three chunks
+    chunks = np.split(data, [1, 2, 5, 100, 101, 250, 253])
+    check(accumulate(chunks, 26, maxlength=4))
+
+
+def test_combine_is_associative():
+    parts = [Accumulator(26, 4).update(c) for c in np.split(data, [3, 7, 8, 300])]
+    check(combine(parts))
+    check(parts[0] + ((parts[1] + parts[2]) + (parts[3] + parts[4])))
+
+
+def test_seam_triplets():
+    # with maxlength=1 the triplets across a seam still need two runes of context
+    acc = accumulate([[3, 3], [3, 3], [5], [5, 5]], 26, maxlength=1)
+    assert acc.triplets == 3
+    for chunks in np.split(data, [1, 2, 3]), np.split(data, [2, 199, 200, 201]):
+        assert accumulate(chunks, 26, maxlength=1).triplets == profile(text).triplets
+
+
+def test_merge_settings():
+    with pytest.raises(ValueError):
+        Accumulator(26, 4).merge(Accumulator(26, 5))
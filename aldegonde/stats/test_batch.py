@@ -0,0 +1,42 @@
+"""tests for batch.py"""
+
+import numpy as np
+import pytest
+
+from ..structures import alphabet, sequence
+from .batch import batch_chi, batch_fitness, batch_ioc, fitness_table
+from .chi import chi
+from .ioc import normalized_ioc
+from .surrogates import as_sequences, low_doublets
+
+rows = low_doublets(50, 4, 26, 0.3, seed=5)
+texts = as_sequences(rows, alphabet.UPPERCASE_ALPHABET)
+reference = sequence.Sequence(
+    "NOTIFYQUARTERMASTERTHEQUICKBROWNFOXJUMPSOVERTHELAZYDOG",
+    alphabet=alphabet.UPPERCASE_ALPHABET,
+)
+
+
+def test_batch_ioc():
+    expected = [normalized_ioc(t) for t in texts]
+    assert batch_ioc(rows, 26) == pytest.approx(expected)
+    # ragged: rows of 50, 0, 1 and 30 elements
+    flat = np.concatenate((rows[0], rows[1][:1], rows[2][:30]))
+    offsets = np.array([0, 50, 50, 51, 81])
+    assert batch_ioc(flat, 26, offsets) == pytest.approx([expected[0], 0, 0, normalized_ioc(texts[2][:30])])
+
+
+def test_batch_chi():
+    frequencies = np.bincount(reference.data, minlength=26)
+    assert batch_chi(rows, frequencies) == pytest.approx([chi(t, reference) for t in texts])
+
+
+def test_batch_fitness():
+    table = fitness_table(reference, 2)
+    scores = batch_fitness(np.stack((reference.data[:20], rows[0][:20])), table)
+    assert scores[0] > scores[1]
+    # ragged rows score the same as separate rows
+    flat = np.concatenate((reference.data[:20], rows[0][:20]))
+    assert batch_fitness(flat, table, np.array([0, 20, 40])) == pytest.approx(scores)
+    codes = reference.data[:19].astype(int) * 26 + reference.data[1:20]
+    assert scores[0] == pytest.approx(table.reshape(-1)[codes].mean())
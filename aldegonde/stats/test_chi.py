@@ -0,0 +1,33 @@
+"""tests for chi.py"""
+
+import numpy as np
+import pytest
+
+from ..structures import alphabet
+from .chi import chi, chi_clusters, chi_matrix, frequency_matrix
+from .surrogates import as_sequences, low_doublets
+
+
+def test_chi_matrix():
+    rows = low_doublets(40, 6, 26, 0.3, seed=3)
+    texts = as_sequences(rows, alphabet.UPPERCASE_ALPHABET)
+    chis = chi_matrix(frequency_matrix(texts))
+    for i, a in enumerate(texts):
+        for j, b in enumerate(texts):
+            assert chis[i, j] == pytest.approx(chi(a, b))
+    reference = np.bincount(rows[0], minlength=26)
+    assert chi_matrix(frequency_matrix(texts), reference)[:, 0] == pytest.approx(chis[:, 0])
+
+
+def test_chi_clusters():
+    # segments of two different skewed distributions
+    rng = np.random.default_rng(1)
+    p = np.arange(1, 27, dtype=np.float64) ** 3
+    p = p / p.sum()
+    rows = np.array([rng.choice(26, 200, p=np.roll(p, shift)) for shift in (0, 0, 13, 0, 13)])
+    texts = as_sequences(rows, alphabet.UPPERCASE_ALPHABET)
+    chis = chi_matrix(frequency_matrix(texts)) * 26
+    labels = chi_clusters(chis, 2.0)
+    assert labels[0] == labels[1] == labels[3]
+    assert labels[2] == labels[4]
+    assert labels[0] != labels[2]
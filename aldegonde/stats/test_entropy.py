@@ -0,0 +1,48 @@
+"""tests for entropy.py"""
+
+import math
+
+import numpy as np
+import pytest
+
+from ..structures import alphabet
+from .entropy import batch_block_entropies, entropy_curve, shannon2_entropy, shannon_entropy
+from .ngrams import ngram_frequencies
+from .surrogates import as_sequences, low_doublets
+
+rows = low_doublets(60, 5, 26, 0.3, seed=2)
+texts = as_sequences(rows, alphabet.UPPERCASE_ALPHABET)
+
+
+def entropy(counts):
+    p = counts / counts.sum()
+    return -(p * np.log2(p)).sum()
+
+
+def test_entropy_curve():
+    for t in texts:
+        for sliding, cut in ((True, 0), (False, 1)):
+            curve = entropy_curve(t, maxlength=4, sliding=sliding)
+            for n in range(1, 5):
+                _, counts = ngram_frequencies(t, n, cut=cut)
+                assert curve.block[n - 1] == pytest.approx(entropy(counts))
+            assert curve.conditional[0] == curve.block[0]
+            assert curve.conditional[2] == pytest.approx(curve.block[2] - curve.block[1])
+            assert curve.rate[3] == pytest.approx(curve.block[3] / 4)
+    assert shannon_entropy(texts[0]) == pytest.approx(entropy_curve(texts[0]).block[0])
+    _, counts = ngram_frequencies(texts[0], 2)
+    assert shannon2_entropy(texts[0]) == pytest.approx(entropy(counts))
+
+
+def test_batch_block_entropies():
+    expected = [entropy_curve(t, maxlength=3).block for t in texts]
+    assert batch_block_entropies(rows, 26, 3) == pytest.approx(np.array(expected))
+    # ragged: rows of 60, 0, 2 and 30 elements; sparse counts for 6-grams
+    flat = np.concatenate((rows[0], rows[1][:2], rows[2][:30]))
+    offsets = np.array([0, 60, 60, 62, 92])
+    H = batch_block_entropies(flat, 26, 6, offsets)
+    assert H[0] == pytest.approx(entropy_curve(texts[0], maxlength=6).block)
+    assert H[1] == pytest.approx(np.zeros(6))
+    assert H[2] == pytest.approx([1.0 if rows[1][0] != rows[1][1] else 0.0, 0, 0, 0, 0, 0])
+    assert H[3][0] == pytest.approx(entropy_curve(texts[2][:30], maxlength=1).block[0])
+    assert H[3][5] == pytest.approx(math.log2(25))
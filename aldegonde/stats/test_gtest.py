@@ -0,0 +1,49 @@
+"""tests for gtest.py"""
+
+import numpy as np
+import pytest
+from scipy.stats import chisquare as scipy_chisquare, power_divergence
+
+from ..structures import alphabet
+from .gtest import (
+    batch_chisquare,
+    batch_gtest,
+    chisquare,
+    corpus_reference,
+    english_reference,
+    gtest,
+    uniform_reference,
+)
+from .surrogates import as_sequences, low_doublets
+
+rows = low_doublets(80, 4, 26, 0.3, seed=7)
+texts = as_sequences(rows, alphabet.UPPERCASE_ALPHABET)
+
+
+def test_gtest():
+    reference = corpus_reference(texts[0], 2)
+    G, p = batch_gtest(rows, reference)
+    X, q = batch_chisquare(rows, reference)
+    for i, t in enumerate(texts):
+        data = t.data.astype(np.int64)
+        observed = np.bincount(data[:-1] * 26 + data[1:], minlength=26 * 26)
+        expected = observed.sum() * reference.reshape(-1)
+        g = power_divergence(observed, expected, lambda_="log-likelihood")
+        x = scipy_chisquare(observed, expected)
+        assert (G[i], p[i]) == pytest.approx((g.statistic, g.pvalue))
+        assert (X[i], q[i]) == pytest.approx((x.statistic, x.pvalue))
+        assert gtest(t, reference) == pytest.approx((G[i], p[i]))
+        assert chisquare(t, reference) == pytest.approx((X[i], q[i]))
+
+
+def test_reference():
+    english = english_reference()
+    assert english.shape == (29,)
+    assert english.sum() == pytest.approx(1.0)
+    # E is the most common rune, TH takes from T and H
+    assert english.argmax() == 18
+    assert english[24] > english[16] > english[2] > english[8]
+    uniform = uniform_reference(26, 2)
+    assert uniform.shape == (26, 26)
+    G, p = batch_gtest(np.zeros((1, 50), dtype=np.int64), uniform_reference(26))
+    assert G[0] == pytest.approx(2 * 50 * np.log(26)) and p[0] < 1e-10
@@ -1,7 +1,17 @@
 #!/usr/bin/env p
 
+import numpy as np
+
 from ..structures import sequence, alphabet
-from .hamming import hamming_distance
+from .hamming import (
+    blocks,
+    coincidence_matrix,
+    hamming_distance,
+    hamming_matrix,
+    matching_blocks,
+    truncated,
+)
+from .surrogates import as_sequences
 
 karolin = sequence.Sequence("karolin", alphabet=alphabet.LOWERCASE_ALPHABET)
 kathrin = sequence.Sequence("kathrin", alphabet=alphabet.LOWERCASE_ALPHABET)
@@ -12,3 +22,22 @@ def test_hamming():
     assert hamming_distance(karolin, kathrin) == 3
     assert hamming_distance(karolin, kerstin) == 3
     assert hamming_distance(kathrin, kerstin) == 4
+
+
+def test_hamming_matrix():
+    rng = np.random.default_rng(4)
+    key = rng.integers(0, 26, 40)
+    plain = rng.choice(3, (6, 40), p=[0.8, 0.1, 0.1])
+    data = rng.integers(0, 26, (6, 40))
+    # blocks 1 and 4 are low entropy text with the same key
+    data[1] = (plain[1] + key) % 26
+    data[4] = (plain[4] + key) % 26
+    distances = hamming_matrix(data, 26)
+    texts = as_sequences(data, alphabet.LOWERCASE_ALPHABET)
+    for i in range(0, 6):
+        for j in range(0, 6):
+            assert distances[i, j] == hamming_distance(texts[i], texts[j])
+    coincidences = coincidence_matrix(data, 26)
+    assert matching_blocks(coincidences, 15)[0][:2] == (1, 4)
+    assert blocks(texts[0], 15).tolist() == [data[0][:15].tolist(), data[0][15:30].tolist()]
+    assert truncated(texts, 40).tolist() == data.tolist()
@@ -0,0 +1,59 @@
+"""tests for montecarlo.py"""
+
+import numpy as np
+import pytest
+
+from ..analysis.isomorph import IsomorphIndex, isomorph_counts, random_isomorph_baseline
+from . import montecarlo, surrogates
+
+
+def counts(row: np.ndarray) -> np.ndarray:
+    return np.bincount(row, minlength=5)
+
+
+def test_sample_independent_of_workers(monkeypatch):
+    serial = montecarlo.sample(counts, 100, 5, 120, seed=1, workers=1)
+    assert serial.shape == (120, 5)
+    assert (serial.sum(axis=1) == 100).all()
+    monkeypatch.setattr(montecarlo, "PARALLEL_ELEMENTS", 0)
+    parallel = montecarlo.sample(counts, 100, 5, 120, seed=1, workers=2)
+    assert np.array_equal(serial, parallel)
+    assert not np.array_equal(serial, montecarlo.sample(counts, 100, 5, 120, seed=2))
+
+
+def test_default_workers(monkeypatch):
+    monkeypatch.delenv("ALDEGONDE_WORKERS", raising=False)
+    assert montecarlo.default_workers() == 1
+    monkeypatch.setenv("ALDEGONDE_WORKERS", "4")
+    assert montecarlo.default_workers() == 4
+
+
+def test_unknown_model():
+    with pytest.raises(ValueError):
+        montecarlo.sample(counts, 100, 5, 10, model="nothing")
+
+
+def test_summary():
+    values = np.array([[1.0, 10.0], [3.0, 10.0], [5.0, 10.0], [7.0, 10.0]])
+    summary = montecarlo.summarize(values)
+    assert summary.mean.tolist() == [4.0, 10.0]
+    assert summary.variance.tolist() == pytest.approx([20 / 3, 0.0])
+    low, high = summary.interval(0.95)
+    half = 1.959964 * np.sqrt(20 / 3 / 4)
+    assert low == pytest.approx([4.0 - half, 10.0])
+    assert high == pytest.approx([4.0 + half, 10.0])
+
+
+def test_isomorph_baseline():
+    data = surrogates.uniform(300, 1, 29, seed=3)[0]
+    index = IsomorphIndex(data, maximum=8)
+    expected = [index.distinct(n) for n in range(1, 9)]
+    expected += [index.duplicates(n) for n in range(1, 9)]
+    assert isomorph_counts(data, 8).tolist() == expected
+
+    distinct, duplicate = random_isomorph_baseline(300, 29, 30, maxlength=8, seed=4)
+    assert distinct.samples == 30
+    assert distinct.mean.shape == duplicate.mean.shape == (8,)
+    # a single rune is always the same isomorph
+    assert distinct.mean[0] == 1 and distinct.variance[0] == 0
+    assert (np.diff(duplicate.mean) <= 0).all()
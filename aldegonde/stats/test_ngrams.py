@@ -2,7 +2,8 @@
 
 from ..structures import alphabet, sequence
 
-from .ngrams import ngrams
+from . import ngrams as ngrams_module
+from .ngrams import decode_ngram, ngram_codes, ngram_frequencies, ngram_table, ngrams
 
 uniq = sequence.Sequence(data=list(range(0, 5)), alphabet=alphabet.UPPERCASE_ALPHABET)
 
@@ -20,3 +21,20 @@ def test_ngram_unique():
     assert ngrams(uniq, length=4, cut=2) == [[1, 2, 3, 4]]
     assert ngrams(uniq, length=4, cut=3) == []
     assert ngrams(uniq, length=4, cut=4) == []
+
+
+def test_ngram_codes():
+    assert ngram_codes(uniq, length=2, cut=0).tolist() == [1, 26 + 2, 2 * 26 + 3, 3 * 26 + 4]
+    assert ngram_codes(uniq, length=2, cut=2).tolist() == [26 + 2, 3 * 26 + 4]
+    assert ngram_codes(uniq, length=2, gap=3).tolist() == [3, 26 + 4]
+    assert decode_ngram(2 * 26 * 26 + 3 * 26 + 4, 3, 26) == [2, 3, 4]
+    assert ngram_table(uniq, 2)[1, 2] == 1
+
+
+def test_ngram_frequencies_sparse(monkeypatch):
+    text = sequence.Sequence(text="ABABABCABC", alphabet=alphabet.UPPERCASE_ALPHABET)
+    dense = ngram_frequencies(text, length=2)
+    monkeypatch.setattr(ngrams_module, "DENSE_NGRAM_LIMIT", 0)
+    sparse = ngram_frequencies(text, length=2)
+    assert dense[0].tolist() == sparse[0].tolist() == [1, 26, 28, 52]
+    assert dense[1].tolist() == sparse[1].tolist() == [4, 2, 2, 1]
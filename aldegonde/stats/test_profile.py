@@ -0,0 +1,35 @@
+"""tests for profile.py"""
+
+import pytest
+
+from ..structures import alphabet, sequence
+from .doublets import doublets, triplets
+from .ioc import ioc, ioc2, ioc_general
+from .profile import profile
+from .surrogates import as_sequences, uniform
+
+text = as_sequences(uniform(500, 1, 26, seed=4), alphabet.UPPERCASE_ALPHABET)[0]
+trpl = sequence.Sequence(
+    "AAABBBCCCDDDEEEFFFGGGHHH", alphabet=alphabet.UPPERCASE_ALPHABET
+)
+
+
+def test_profile_ioc():
+    p = profile(text, maxlength=5)
+    for length in range(1, 6):
+        for cut in range(0, length + 1):
+            assert p.ioc[(length, cut)] == pytest.approx(
+                ioc_general(text, length=length, cut=cut)
+            )
+    assert p.coincidence(1) == pytest.approx(ioc(text))
+    assert p.coincidence(2, cut=1) == pytest.approx(ioc2(text, cut=1))
+
+
+def test_profile_counts():
+    p = profile(trpl, maxlength=2)
+    assert p.length == 24
+    assert p.frequencies[:8].tolist() == [3] * 8
+    assert p.doublets[1] == len(doublets(trpl))
+    assert p.doublets[2] == len(doublets(trpl, skip=2))
+    assert p.triplets == triplets(trpl)
+    assert p.entropy[1] == pytest.approx(3.0)
@@ -0,0 +1,43 @@
+"""tests for repeats.py and suffixarray.py"""
+
+import numpy as np
+
+from ..structures import alphabet, sequence
+from .repeats import repeat, repeat2, repeat_intervals
+from .suffixarray import SuffixArray
+
+text = sequence.Sequence("ABCDXABCDYBCDZABCD", alphabet=alphabet.UPPERCASE_ALPHABET)
+
+
+def test_suffix_array():
+    data = np.random.default_rng(3).integers(0, 3, 200)
+    s = SuffixArray(data)
+    suffixes = sorted(range(0, len(data)), key=lambda i: data[i:].tolist())
+    assert s.sa.tolist() == suffixes
+    for k in range(1, len(data)):
+        a, b = data[suffixes[k - 1] :], data[suffixes[k] :]
+        n = min(len(a), len(b))
+        mismatch = np.flatnonzero(a[:n] != b[:n])
+        assert s.lcp[k] == (mismatch[0] if len(mismatch) else n)
+
+
+def test_repeat2():
+    assert repeat2(text, minimum=3, maximum=4) == {
+        "0-1-2": [0, 5, 14],
+        "1-2-3": [1, 6, 10, 15],
+        "0-1-2-3": [0, 5, 14],
+    }
+    assert repeat(text, minimum=4) == {"0-1-2-3": 3}
+
+
+def test_repeat_intervals():
+    r = repeat_intervals(text, minimum=3)
+    found = {
+        (int(r.shortest[i]), int(r.length[i])): r.positions(i).tolist()
+        for i in range(0, len(r))
+    }
+    assert found == {(3, 3): [1, 6, 10, 15], (3, 4): [0, 5, 14]}
+    r = repeat_intervals(text, minimum=3, maximal=True)
+    assert sorted(zip(r.length.tolist(), r.count().tolist())) == [(3, 4), (4, 3)]
+    r = repeat_intervals(text, minimum=3, maximal=True, maximum=3)
+    assert r.length.tolist() == [3]
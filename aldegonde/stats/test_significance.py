@@ -0,0 +1,47 @@
+"""tests for significance.py"""
+
+import pytest
+from scipy.stats import poisson
+
+from ..analysis.isomorph import NULL_MAXLENGTH
+from .significance import NullCache, expected, interval, sigmage
+
+
+def test_closed_forms():
+    mean, var = expected("doublets", 13136, 29, 1)
+    assert (mean, var) == pytest.approx(poisson.stats(13136 / 29, moments="mv"))
+    mu = 13136 / 29**3
+    mean, var = expected("repeats", 13136, 29, 3)
+    assert mean == pytest.approx(29**3 * poisson.pmf(2, mu))
+    assert var == pytest.approx(29**3 * poisson.stats(mu, moments="v"))
+    assert sigmage("doublets", 453 + 3 * 453**0.5, 13137, 29) == pytest.approx(3.0, 0.01)
+
+
+def test_monte_carlo_cache(tmp_path):
+    path = str(tmp_path / "nulls.json")
+    nulls = NullCache(path)
+    distinct = expected("isomorphs_distinct", 200, 29, 4, nulls)
+    duplicate = expected("isomorphs_duplicate", 200, 29, 4, nulls)
+    # one run fills in both statistics for every length
+    assert len(nulls.entries) == 2 * NULL_MAXLENGTH
+    assert expected("isomorphs_duplicate", 200, 29, 7, nulls) != duplicate
+    assert len(nulls.entries) == 2 * NULL_MAXLENGTH
+    # read back from disk, and the same values from a cold cache
+    assert expected("isomorphs_duplicate", 200, 29, 4, NullCache(path)) == duplicate
+    assert expected("isomorphs_distinct", 200, 29, 4, NullCache()) == distinct
+
+
+def test_interval(tmp_path):
+    nulls = NullCache(str(tmp_path / "nulls.json"))
+    mean, _ = expected("isomorphs_distinct", 200, 29, 3, nulls, samples=40)
+    low, high = interval("isomorphs_distinct", 200, 29, 3, nulls=nulls, samples=40)
+    assert low < mean < high
+    # models and sample counts are cached apart
+    expected("isomorphs_distinct", 200, 29, 3, nulls, model="low_doublets", samples=40)
+    assert len(nulls.entries) == 4 * NULL_MAXLENGTH
+    assert interval("doublets", 1000, 29) == expected("doublets", 1000, 29)[:1] * 2
+
+
+def test_unknown_statistic():
+    with pytest.raises(ValueError):
+        expected("nothing", 100, 29)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from ..structures import alphabet, sequence
+
+from .surrogates import low_doublets, markov, shuffled, uniform
+
+
+def test_uniform_seeded():
+    a = uniform(1000, samples=5, alphabetsize=29, seed=1)
+    assert a.shape == (5, 1000)
+    assert a.min() >= 0 and a.max() < 29
+    assert np.array_equal(a, uniform(1000, samples=5, alphabetsize=29, seed=1))
+
+
+def test_shuffled_preserves_frequencies():
+    seq = sequence.Sequence(text="NOTIFYQUARTERMASTER", alphabet=alphabet.UPPERCASE_ALPHABET)
+    batch = shuffled(seq, samples=10, seed=2)
+    for row in batch:
+        assert sorted(row.tolist()) == sorted(seq.data.tolist())
+
+
+def test_low_doublets():
+    batch = low_doublets(10000, samples=4, alphabetsize=29, doublets=0.0, seed=3)
+    assert not (batch[:, 1:] == batch[:, :-1]).any()
+    batch = low_doublets(10000, samples=4, alphabetsize=29, doublets=0.5, seed=3)
+    assert abs((batch[:, 1:] == batch[:, :-1]).mean() - 0.5) < 0.02
+
+
+def test_markov_follows_text():
+    seq = sequence.Sequence(text="ABCD" * 50, alphabet=alphabet.UPPERCASE_ALPHABET)
+    batch = markov(seq, length=40, samples=3, order=1, seed=4)
+    for row in batch:
+        assert (np.diff(row.astype(int)) % 4 == 1).all()
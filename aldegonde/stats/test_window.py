@@ -0,0 +1,43 @@
+"""tests for window.py"""
+
+import numpy as np
+import pytest
+
+from ..structures import alphabet
+from .ioc import ioc_general
+from .surrogates import as_sequences, low_doublets
+from .window import Occurrences, sliding_window_statistics
+
+text = as_sequences(low_doublets(300, 1, 26, 0.2, seed=7), alphabet.UPPERCASE_ALPHABET)[0]
+
+
+def test_occurrences():
+    occ = Occurrences(np.array([1, 2, 1, 1, 3]))
+    assert occ.count(
+        np.array([1, 1, 2, 4]), np.array([0, 1, 0, 0]), np.array([5, 3, 1, 5])
+    ).tolist() == [3, 1, 0, 0]
+    assert occ.ahead(3).tolist() == [2, 1, 2, 1, 1]
+    assert occ.behind(3).tolist() == [0, 0, 1, 2, 0]
+
+
+def test_sliding_window_statistics():
+    stats = sliding_window_statistics(text, [20, 57])
+    for W in (20, 57):
+        s = stats[W]
+        assert len(s.ioc) == len(s.ioc2) == len(s.entropy) == len(text) - W + 1
+        for i in range(0, len(text) - W + 1, 11):
+            window = text[i : i + W]
+            assert s.ioc[i] == pytest.approx(ioc_general(window, 1)[0])
+            assert s.ioc2[i] == pytest.approx(ioc_general(window, 2)[0])
+            counts = np.bincount(window.data)
+            p = counts[counts > 0] / W
+            assert s.entropy[i] == pytest.approx(-(p * np.log2(p)).sum())
+            data = window.data
+            assert s.doublets[i] == pytest.approx(
+                np.count_nonzero(data[:-1] == data[1:]) / (W - 1)
+            )
+
+
+def test_sliding_window_too_large():
+    with pytest.raises(ValueError):
+        sliding_window_statistics(text, [301])
@@ -0,0 +1,163 @@
+"""
+Sliding-window statistics.
+
+A window moves over the text one rune at a time. Every step one rune
+leaves and one enters, so a sum over the counts in the window, like
+sum c(c-1) for the IoC, changes by two terms only. The counts of the
+leaving and entering rune at every step are looked up all at once, after
+which the sums for every position are a cumulative sum of the changes.
+Cost does not depend on the window size, where rebuilding the counts of
+every window costs O(N*W).
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+
+from ..structures import sequence
+
+
+class Occurrences:
+    """
+    Counts how often a code occurs near a position in an array of codes.
+    All positions are sorted by (code, position) once. A window around every
+    position then is a shift of those sorted keys, so counting for all
+    positions is one sorted search.
+
+    Example:
+        >>> occ = Occurrences(np.array([1, 2, 1, 1]))
+        >>> occ.ahead(3)
+        array([2, 1, 2, 1])
+    """
+
+    def __init__(self, codes: np.ndarray) -> None:
+        self.codes = np.asarray(codes, dtype=np.int64)
+        # wide enough that a key shifted by a window stays within its code
+        self.stride: int = 2 * len(self.codes) + 1
+        self.order = np.argsort(self.codes, kind="stable")
+        self.keys = self.codes[self.order] * self.stride + self.order
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def count(self, values: np.ndarray, start: np.ndarray, stop: np.ndarray) -> np.ndarray:
+        """
+        How often values[i] occurs in codes[start[i]:stop[i]], for every i
+        """
+        base = np.asarray(values, dtype=np.int64) * self.stride
+        return np.searchsorted(self.keys, base + stop) - np.searchsorted(
+            self.keys, base + start
+        )
+
+    def ahead(self, window: int) -> np.ndarray:
+        """
+        For every position p, how often codes[p] occurs in codes[p:p+window]
+        """
+        output = np.empty(len(self.keys), dtype=np.int64)
+        output[self.order] = np.searchsorted(self.keys, self.keys + window) - np.arange(
+            0, len(self.keys)
+        )
+        return output
+
+    def behind(self, window: int) -> np.ndarray:
+        """
+        For every position p, how often codes[p] occurs in codes[p-window:p]
+        """
+        output = np.empty(len(self.keys), dtype=np.int64)
+        output[self.order] = np.arange(0, len(self.keys)) - np.searchsorted(
+            self.keys, self.keys - window
+        )
+        return output
+
+
+def pairs(c: np.ndarray) -> np.ndarray:
+    """
+    c*(c-1), the number of ordered pairs among c equal items
+    """
+    return c * (c - 1)
+
+
+def clogc(c: np.ndarray) -> np.ndarray:
+    """
+    c*log(c), with 0*log(0) = 0
+    """
+    c = np.asarray(c, dtype=np.float64)
+    return c * np.log(np.maximum(c, 1))
+
+
+def sliding_sums(
+    occurrences: Occurrences,
+    window: int,
+    functions: list[Callable[[np.ndarray], np.ndarray]],
+) -> list[np.ndarray]:
+    """
+    For every function f: sum f(c) over the counts c of all codes in the
+    window, for all N-window+1 window positions
+    """
+    codes = occurrences.codes
+    N = len(codes)
+    if window < 1 or window > N:
+        return [np.empty(0) for f in functions]
+    _, counts = np.unique(codes[:window], return_counts=True)
+
+    # step i moves the window from codes[i:i+window] to codes[i+1:i+window+1]
+    same = codes[: N - window] == codes[window:]
+    out = occurrences.ahead(window)[: N - window]
+    into = occurrences.behind(window)[window:]
+    output: list[np.ndarray] = []
+    for f in functions:
+        first = f(counts).sum()
+        delta = f(out - 1) - f(out) + f(into + 1) - f(into)
+        delta[same] = 0
+        output.append(np.concatenate(([first], first + np.cumsum(delta))))
+    return output
+
+
+@dataclass
+class WindowStatistics:
+    """
+    Statistics of every window of one size, element i is the window that
+    starts at rune i: normalized monographic and digraphic IoC, entropy in
+    bits, and the fraction of adjacent rune pairs that are doublets
+    """
+
+    window: int
+    ioc: np.ndarray
+    ioc2: np.ndarray
+    entropy: np.ndarray
+    doublets: np.ndarray
+
+
+def sliding_window_statistics(
+    runes: sequence.Sequence, windows: Iterable[int] = (100,)
+) -> dict[int, WindowStatistics]:
+    """
+    IoC, digraphic IoC, entropy and doublet rate of every window, for several
+    window sizes in one sweep. The lookup tables are shared by all sizes.
+    """
+    M = len(runes.alphabet)
+    data = runes.data.astype(np.int64)
+    N = len(data)
+    monographs = Occurrences(data)
+    digraphs = Occurrences(data[:-1] * M + data[1:])
+    doublets = np.concatenate(([0], np.cumsum(data[:-1] == data[1:])))
+
+    output: dict[int, WindowStatistics] = {}
+    for W in windows:
+        if W < 3:
+            raise ValueError(f"window of {W} runes is too small")
+        if W > N:
+            raise ValueError(f"window of {W} runes is larger than the text")
+        S1, C = sliding_sums(monographs, W, [pairs, clogc])
+        (S2,) = sliding_sums(digraphs, W - 1, [pairs])
+        H = (math.log(W) - C / W) / math.log(2)
+        output[W] = WindowStatistics(
+            window=W,
+            ioc=M * S1 / (W * (W - 1)),
+            ioc2=M * M * S2 / ((W - 1) * (W - 2)),
+            entropy=H,
+            doublets=(doublets[W - 1 :] - doublets[: N - W + 1]) / (W - 1),
+        )
+    return output
@@ -1,7 +1,11 @@
 """Class to group information about alphabets.
 """
 
-from typing import Union, overload
+from types import MappingProxyType
+from typing import Mapping, Optional, Union, overload
+import weakref
+
+import numpy as np
 
 LOWERCASE_ALPHABET = [chr(code) for code in range(ord("a"), ord("z") + 1)]
 UPPERCASE_ALPHABET = [chr(code) for code in range(ord("A"), ord("Z") + 1)]
@@ -11,25 +15,99 @@ BASE62_ALPHABET = LOWERCASE_ALPHABET + UPPERCASE_ALPHABET + DIGITS_ALPHABET
 
 class Alphabet:
     """
+    Alphabets are immutable and interned: constructing the same alphabet twice
+    returns the same object, as long as the first one is still alive.
+
+    `aliases` maps variant symbols to a symbol of the alphabet, they are
+    accepted when encoding, e.g. Alphabet(CICADA_ALPHABET, aliases={"ᛂ": "ᛄ"})
+    Aliases don't change the symbols, alphabets with the same symbols are
+    equal with or without aliases.
+
     Example:
         >>> abc = Alphabet(LOWERCASE_ALPHABET)
     """
 
-    def __init__(self, data: Union[list[str], str, None] = UPPERCASE_ALPHABET) -> None:
-        """ """
-        if isinstance(data, list):
-            self.alphabet = data
+    # weak, so alphabets that are no longer used don't stay around
+    interned: "weakref.WeakValueDictionary[tuple, Alphabet]" = weakref.WeakValueDictionary()
+
+    alphabet: tuple[str, ...]
+    aliases: Mapping[str, str]
+    alphabetsize: int
+    reversealphabet: dict[str, int]
+    translationtable: np.ndarray
+    decodetable: np.ndarray
+    singlechar: bool
+
+    def __new__(
+        cls,
+        data: Union[list[str], tuple[str, ...], str, None] = UPPERCASE_ALPHABET,
+        aliases: Optional[dict[str, str]] = None,
+    ) -> "Alphabet":
+        if isinstance(data, (list, tuple)):
+            symbols = tuple(data)
         elif isinstance(data, str):
-            self.data = list(data)
+            symbols = tuple(data)
         elif data is None:
-            self.data = []
+            symbols = ()
         else:
-            raise TypeError
+            raise TypeError(f"Unsupported type: {type(data)}")
+        aliases = dict(aliases or {})
 
-        self.alphabetsize = len(self.alphabet)
-        self.reversealphabet: dict[str, int] = {}
-        for i, e in enumerate(self.alphabet):
-            self.reversealphabet[e] = i
+        key = (symbols, tuple(sorted(aliases.items())))
+        try:
+            return cls.interned[key]
+        except KeyError:
+            pass
+
+        reversealphabet: dict[str, int] = {}
+        for i, e in enumerate(symbols):
+            reversealphabet[e] = i
+        for variant, e in aliases.items():
+            if e not in reversealphabet or variant in symbols:
+                raise ValueError(f"Invalid alias {variant} for {e}")
+            reversealphabet[variant] = reversealphabet[e]
+
+        # dense table from unicode codepoint to index, -1 when not in the alphabet
+        single = [e for e in reversealphabet if len(e) == 1]
+        size = max((ord(e) for e in single), default=0) + 2
+        table = np.full(size, -1, dtype=np.int32)
+        for e in single:
+            table[ord(e)] = reversealphabet[e]
+        table.flags.writeable = False
+        singlechar = all(len(e) == 1 for e in symbols)
+        # and back from index to codepoint
+        decodetable = np.array([ord(e) for e in symbols] if singlechar else [], dtype="<u4")
+
+        self = super().__new__(cls)
+        object.__setattr__(self, "alphabet", symbols)
+        object.__setattr__(self, "aliases", MappingProxyType(aliases))
+        object.__setattr__(self, "alphabetsize", len(symbols))
+        object.__setattr__(self, "reversealphabet", reversealphabet)
+        object.__setattr__(self, "translationtable", table)
+        object.__setattr__(self, "decodetable", decodetable)
+        object.__setattr__(self, "singlechar", singlechar)
+        cls.interned[key] = self
+        return self
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Alphabet is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Alphabet is immutable")
+
+    def __reduce__(self):
+        """
+        Unpickling goes through the constructor, so it returns the interned object
+        """
+        return (Alphabet, (self.alphabet, dict(self.aliases)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Alphabet):
+            return NotImplemented
+        return self is other or self.alphabet == other.alphabet
+
+    def __hash__(self) -> int:
+        return hash(self.alphabet)
 
     def __len__(self) -> int:
         return self.alphabetsize
@@ -39,14 +117,16 @@ class Alphabet:
         ...
 
     @overload
-    def __getitem__(self, key: slice) -> Union[str, list[str]]:
+    def __getitem__(self, key: slice) -> list[str]:
         ...
 
     def __getitem__(self, key: Union[int, slice]) -> Union[str, list[str]]:
         """
         Return character at this position like a normal sequence
         """
-        return self.alphabet.__getitem__(key)
+        if isinstance(key, slice):
+            return list(self.alphabet[key])
+        return self.alphabet[key]
 
     def __repr__(self) -> str:
         return "Alphabet(" + "".join(self.alphabet) + ")"
@@ -55,11 +135,6 @@ class Alphabet:
         """ """
         return "".join(self.alphabet) + f" ({len(self.alphabet)} symbols)"
 
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Alphabet):
-            return NotImplemented
-        return self.alphabet == other.alphabet
-
     def __iter__(self):
         """
         TODO: use separate iterator object
@@ -67,10 +142,9 @@ class Alphabet:
         return AlphabetIterator(self)
 
     def a2i(self, a: str) -> int:
-        i = self.reversealphabet[a]
-        if i is not None:
+        try:
             return self.reversealphabet[a]
-        else:
+        except KeyError:
             raise KeyError("Character not in alphabet")
 
     def i2a(self, i: int) -> str:
@@ -79,6 +153,37 @@ class Alphabet:
         except IndexError:
             raise KeyError("Character not in alphabet")
 
+    def table(self) -> np.ndarray:
+        """
+        Dense lookup table from unicode codepoint to index in the alphabet.
+        Codepoints that are not in the alphabet map to -1, including everything
+        beyond the end of the table which is clamped to the last entry.
+        Only single character symbols and aliases can be looked up this way.
+        """
+        return self.translationtable
+
+    def encode(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Translate text to indices in a single pass, aliases included.
+        Returns the indices of all characters found in the alphabet, and a
+        boolean mask over `text` that is False for every skipped character
+        """
+        table = self.translationtable
+        codepoints = np.frombuffer(
+            text.encode("utf-32-le", "surrogatepass"), dtype="<u4"
+        )
+        indices = table[np.minimum(codepoints, len(table) - 1)]
+        mask = indices >= 0
+        return indices[mask], mask
+
+    def decode(self, data: np.ndarray) -> str:
+        """
+        Translate indices back to text in a single pass
+        """
+        if self.singlechar:
+            return self.decodetable[data].tobytes().decode("utf-32-le", "surrogatepass")
+        return "".join(np.array(self.alphabet, dtype=object)[data])
+
 
 class AlphabetIterator:
     """
@@ -101,20 +206,14 @@ def a2i(text: str) -> list[int]:
     """
     LETTER 2 INTEGER [A-Z] -> [0-25]
     """
-    output: list[int] = []
-    for c in text:
-        output.append(ord(c) - ord("A"))
-    return output
+    return [ord(c) - ord("A") for c in text]
 
 
 def i2a(text: list[int]) -> str:
     """
     LETTER 2 ASCII [0-25] -> [A-Z]
     """
-    output: str = ""
-    for c in text:
-        output += chr(ord("A") + c)
-    return output
+    return "".join([chr(ord("A") + c) for c in text])
 
 
 def alphabet(text: list[int]) -> list[int]:
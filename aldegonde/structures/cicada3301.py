@@ -1,4 +1,9 @@
-import random
+import re
+
+import numpy as np
+
+from ..stats import surrogates
+from . import alphabet, keyspace, sequence, transcription
 
 CICADA_ALPHABET = [
     "ᚠ",
@@ -64,30 +69,85 @@ CICADA_ENGLISH_ALPHABET = [
     "EA",
 ]
 
+# variant spellings that are read as the same rune
+CICADA_ALIASES = {"ᛂ": "ᛄ"}
+
+# alternative latin letters for a rune, as in the gematria primus
+CICADA_ENGLISH_ALIASES = {
+    "V": "U",
+    "K": "C",
+    "Q": "C",
+    "Z": "S",
+    "ING": "NG",
+    "IO": "IA",
+}
+
+# First words of the sections of the Liber Primus, delimited by red runes.
+# The last entry are the solved closing pages at the end of the transcription
+LIBER_PRIMUS_SECTIONS = [
+    ["ᛋᚻᛖᚩᚷᛗᛡᚠ", "ᛋᚣᛖᛝᚳ"],
+    ["ᛚᛄ", "ᛇᚻᛝᚳᚦᛏᚫᛄᛏᛉᚻ"],
+    ["ᛈᛞᚦ", "ᛇᛞᛇ"],
+    ["ᚪᛏᛉᛒ", "ᛗ"],
+    ["ᛉᛁᛉᛗ", "ᚢᛉᛗᚳᚦᛈᚩᛒ"],
+    ["ᚠᚢᛚᛗ", "ᚪᛠᚣᛟᚪ"],
+    ["ᚢᚪ", "ᚹᛝᚷᛉᛞᚷ"],
+    ["ᛗᛈᚣ", "ᛚᛋᚩᚪᚫᚻᛚᛖᛇᛁᛗᛚ"],
+    ["ᛞᛇ", "ᛉᚳᚠᛁᚪᚹᚻᚷ"],
+    ["ᛝᚦᛇ", "ᛁᚠᚳᛟᛇ"],
+    ["ᛡᚳᛋ", "ᛈᛞᛋᛡ"],
+    ["ᚠᚾᛗ", "ᚣᚷᛞᚫᚻ"],
+    ["ᚪ", "ᛗᛝᛞᛡᚦᛉᛁᛗ"],
+    ["ᚫᛄ", "ᛟᛋᚱ"],
+]
+
+
+def liber_primus(path: str = "data/page0-58.txt") -> transcription.Transcription:
+    """
+    The Liber Primus with offsets of words, lines, pages and sections.
+    Compiled into a snapshot on first use, memory-mapped afterwards.
+    """
+    return transcription.load(
+        path,
+        alphabet.Alphabet(CICADA_ALPHABET, aliases=CICADA_ALIASES),
+        sections=LIBER_PRIMUS_SECTIONS,
+    )
+
+
+def english_to_runes(text: str) -> sequence.Sequence:
+    """
+    Transliterate English to runes of the gematria primus, the longest
+    letter group first: THING is TH-ING, QUEEN is C-U-E-E-N.
+    Other characters separate words, kept in boundaries["words"].
+    """
+    index = {e: i for i, e in enumerate(CICADA_ENGLISH_ALPHABET)}
+    for variant, e in CICADA_ENGLISH_ALIASES.items():
+        index[variant] = index[e]
+    groups = re.compile("|".join(sorted(index, key=len, reverse=True)))
+    data: list[int] = []
+    offsets: list[int] = [0]
+    for word in re.findall("[A-Z]+", text.upper()):
+        data.extend(index[g] for g in groups.findall(word))
+        offsets.append(len(data))
+    runes = sequence.Sequence(
+        data=data, alphabet=alphabet.Alphabet(CICADA_ALPHABET, aliases=CICADA_ALIASES)
+    )
+    runes.boundaries = {"words": np.array(offsets, dtype=np.int64)}
+    return runes
+
 
 def randomrunes(l: int, maximum: int = 29) -> list[int]:
     """
     Random list of runes of lenth len
     """
-    output = []
-    for i in range(0, l):
-        output.append(random.randrange(0, max))
-    return output
+    return surrogates.uniform(l, 1, maximum)[0].tolist()
 
 
 def randomrunes_with_low_doublets(length: int, maximum: int = 29) -> list[int]:
     """
     Random list of runes of lenth len, but with low doublets, like the LP
     """
-    output = []
-    prev = None
-    for i in range(0, length):
-        rune = random.randrange(0, maximum)
-        if rune == prev and random.randrange(0, 6) > 0:
-            rune = random.randrange(0, maximum)
-        prev = rune
-        output.append(rune)
-    return output
+    return surrogates.low_doublets(length, 1, maximum)[0].tolist()
 
 
 def numberToBase(n: int, b: int) -> list[int]:
@@ -120,27 +180,23 @@ def base29(input: int, padding: int = -1) -> list[int]:
 class RuneIterator:
     """
     iterates over runes length L, [0,0,0], [0,0,1], [0,0,2], ..., [0,0,28], [0,1,0], ...
+    The keys are generated in bulk by a Keyspace
     """
 
-    i: int
     maximum: int
     length: int
 
     def __init__(self, length: int):
         self.length = length
-        self.maximum = 29**length
+        self.keyspace = keyspace.keyspace(length, 29)
+        self.maximum = len(self.keyspace)
 
     def __iter__(self):
-        self.i = 0
+        self.keys = iter(self.keyspace)
         return self
 
     def __next__(self):
-        if self.i >= self.maximum:
-            raise StopIteration
-        else:
-            x = self.i
-            self.i += 1
-            return base29(x, padding=self.length)
+        return next(self.keys)
 
 
 def print_all(runes: list[int], limit: int = 0) -> None:
@@ -0,0 +1,133 @@
+"""Enumerate keys in bulk.
+
+A keyspace is every key of a fixed length, in lexicographic order:
+[0,0,0], [0,0,1], ..., [0,0,28], [0,1,0], ...
+
+Keys come in 2-D arrays of `chunksize` keys at a time, one key per row.
+Every key has an index, so a range of indices (start, stop) is a shard that
+can be handed to a separate worker.
+"""
+
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+from .sequence import storage_dtype
+
+# number of keys generated at a time
+KEYSPACE_CHUNK: int = 65536
+
+
+class Keyspace:
+    """
+    All keys over per-position alphabets. Every position is either the size of
+    the alphabet, or the list of values allowed at that position.
+
+    Example:
+        >>> keys = Keyspace([29, 29, 29, 29])
+        >>> keys = Keyspace([29, [0, 5, 7], 29])
+        >>> for chunk in keys.chunks(): ...
+    """
+
+    def __init__(self, positions: list[Union[int, list[int]]]) -> None:
+        self.values: list[np.ndarray] = []
+        for p in positions:
+            if isinstance(p, int):
+                self.values.append(np.arange(0, p, dtype=np.int64))
+            else:
+                self.values.append(np.array(p, dtype=np.int64))
+        self.radices: list[int] = [len(v) for v in self.values]
+        self.length: int = len(self.values)
+
+        self.size: int = 1
+        for r in self.radices:
+            self.size *= r
+        if self.size >= 1 << 63:
+            raise ValueError(f"keyspace of {self.size} keys is too large")
+
+        # weight of every position, the last position changes fastest
+        self.weights = np.ones(self.length, dtype=np.int64)
+        for i in range(self.length - 2, -1, -1):
+            self.weights[i] = self.weights[i + 1] * self.radices[i + 1]
+
+        largest = max((int(v.max()) for v in self.values if len(v) > 0), default=0)
+        self.dtype = storage_dtype(largest + 1)
+
+    def __len__(self) -> int:
+        """
+        Number of keys
+        """
+        return self.size
+
+    def __iter__(self) -> Iterator[list[int]]:
+        """
+        Iterate over the keys one at a time, as lists
+        """
+        for chunk in self.chunks():
+            yield from chunk.tolist()
+
+    def key(self, index: int) -> list[int]:
+        """
+        Key at this index
+        """
+        return self.chunk(index, index + 1)[0].tolist()
+
+    def index(self, key: list[int]) -> int:
+        """
+        Index of this key
+        """
+        if len(key) != self.length:
+            raise ValueError(f"key has length {len(key)}, expected {self.length}")
+        index = 0
+        for i, k in enumerate(key):
+            found = np.flatnonzero(self.values[i] == k)
+            if len(found) == 0:
+                raise ValueError(f"{k} not allowed at position {i}")
+            index += int(found[0]) * int(self.weights[i])
+        return index
+
+    def chunk(self, start: int, stop: int) -> np.ndarray:
+        """
+        Keys with index start up to stop as 2-D array, one key per row
+        """
+        start = max(start, 0)
+        stop = min(stop, self.size)
+        indices = np.arange(start, max(start, stop), dtype=np.int64)
+        keys = np.empty((len(indices), self.length), dtype=self.dtype)
+        for i in range(0, self.length):
+            digits = (indices // self.weights[i]) % self.radices[i]
+            keys[:, i] = self.values[i][digits]
+        return keys
+
+    def chunks(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        chunksize: int = KEYSPACE_CHUNK,
+    ) -> Iterator[np.ndarray]:
+        """
+        Keys with index start up to stop, in 2-D arrays of up to `chunksize` keys
+        """
+        if stop is None or stop > self.size:
+            stop = self.size
+        for begin in range(start, stop, chunksize):
+            yield self.chunk(begin, min(begin + chunksize, stop))
+
+    def shard(self, worker: int, workers: int) -> tuple[int, int]:
+        """
+        (start, stop) of the part of the keyspace for worker `worker` out of
+        `workers`. The shards are disjoint and cover the whole keyspace.
+        """
+        if not 0 <= worker < workers:
+            raise ValueError(f"worker {worker} out of range for {workers} workers")
+        return (
+            self.size * worker // workers,
+            self.size * (worker + 1) // workers,
+        )
+
+
+def keyspace(length: int, alphabet: Union[int, list[int]] = 29) -> Keyspace:
+    """
+    Keyspace of keys of this length, with the same alphabet at every position
+    """
+    return Keyspace([alphabet] * length)
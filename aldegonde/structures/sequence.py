@@ -1,35 +1,91 @@
 """Class to group information about a sequence.
 """
 
+import bisect
 import collections.abc
 from typing import Optional, Union, overload
 
+import numpy as np
+
 import aldegonde.structures.alphabet as alpha
 
 # TODO: can we inherit from abc.Sequence?
 
+# number of elements converted to python ints at a time while iterating
+ITERATION_CHUNK: int = 65536
+
+
+def storage_dtype(alphabetsize: int) -> np.dtype:
+    """
+    Smallest unsigned integer type that holds every index of an alphabet
+    Alphabets like CICADA_ALPHABET and UPPERCASE_ALPHABET fit in a byte
+    """
+    if alphabetsize <= 1 << 8:
+        return np.dtype(np.uint8)
+    elif alphabetsize <= 1 << 16:
+        return np.dtype(np.uint16)
+    return np.dtype(np.uint32)
+
+
+def offsets_from_mask(mask: np.ndarray, breaks: np.ndarray) -> np.ndarray:
+    """
+    Offset table of the units of a text: unit i covers elements
+    offsets[i]:offsets[i+1], the table ends with the number of elements.
+    `mask` marks the characters of the text that were encoded, a new unit
+    starts after every character where `breaks` is set. Empty units are dropped.
+    """
+    N = int(np.count_nonzero(mask))
+    # number of elements before each character of the text
+    before = np.cumsum(mask) - mask
+    starts = np.concatenate(([0], before[breaks]))
+    starts = np.unique(starts[starts < N])
+    return np.append(starts, N).astype(np.int64)
+
+
+def rebase_offsets(offsets: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """
+    Offset table for elements start:stop, the unit cut at start is kept as
+    the first unit
+    """
+    lo = np.searchsorted(offsets, start, side="right")
+    hi = np.searchsorted(offsets, stop, side="left")
+    return np.concatenate(([0], offsets[lo:hi] - start, [stop - start])).astype(
+        np.int64
+    )
+
 
 class Sequence(collections.abc.Sequence):
     """A sequence object, composed of plaintext or ciphertext
     It consists of elements, modeled as integers, and an alphabet of all possible options
 
+    The elements are stored in a compact numpy array, one byte per element for
+    alphabets up to 256 symbols. Slicing returns a SequenceView on the same
+    buffer, not a copy.
+
+    `boundaries` holds offset tables of units like words, lines or pages: unit
+    i of kind "words" covers data[boundaries["words"][i]:boundaries["words"][i+1]].
+    A Sequence built from text gets "words", split on the skipped characters.
+
     Example:
         >>> decryption = Sequence(text="plaintext")
     """
 
     text: str = ""
-    data: list[int] = []
+    mask: Optional[np.ndarray] = None
+    skipped: int = 0
     alphabet: alpha.Alphabet
+    boundaries: dict[str, np.ndarray]
 
     def __init__(
         self,
         text: Optional[str] = None,
-        data: Optional[list[int]] = None,
-        alphabet: Union[list[str], str, alpha.Alphabet, None] = None,
+        data: Union[list[int], np.ndarray, "Sequence", None] = None,
+        alphabet: Union[list[str], tuple[str, ...], str, alpha.Alphabet, None] = None,
     ) -> None:
         """
         Args:
-            text: The text
+            text: The text. Characters outside the alphabet are skipped, their
+                  number is kept in `skipped` and their positions in `mask`
             data: Raw elements as indices to the alphabet
         """
         if text is not None and data is not None:
@@ -37,112 +93,220 @@ class Sequence(collections.abc.Sequence):
 
         if isinstance(alphabet, alpha.Alphabet):
             self.alphabet = alphabet
-        elif isinstance(alphabet, str) or isinstance(alphabet, list):
+        elif isinstance(alphabet, (str, list, tuple)):
             self.alphabet = alpha.Alphabet(alphabet)
         elif alphabet is None:
             self.alphabet = alpha.Alphabet()
         else:
             raise TypeError(f"Unsupported type: {type(alphabet)}")
 
+        dtype = storage_dtype(len(self.alphabet))
+        self.boundaries = {}
+
         # TODO text can be an iterator..., not always a list
         if text is not None:
-            self.data = []
             self.text = text
-            skips = []
-            for c in text:
-                try:
-                    self.data.append(self.alphabet.a2i(c))
-                except KeyError:
-                    skips.append(c)
-                    pass
-            print(f"skipped characters {repr(set(skips))}")
+            elements, self.mask = self.alphabet.encode(text)
+            self.data = elements.astype(dtype)
+            self.skipped = len(text) - len(elements)
+            self.boundaries = {"words": offsets_from_mask(self.mask, ~self.mask)}
 
         elif data is not None:
-            self.data = data.copy()
+            if isinstance(data, Sequence):
+                data = data.data
+            self.data = np.array(data, dtype=dtype)
             self.text = ""
-            for i in self.data:
-                self.text += self.alphabet.i2a(i)
         else:
-            self.data = []
+            self.data = np.empty(0, dtype=dtype)
             self.text = ""
             # empty array
             pass
 
+    @classmethod
+    def wrap(
+        cls, data: np.ndarray, alphabet: Union[alpha.Alphabet, list[str]]
+    ) -> "Sequence":
+        """
+        Construct a Sequence around an existing array without copying it
+        """
+        if not isinstance(alphabet, alpha.Alphabet):
+            alphabet = alpha.Alphabet(alphabet)
+        seq = cls.__new__(cls)
+        seq.alphabet = alphabet
+        seq.data = data
+        seq.boundaries = {}
+        return seq
+
+    @classmethod
+    def from_buffer(
+        cls,
+        buffer: Union[np.ndarray, bytes, bytearray, memoryview],
+        alphabet: Union[alpha.Alphabet, list[str]],
+    ) -> "Sequence":
+        """
+        Construct a Sequence from anything that exposes a buffer, in one go.
+        The buffer is only copied when its type differs from the storage type,
+        all elements are checked to be inside the alphabet.
+        """
+        if isinstance(buffer, np.ndarray):
+            array = buffer
+        else:
+            array = np.frombuffer(buffer, dtype=storage_dtype(len(alphabet)))
+        if len(array) > 0 and (array.min() < 0 or array.max() >= len(alphabet)):
+            raise TypeError("Item outside alphabet")
+        return cls.wrap(array.astype(storage_dtype(len(alphabet)), copy=False), alphabet)
+
+    @classmethod
+    def allocate(
+        cls, length: int, alphabet: Union[alpha.Alphabet, list[str]]
+    ) -> "Sequence":
+        """
+        Construct a Sequence of `length` zeroes, for kernels that write their
+        output into `data` directly instead of appending
+        """
+        return cls.wrap(np.zeros(length, dtype=storage_dtype(len(alphabet))), alphabet)
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        The elements as indices to the alphabet
+        """
+        return self._buffer[: self._length]
+
+    @data.setter
+    def data(self, value: Union[list[int], np.ndarray]) -> None:
+        if not isinstance(value, np.ndarray):
+            value = np.array(value, dtype=storage_dtype(len(self.alphabet)))
+        self._buffer = value
+        self._length = len(value)
+
     def restore_punctuation(self) -> str:
         """
         Restore original punctuation
+        The elements are put back in the positions of the original text that
+        were encoded, everything that was skipped is kept as is. Elements
+        beyond the length of the original text are added at the end.
         """
-        out: str = ""
-        count: int = 0
-        skips: list = []
-        for c in self.text:
-            try:
-                out += self.alphabet.i2a(self.data[count])
-                count += 1
-            except IndexError:
-                skips.append(c)
-                out += c
-        print(f"skips: {repr(set(skips))}")
-        return out
+        if self.mask is None:
+            return self.alphabet.decode(self.data)
+        positions = np.flatnonzero(self.mask)
+        n = min(len(positions), len(self))
+        if self.alphabet.singlechar:
+            decoded = self.alphabet.decode(self.data[:n])
+            out = np.frombuffer(
+                self.text.encode("utf-32-le", "surrogatepass"), dtype="<u4"
+            ).copy()
+            out[positions[:n]] = np.frombuffer(
+                decoded.encode("utf-32-le", "surrogatepass"), dtype="<u4"
+            )
+            out = np.delete(out, positions[n:])
+            restored = out.tobytes().decode("utf-32-le", "surrogatepass")
+        else:
+            chars = np.array(list(self.text), dtype=object)
+            chars[positions[:n]] = [self.alphabet[i] for i in self.data[:n]]
+            restored = "".join(np.delete(chars, positions[n:]))
+        return restored + self.alphabet.decode(self.data[n:])
 
     @overload
     def __getitem__(self, key: int) -> int:
         ...
 
     @overload
-    def __getitem__(self, key: slice) -> Union[int, list[int]]:
+    def __getitem__(self, key: slice) -> "Sequence":
         ...
 
-    def __getitem__(self, key: Union[int, slice]) -> Union[int, list[int]]:
+    def __getitem__(self, key: Union[int, slice]) -> Union[int, "Sequence"]:
         """
         Return character at this position like a normal sequence
+        Slices return a SequenceView sharing the underlying buffer
         """
-        return self.data.__getitem__(key)
+        if isinstance(key, slice):
+            positions = range(0, len(self))[key]
+            return SequenceView(self, positions.start, positions.step, len(positions))
+        return int(self.data[key])
 
     def __len__(self) -> int:
         """
         Number of elements
         """
-        return len(self.data)
+        return self._length
 
     def __repr__(self) -> str:
         return (
             "Sequence(data="
-            + repr(self.data)
+            + repr(self.data.tolist())
             + ", alphabet="
             + repr(self.alphabet)
             + ")"
         )
 
     def __iter__(self):
-        """ """
-        return SequenceIterator(self)
+        """
+        Iterate over the elements as python ints
+        """
+        data = self.data
+        for start in range(0, len(data), ITERATION_CHUNK):
+            yield from data[start : start + ITERATION_CHUNK].tolist()
 
     def __str__(self) -> str:
         """ """
         if self.text:
             return self.restore_punctuation()
         else:
-            return "".join(map(self.alphabet.i2a, self.data))
+            return self.alphabet.decode(self.data)
 
-    def index(self, elem: int) -> int:
+    def index(self, elem: int, start: int = 0, stop: Optional[int] = None) -> int:
         """
         return index of element
         """
-        return self.data.index(elem)
+        found = np.flatnonzero(self.data[start:stop] == elem)
+        if len(found) == 0:
+            raise ValueError(f"{elem} is not in sequence")
+        return start + int(found[0])
 
     def append(self, item):
-        """ """
+        """
+        Append one element. The buffer grows geometrically, so repeated
+        appends are amortized O(1)
+        """
         if not isinstance(item, int):
             raise TypeError
-        if item > len(self.alphabet):
+        if item < 0 or item >= len(self.alphabet):
+            raise TypeError("Item outside alphabet")
+        if self._length == len(self._buffer):
+            grown = np.empty(max(16, 2 * self._length), dtype=self._buffer.dtype)
+            grown[: self._length] = self.data
+            self._buffer = grown
+        self._buffer[self._length] = item
+        self._length += 1
+
+    def extend(self, items: Union[list[int], np.ndarray, "Sequence"]) -> None:
+        """
+        Append many elements at once, with a single check for the whole batch
+        """
+        if isinstance(items, Sequence):
+            if items.alphabet != self.alphabet:
+                raise TypeError("Alphabets don't match")
+            items = items.data
+        items = np.asarray(items)
+        if len(items) == 0:
+            return
+        if items.dtype.kind not in "iu":
+            raise TypeError
+        if items.min() < 0 or items.max() >= len(self.alphabet):
             raise TypeError("Item outside alphabet")
-        self.data.append(item)
+        needed = self._length + len(items)
+        if needed > len(self._buffer):
+            grown = np.empty(max(16, 2 * self._length, needed), dtype=self._buffer.dtype)
+            grown[: self._length] = self.data
+            self._buffer = grown
+        self._buffer[self._length : needed] = items
+        self._length = needed
 
     def __add__(self, other):
         if other.alphabet != self.alphabet:
             raise TypeError("Alphabets don't match")
-        return Sequence(data=(self.data + other.data), alphabet=self.alphabet)
+        return Sequence.wrap(np.concatenate((self.data, other.data)), self.alphabet)
 
     def __eq__(self, other):
         try:
@@ -150,7 +314,7 @@ class Sequence(collections.abc.Sequence):
                 return False
         except AttributeError:
             return False
-        if other.data != self.data:
+        if not np.array_equal(other.data, self.data):
             print(f"data mismatch {other.data} != {self.data}")
             return False
         return True
@@ -158,33 +322,174 @@ class Sequence(collections.abc.Sequence):
     def copy(self):
         newone = type(self)()
         newone.__dict__.update(self.__dict__)
+        newone.data = self.data.copy()
         return newone
 
 
-class SequenceIterator:
+class SequenceView(Sequence):
+    """A read-only strided view on the buffer of a parent Sequence
+    Element i of the view is parent[offset + i * stride], nothing is copied.
+    Views of views refer to the original parent. Appending to the parent
+    afterwards is not reflected in the view.
+
+    Example:
+        >>> every_third = SequenceView(ciphertext, offset=1, stride=3)
     """
-    Iterator for Sequence
+
+    def __init__(
+        self,
+        parent: Sequence,
+        offset: int = 0,
+        stride: int = 1,
+        length: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            parent: The Sequence to look into
+            offset: Position of the first element in the parent
+            stride: Step between elements, can be negative
+            length: Number of elements, default as many as the parent has
+        """
+        if stride == 0:
+            raise ValueError("stride can't be zero")
+        positions = range(0, len(parent))[offset::stride]
+        if length is None:
+            length = len(positions)
+        elif length < 0 or length > len(positions):
+            raise ValueError(f"length {length} beyond end of parent")
+        offset = positions.start if length > 0 else 0
+
+        if isinstance(parent, SequenceView):
+            offset = parent.offset + offset * parent.stride
+            stride = stride * parent.stride
+            parent = parent.parent
+
+        self.parent = parent
+        self.offset = offset
+        self.stride = stride
+        self.length = length
+        self.alphabet = parent.alphabet
+        if length == 0:
+            self.data = parent.data[0:0]
+        else:
+            self.data = parent.data[offset::stride][:length]
+
+    @property
+    def boundaries(self) -> dict[str, np.ndarray]:
+        """
+        The offset tables of the parent, cut to this view. Only for stride 1
+        """
+        if self.stride != 1:
+            return {}
+        start = self.offset
+        return {
+            unit: rebase_offsets(offsets, start, start + self.length)
+            for unit, offsets in self.parent.boundaries.items()
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"SequenceView(offset={self.offset}, stride={self.stride}, "
+            f"length={self.length}, data={self.data.tolist()!r})"
+        )
+
+    def append(self, item):
+        raise TypeError("SequenceView is read-only, use copy() first")
+
+    def extend(self, items):
+        raise TypeError("SequenceView is read-only, use copy() first")
+
+    def copy(self) -> Sequence:
+        """
+        Materialize the view as a new independent Sequence
+        """
+        seq = Sequence.wrap(self.data.copy(), self.alphabet)
+        seq.boundaries = self.boundaries
+        return seq
+
+
+class SequenceChain(collections.abc.Sequence):
+    """A read-only concatenation of Sequences, without copying them.
+    Used for autokey keystreams like primer + ciphertext.
+
+    Example:
+        >>> key = SequenceChain(primer, ciphertext)
     """
 
-    def __init__(self, obj: Sequence) -> None:
-        self.idx: int = 0
-        self.obj = obj
+    def __init__(self, *parts: Sequence) -> None:
+        if len(parts) == 0:
+            raise TypeError("SequenceChain needs at least one part")
+        self.alphabet = parts[0].alphabet
+        for part in parts:
+            if part.alphabet != self.alphabet:
+                raise TypeError("Alphabets don't match")
+        self.parts = parts
+        # position in the chain where every part starts, and the total length
+        self.starts = [0]
+        for part in parts:
+            self.starts.append(self.starts[-1] + len(part))
 
-    def __next__(self):
-        self.idx += 1
-        try:
-            return self.obj[self.idx - 1]
-        except IndexError:
-            raise StopIteration
+    def __len__(self) -> int:
+        return self.starts[-1]
+
+    @overload
+    def __getitem__(self, key: int) -> int:
+        ...
+
+    @overload
+    def __getitem__(self, key: slice) -> Sequence:
+        ...
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[int, Sequence]:
+        """
+        Elements by position, slices are copied into a new Sequence
+        """
+        if isinstance(key, slice):
+            return Sequence.wrap(self.data[key], self.alphabet)
+        if key < 0:
+            key += len(self)
+        if key < 0 or key >= len(self):
+            raise IndexError("SequenceChain index out of range")
+        part = bisect.bisect_right(self.starts, key) - 1
+        return self.parts[part][key - self.starts[part]]
+
+    def __iter__(self):
+        for part in self.parts:
+            yield from part
+
+    def __str__(self) -> str:
+        return "".join(str(part) for part in self.parts)
+
+    @property
+    def data(self) -> np.ndarray:
+        """
+        All elements in a single new array
+        """
+        return np.concatenate([part.data for part in self.parts])
+
+    def pieces(self, start: int = 0, stop: Optional[int] = None):
+        """
+        Yield (position, array) for the contiguous pieces of the chain that
+        cover start up to stop, the arrays are views on the parts
+        """
+        if stop is None or stop > len(self):
+            stop = len(self)
+        for part, begin in zip(self.parts, self.starts):
+            lo = max(start, begin)
+            hi = min(stop, begin + len(part))
+            if lo < hi:
+                yield lo, part.data[lo - begin : hi - begin]
 
 
 def find(sequence: list[int], runes: list[int]) -> list[int]:
     """
     find `sequence` inside the list of `runes`, return array with indexes
     """
-    N = len(runes)
-    results = []
-    for index in range(0, N - len(sequence) + 1):
-        if sequence == runes[index : index + len(sequence)]:
-            results.append(index)
-    return results
+    needle = np.asarray(sequence)
+    haystack = np.asarray(runes)
+    if len(needle) == 0:
+        return list(range(0, len(haystack) + 1))
+    if len(needle) > len(haystack):
+        return []
+    windows = np.lib.stride_tricks.sliding_window_view(haystack, len(needle))
+    return np.flatnonzero((windows == needle).all(axis=1)).tolist()
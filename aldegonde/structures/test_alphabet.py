@@ -1,6 +1,10 @@
 #!/usr/bin/env python
 
-from .alphabet import a2i, i2a
+import gc
+
+import pytest
+
+from .alphabet import Alphabet, UPPERCASE_ALPHABET, a2i, i2a
 
 
 def test_a2i():
@@ -9,3 +13,46 @@ def test_a2i():
 
 def test_i2a():
     assert i2a([7, 24, 3, 17, 0, 20, 11, 8, 2]) == "HYDRAULIC"
+
+
+def test_encode_decode():
+    abc = Alphabet(UPPERCASE_ALPHABET)
+    data, mask = abc.encode("HY-DRA")
+    assert data.tolist() == [7, 24, 3, 17, 0]
+    assert mask.tolist() == [True, True, False, True, True, True]
+    assert abc.decode(data) == "HYDRA"
+
+
+def test_alphabet_interned():
+    assert Alphabet(UPPERCASE_ALPHABET) is Alphabet("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    assert Alphabet(UPPERCASE_ALPHABET) is not Alphabet(UPPERCASE_ALPHABET, aliases={"a": "A"})
+    with pytest.raises(AttributeError):
+        Alphabet(UPPERCASE_ALPHABET).alphabetsize = 3
+    with pytest.raises(TypeError):
+        Alphabet(UPPERCASE_ALPHABET, aliases={"a": "A"}).aliases["b"] = "B"
+
+
+def test_alphabet_interned_weakly():
+    key = (tuple("ZYX"), ())
+    mixed = Alphabet("ZYX")
+    assert Alphabet.interned[key] is mixed
+    del mixed
+    gc.collect()
+    assert key not in Alphabet.interned
+
+
+def test_alphabet_equal_with_aliases():
+    plain = Alphabet(UPPERCASE_ALPHABET)
+    aliased = Alphabet(UPPERCASE_ALPHABET, aliases={"a": "A"})
+    assert plain == aliased and hash(plain) == hash(aliased)
+    assert plain != Alphabet(UPPERCASE_ALPHABET[:25])
+
+
+def test_alphabet_aliases():
+    abc = Alphabet(UPPERCASE_ALPHABET[:21], aliases={"V": "U", "W": "U"})
+    data, _ = abc.encode("VUW")
+    assert data.tolist() == [20, 20, 20]
+    assert abc.a2i("V") == 20
+    assert abc.decode(data) == "UUU"
+    with pytest.raises(ValueError):
+        Alphabet(UPPERCASE_ALPHABET, aliases={"1": "!"})
@@ -1,7 +1,12 @@
 #!/usr/bin/env python
 
+import os
+
+from ..stats.chi import chi
 from .sequence import Sequence
-from .cicada3301 import CICADA_ALPHABET
+from .cicada3301 import CICADA_ALPHABET, english_to_runes, liber_primus
+
+LIBER_PRIMUS = os.path.join(os.path.dirname(__file__), "..", "..", "data", "page0-58.txt")
 
 
 def test_welcome():
@@ -12,3 +17,31 @@ def test_welcome():
     )
     assert str(seq1) == "ᚢᛠᛝᛋᛇᚠᚳᚱᛇᚢᚷᛈᛠᛠᚠᚹᛉᛏ"
     assert seq1[1] == 28
+
+
+def test_english_to_runes():
+    runes = english_to_runes("The thing, a queen!")
+    assert runes.data.tolist() == [2, 18, 2, 21, 24, 5, 1, 18, 18, 9]
+    assert runes.boundaries["words"].tolist() == [0, 2, 4, 5, 10]
+
+
+def test_liber_primus_plain_alphabet():
+    section = liber_primus(LIBER_PRIMUS).section(0)
+    plain = Sequence(data=section.data[:50].tolist(), alphabet=CICADA_ALPHABET)
+    assert section.alphabet == plain.alphabet
+    assert chi(section, plain) > 0
+    assert len(section[:10] + plain) == 60
+
+
+def test_liber_primus_words():
+    import lp_section_data
+
+    lp = liber_primus(LIBER_PRIMUS)
+    words = lp.offsets["words"]
+    sections = lp.offsets["sections"]
+    for i in range(0, 13):
+        reference = getattr(lp_section_data, f"section{i + 1}")["all_words"]
+        start, end = sections[i], sections[i + 1]
+        inside = words[(words >= start) & (words <= end)]
+        # words run on across page breaks
+        assert (inside[1:] - inside[:-1]).tolist() == [len(w) for w in reference]
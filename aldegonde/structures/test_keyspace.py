@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+
+from .keyspace import Keyspace, keyspace
+from .cicada3301 import RuneIterator, base29
+
+
+def test_keyspace_order():
+    keys = keyspace(3, 29)
+    assert len(keys) == 29**3
+    assert keys.key(0) == [0, 0, 0]
+    assert keys.key(29) == [0, 1, 0]
+    assert keys.key(1000) == base29(1000, padding=3)
+    assert keys.index([1, 5, 28]) == 29 * 29 + 5 * 29 + 28
+    assert next(iter(RuneIterator(2))) == [0, 0]
+
+
+def test_keyspace_shards():
+    keys = Keyspace([3, [1, 4], 5])
+    shards = [keys.shard(w, 4) for w in range(0, 4)]
+    rows = [r for start, stop in shards for c in keys.chunks(start, stop, chunksize=7) for r in c.tolist()]
+    assert rows == list(keys)
+    assert len(rows) == 30
+    assert rows[5] == [0, 4, 0]
+    assert {r[1] for r in rows} == {1, 4}
@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-from .sequence import Sequence
+from .sequence import Sequence, SequenceChain, SequenceView
 from .alphabet import UPPERCASE_ALPHABET
 
 
@@ -8,3 +8,46 @@ def test_sequence_init():
     assert Sequence(text="ABCDEFG", alphabet=UPPERCASE_ALPHABET) == Sequence(
         data=[0, 1, 2, 3, 4, 5, 6], alphabet=UPPERCASE_ALPHABET
     )
+
+
+def test_sequence_skipped():
+    seq = Sequence(text="HONESTY IS THE BEST POLICY!", alphabet=UPPERCASE_ALPHABET)
+    assert len(seq) == 22
+    assert seq.skipped == 5
+    assert str(seq) == "HONESTY IS THE BEST POLICY!"
+    assert str(seq[0:7]) == "HONESTY"
+
+
+def test_sequence_view():
+    seq = Sequence(text="ABCDEFGHIJ", alphabet=UPPERCASE_ALPHABET)
+    view = SequenceView(seq, offset=1, stride=3)
+    assert list(view) == [1, 4, 7]
+    assert view.data.base is not None
+    assert list(view[::-1]) == [7, 4, 1]
+    assert view[1:].offset == 4 and view[1:].stride == 3
+    assert list(seq[::-2]) == [9, 7, 5, 3, 1]
+    assert len(seq[5:2]) == 0
+    assert view.copy() == Sequence(data=[1, 4, 7], alphabet=UPPERCASE_ALPHABET)
+
+
+def test_sequence_bulk():
+    seq = Sequence.from_buffer(bytes([0, 1, 2]), alphabet=UPPERCASE_ALPHABET)
+    seq.extend([3, 4])
+    seq.extend(Sequence(text="F", alphabet=UPPERCASE_ALPHABET))
+    assert str(seq) == "ABCDEF"
+    out = Sequence.allocate(3, UPPERCASE_ALPHABET)
+    out.data[:] = seq.data[3:]
+    assert str(out) == "DEF"
+
+
+def test_sequence_chain():
+    primer = Sequence(text="KEY", alphabet=UPPERCASE_ALPHABET)
+    text = Sequence(text="ABCDEFG", alphabet=UPPERCASE_ALPHABET)
+    key = SequenceChain(primer, text)
+    assert len(key) == 10
+    assert key[2] == 24 and key[3] == 0 and key[-1] == 6
+    assert str(key) == "KEYABCDEFG"
+    assert [(start, piece.tolist()) for start, piece in key.pieces(1, 5)] == [
+        (1, [4, 24]),
+        (3, [0, 1]),
+    ]
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+from .alphabet import Alphabet, UPPERCASE_ALPHABET
+from .transcription import compile_transcription, load
+
+TEXT = "AB-CD.EF-/\nG&\n%\nHI-JK/\n%\n%\nLM.\n"
+
+
+def test_compile_transcription():
+    arrays = compile_transcription(
+        TEXT, Alphabet(UPPERCASE_ALPHABET), sections=[["AB"], ["HI"]]
+    )
+    assert len(arrays["runes"]) == 13
+    # words continue across line and page breaks
+    assert arrays["words"].tolist() == [0, 2, 4, 6, 7, 9, 13]
+    assert arrays["clauses"].tolist() == [0, 4, 13]
+    assert arrays["lines"].tolist() == [0, 6, 11, 13]
+    assert arrays["pages"].tolist() == [0, 7, 11, 11, 13]
+    assert arrays["sections"].tolist() == [0, 7, 13]
+
+
+def test_load_snapshot(tmp_path):
+    source = tmp_path / "lp.txt"
+    source.write_text(TEXT, encoding="utf-8")
+    first = load(str(source), UPPERCASE_ALPHABET)
+    second = load(str(source), UPPERCASE_ALPHABET)
+    assert (tmp_path / "lp.txt.snapshot").exists()
+    assert str(second.runes) == "ABCDEFGHIJKLM"
+    assert str(second.word(3)) == "G"
+    assert second.count("pages") == first.count("pages") == 4
@@ -0,0 +1,240 @@
+"""Transcriptions in the Liber Primus delimiter format, compiled once into
+a binary snapshot that later runs memory-map.
+
+Delimiters
+    Word     : -
+    Clause   : .
+    Paragraph: &
+    Segment  : $
+    Chapter  : §
+    Line     : /
+    Page     : %
+
+Clauses, paragraphs, segments and chapters end a word as well. Words run on
+across line and page breaks, like the transcription in lp_section_data.
+
+The snapshot holds the encoded runes and, for every kind of unit, an offset
+table: unit `i` covers runes[offsets[i]:offsets[i+1]]. All units are returned
+as Sequences that are views into the one memory-mapped buffer.
+"""
+
+import json
+import os
+from typing import Optional, Union
+
+import numpy as np
+
+from . import alphabet as alpha
+from .sequence import Sequence, offsets_from_mask, storage_dtype
+
+DELIMITERS: dict[str, str] = {
+    "words": "-.&$§",
+    "clauses": ".",
+    "paragraphs": "&",
+    "segments": "$",
+    "chapters": "§",
+    "lines": "/",
+    "pages": "%",
+}
+
+MAGIC: bytes = b"ALDSNAP1"
+
+
+def compile_transcription(
+    text: str,
+    alphabet: alpha.Alphabet,
+    sections: Optional[list[list[str]]] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Encode a transcription and build the offset tables.
+    `sections` is a list with the first words of every section, in order.
+    Each section runs until the next one starts, the last one until the end.
+    Empty units are dropped, except for pages so page numbers stay aligned.
+    """
+    runes, mask = alphabet.encode(text)
+    N = len(runes)
+    codepoints = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    # number of runes before each character of the text
+    before = np.cumsum(mask) - mask
+
+    arrays: dict[str, np.ndarray] = {
+        "runes": runes.astype(storage_dtype(len(alphabet)))
+    }
+    for unit, chars in DELIMITERS.items():
+        hits = np.isin(codepoints, [ord(c) for c in chars])
+        if unit != "pages":
+            arrays[unit] = offsets_from_mask(mask, hits)
+            continue
+        starts = np.concatenate(([0], before[hits]))
+        starts = starts[starts < N]
+        arrays[unit] = np.append(starts, N).astype(np.int64)
+
+    if sections is not None:
+        arrays["sections"] = find_sections(arrays, alphabet, sections)
+    return arrays
+
+
+def find_sections(
+    arrays: dict[str, np.ndarray],
+    alphabet: alpha.Alphabet,
+    sections: list[list[str]],
+) -> np.ndarray:
+    """
+    Find the rune offset where every section starts by matching its first
+    words against the word table, searching onwards from the previous section
+    """
+    runes = arrays["runes"]
+    words = arrays["words"]
+    wordstart = 0
+    starts: list[int] = []
+    for number, firstwords in enumerate(sections):
+        needle = [alphabet.encode(w)[0] for w in firstwords]
+        for w in range(wordstart, len(words) - len(needle)):
+            if all(
+                np.array_equal(runes[words[w + i] : words[w + i + 1]], n)
+                for i, n in enumerate(needle)
+            ):
+                starts.append(int(words[w]))
+                wordstart = w + 1
+                break
+        else:
+            raise ValueError(f"start of section {number} not found")
+    return np.array(starts + [len(runes)], dtype=np.int64)
+
+
+def write_snapshot(path: str, arrays: dict[str, np.ndarray], stamp: dict) -> None:
+    """
+    Write arrays to a single file: magic, header length, json header, then
+    the raw arrays, each aligned on 8 bytes
+    """
+    layout: dict[str, list] = {}
+    position = 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, position, len(array)]
+        position += -(-array.nbytes // 8) * 8
+    header = json.dumps({"stamp": stamp, "arrays": layout}).encode()
+    start = -(-(len(MAGIC) + 8 + len(header)) // 8) * 8
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([len(header)], dtype="<u8").tobytes())
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(start + layout[name][1])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(start + position)
+
+
+def read_snapshot(path: str) -> tuple[dict[str, np.ndarray], dict]:
+    """
+    Memory-map a snapshot. Every array is a read-only view into one buffer
+    """
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    if bytes(buffer[: len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} is not a snapshot")
+    length = int(buffer[len(MAGIC) : len(MAGIC) + 8].view("<u8")[0])
+    header = json.loads(bytes(buffer[len(MAGIC) + 8 : len(MAGIC) + 8 + length]))
+    start = -(-(len(MAGIC) + 8 + length) // 8) * 8
+
+    arrays: dict[str, np.ndarray] = {}
+    for name, (dtype, offset, count) in header["arrays"].items():
+        nbytes = count * np.dtype(dtype).itemsize
+        arrays[name] = buffer[start + offset : start + offset + nbytes].view(dtype)
+    return arrays, header
+
+
+class Transcription:
+    """
+    Runes of a transcription plus offset tables for words, lines, pages, ...
+    The runes carry the offset tables as their boundaries, so do all views
+    of them
+
+    Example:
+        >>> lp = load("data/page0-58.txt", Alphabet(CICADA_ALPHABET))
+        >>> lp.section(0)
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray], alphabet: alpha.Alphabet) -> None:
+        self.alphabet = alphabet
+        self.runes = Sequence.wrap(arrays["runes"], alphabet)
+        self.offsets = {k: v for k, v in arrays.items() if k != "runes"}
+        self.runes.boundaries = self.offsets
+
+    def __len__(self) -> int:
+        """
+        Number of runes
+        """
+        return len(self.runes)
+
+    def count(self, unit: str) -> int:
+        """
+        Number of units of this kind, e.g. count("words")
+        """
+        return len(self.offsets[unit]) - 1
+
+    def unit(self, unit: str, index: int) -> Sequence:
+        """
+        Runes of a single unit, as a view
+        """
+        offsets = self.offsets[unit]
+        return self.runes[int(offsets[index]) : int(offsets[index + 1])]
+
+    def units(self, unit: str) -> list[Sequence]:
+        """
+        Runes of all units of this kind, as views
+        """
+        return [self.unit(unit, i) for i in range(0, self.count(unit))]
+
+    def section(self, index: int) -> Sequence:
+        return self.unit("sections", index)
+
+    def page(self, index: int) -> Sequence:
+        return self.unit("pages", index)
+
+    def line(self, index: int) -> Sequence:
+        return self.unit("lines", index)
+
+    def word(self, index: int) -> Sequence:
+        return self.unit("words", index)
+
+
+def load(
+    source: str,
+    alphabet: Union[alpha.Alphabet, list[str]],
+    sections: Optional[list[list[str]]] = None,
+    snapshot: Optional[str] = None,
+) -> Transcription:
+    """
+    Load a transcription from its snapshot. The snapshot (by default next to
+    the source) is compiled first when it is missing or out of date.
+    If it can't be written the compiled arrays are used from memory.
+    """
+    if not isinstance(alphabet, alpha.Alphabet):
+        alphabet = alpha.Alphabet(alphabet)
+    if snapshot is None:
+        snapshot = source + ".snapshot"
+    stat = os.stat(source)
+    stamp = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "alphabet": list(alphabet.alphabet),
+        "aliases": dict(alphabet.aliases),
+        "sections": sections and [list(s) for s in sections],
+        "delimiters": DELIMITERS,
+    }
+
+    try:
+        arrays, header = read_snapshot(snapshot)
+        if header["stamp"] == stamp:
+            return Transcription(arrays, alphabet)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    with open(source, encoding="utf-8") as f:
+        arrays = compile_transcription(f.read(), alphabet, sections)
+    try:
+        write_snapshot(snapshot, arrays, stamp)
+        arrays, _ = read_snapshot(snapshot)
+    except OSError:
+        pass
+    return Transcription(arrays, alphabet)
@@ -1,10 +1,12 @@
 from collections import Counter, defaultdict
 import math
-import random
 from typing import Dict, List
 
 from scipy.stats import poisson
 
+from aldegonde.stats import repeats, surrogates
+from aldegonde.stats.suffixarray import SuffixArray
+from aldegonde.structures.keyspace import keyspace
 import gematria
 
 g = gematria.gematria
@@ -89,13 +91,7 @@ def shuffle(sequence: List[int]) -> List[int]:
     """
     Shuffle elements of a list
     """
-    inp = list(sequence)
-    output = []
-    while len(inp):
-        r = random.randrange(0, len(inp))
-        output.append(inp[r])
-        inp.remove(inp[r])
-    return output
+    return surrogates.shuffled(list(sequence))[0].tolist()
 
 
 def shannon_entropy(ciphertext: List[int], base: int = 2) -> float:
@@ -232,18 +228,7 @@ def repeat(
     Find repeating sequences in the list, up to `max`. Max defaults to 10
     Returns dictionary with as key the sequence as a string, and as value the number of occurences
     """
-    sequences = {}
-    for length in range(min, max + 1):
-        l = []
-        for index in range(0, len(ciphertext) - length + 1):
-            k = "-".join([str(x) for x in ciphertext[index : index + length]])
-            l.append(k)
-        f = Counter(l)
-        for k in f.keys():
-            if f[k] > 1:
-                sequences[k] = f[k]
-
-    return sequences
+    return {k: len(v) for k, v in repeat2(ciphertext, min=min, max=max).items()}
 
 
 def repeat_statistics(
@@ -280,21 +265,8 @@ def repeat2(
     Find repeating sequences in the list, up to `max`. Max defaults to 10
     Returns dictionary with as key the sequence as a string, and as value the list of starting positions of that substring
     """
-    sequences = {}
-    for length in range(min, max + 1):
-        l: Dict[str, List[int]] = {}
-        for index in range(0, len(ciphertext) - length + 1):
-            k = "-".join([str(x) for x in ciphertext[index : index + length]])
-            if k in l.keys():
-                l[k].append(index)
-            else:
-                l[k] = [index]
-
-        for k in l.keys():
-            if len(l[k]) > 1:
-                sequences[k] = l[k].copy()
-
-    return sequences
+    suffixes = SuffixArray(surrogates.elements(ciphertext))
+    return repeats.repeated_substrings(suffixes, minimum=min, maximum=max)
 
 
 def alphabet(text: List[int]) -> List[int]:
@@ -308,10 +280,7 @@ def randomrunes(l: int, max: int = MAX) -> List[int]:
     """
     Random list of runes of lenth len
     """
-    rl = []
-    for i in range(0, l):
-        rl.append(random.randrange(0, max))
-    return rl
+    return surrogates.uniform(l, 1, max)[0].tolist()
 
 
 def numberToBase(n: int, b: int) -> List[int]:
@@ -344,27 +313,23 @@ def base29(input: int, padding: int = -1) -> List[int]:
 class RuneIterator:
     """
     iterates over runes length L, [0,0,0], [0,0,1], [0,0,2], ..., [0,0,MAX], [0,1,0], ...
+    The keys are generated in bulk by a Keyspace
     """
 
-    i: int
     maximum: int
     length: int
 
     def __init__(self, length: int):
         self.length = length
-        self.maximum = MAX**length
+        self.keyspace = keyspace(length, MAX)
+        self.maximum = len(self.keyspace)
 
     def __iter__(self):
-        self.i = 0
+        self.keys = iter(self.keyspace)
         return self
 
     def __next__(self):
-        if self.i >= self.maximum:
-            raise StopIteration
-        else:
-            x = self.i
-            self.i += 1
-            return base29(x, padding=self.length)
+        return next(self.keys)
 
 
 def rot(inp: List[int], shift: int) -> List[int]:
@@ -1619,13 +1584,14 @@ def bruteforce_autokey(
         "plaintext_minuend": plaintext_autokey_minuend_decrypt,
     }
     for keylength in range(minkeylength, maxkeylength + 1):
-        for key in RuneIterator(keylength):
-            for a in algs.keys():
-                p = algs[a](ciphertext, key)
-                ic = normalized_ioc(p)
-                if ic > iocthreshold or trace:
-                    print(f"key {key}: {ic}: ")
-                    english_output(p, limit=30)
+        for chunk in keyspace(keylength, MAX).chunks():
+            for key in chunk.tolist():
+                for a in algs.keys():
+                    p = algs[a](ciphertext, key)
+                    ic = normalized_ioc(p)
+                    if ic > iocthreshold or trace:
+                        print(f"key {key}: {ic}: ")
+                        english_output(p, limit=30)
 
     return
 
@@ -8,8 +8,8 @@ import random
 import math
 from scipy.stats import poisson
 
-from aldegonde.structures import alphabet, sequence, cicada3301
-from aldegonde.stats import ioc, repeats, doublets, dist
+from aldegonde.structures import alphabet, cicada3301
+from aldegonde.stats import chi, ioc, repeats, profile
 from aldegonde.grams import bigram_diagram
 from aldegonde.math import factor
 from aldegonde.analysis import kappa, isomorph
@@ -29,19 +29,21 @@ def try_totient(runes: list[int]):
     cicada3301.english_output(out, limit=30)
 
 
-# with open("data/page54-55.txt") as f:
-with open("data/page0-58.txt") as f:
-    lp = f.read()
+# compiled once into data/page0-58.txt.snapshot, memory-mapped afterwards
+lp = cicada3301.liber_primus()
 
-# segments = lp.split("&")
-segments = [lp]
+# chi of every pair of sections, sections with the same key stand out
+sections = lp.units("sections")
+chis = chi.chi_matrix(chi.frequency_matrix(sections)) * len(lp.alphabet)
+chi.print_chi_matrix(chis)
+print(f"section clusters: {chi.chi_clusters(chis, 1.3)}")
+
+# segments = lp.units("paragraphs")
+segments = [lp.runes]
 print(f"{len(segments)} segments")
-for i, s in enumerate(segments):
-    if len(s) == 0:
-        continue
+for i, seg in enumerate(segments):
     print(f"\n\nNEW SEGMENT {i} **************")
 
-    seg = sequence.Sequence(s, alphabet=cicada3301.CICADA_ALPHABET)
     if len(seg) == 0:
         print("EMPTY SEGMENT {i}")
         continue
@@ -50,17 +52,14 @@ for i, s in enumerate(segments):
     used = "".join([seg.alphabet[r] for r in set(seg.data)])
     print(f"used alphabet: {used} {len(set(seg.data))} items")
     # print(f"ciphertext: {seg.elements}")
-    print(f"length: {len(seg)} runes")
     cicada3301.print_all(seg, limit=30)
-    dist.print_dist(seg)
-    print(f"ioc={ioc.ioc(seg):.3f} nioc={ioc.normalized_ioc(seg):.3f}")
+    # dist, ioc up to 5-grams, entropy and doublets in one pass
+    profile.print_profile(profile.profile(seg))
     bigram_diagram.print_bigram_diagram(seg)
     bigram_diagram.bigram_diagram_skip(seg, skip=2)
-    doublets.print_doublets_statistics(seg)
-    doublets.print_doublets_statistics(seg, skip=2)
     repeats.print_repeat_statistics(seg, minimum=2)
     kappa.print_kappa(seg)
-    reps = repeats.repeat2(seg, minimum=5)
+    reps = repeats.repeat2(seg, minimum=5, maximum=17)
     diffs = []
     for key in reps.keys():
         positions = reps[key]
@@ -2,10 +2,10 @@
 # #pypy3
 
 import math
-import random
+
+import numpy as np
 
 import gematria
-import lp_section_data as lp
 
 # import totient() method from sympy
 # import sympy
@@ -14,79 +14,44 @@ import lp_section_data as lp
 from lib import *
 
 import aldegonde
+from aldegonde.analysis.isomorph import InvertedIndex
+from aldegonde.analysis.words import (
+    first_rune_of_words,
+    runes_before_words_of_length,
+    unit_offsets,
+    word_lengths,
+    words_of_length,
+    words_with_doublets,
+)
+from aldegonde.stats import surrogates
+from aldegonde.stats.chi import chi_matrix
+from aldegonde.stats.profile import profile
+from aldegonde.structures import cicada3301
 
 g = gematria.gematria
 
 def first_letter_of_word():
-    for i in [
-        lp.section1,
-        lp.section2,
-        lp.section3,
-        lp.section4,
-        lp.section5,
-        lp.section6,
-        lp.section7,
-        lp.section8,
-        lp.section9,
-        lp.section10,
-        lp.section11,
-        lp.section12,
-        lp.section13,
-    ]:
-        firstrune = []
-        for j in i["all_words"]:
-            firstrune.append(j[0])
-        print(firstrune)
-        firstletter = []
-        for r in firstrune:
-            firstletter.append(g.rune_to_position_forward_dict[r])
-        print(ioc(firstletter))
-
-
-s1 = "".join(lp.section1["all_words"])
-s2 = "".join(lp.section2["all_words"])
-s3 = "".join(lp.section3["all_words"])
-s4 = "".join(lp.section4["all_words"])
-s5 = "".join(lp.section5["all_words"])
-s6 = "".join(lp.section6["all_words"])
-s7 = "".join(lp.section7["all_words"])
-s8 = "".join(lp.section8["all_words"])
-s9 = "".join(lp.section9["all_words"])
-s10 = "".join(lp.section10["all_words"])
-s11 = "".join(lp.section11["all_words"])
-s12 = "".join(lp.section12["all_words"])
-s13 = "".join(lp.section13["all_words"])
-s = s1 + s2 + s3 + s4 + s5 + s6 + s7 + s8 + s9 + s10 + s11 + s12 + s13
-sl = list(s)
-segments = [s1, s2, s3, s4, s5, s6, s7, s8, s9, s10, s11, s12, s13]
+    for segment in segments:
+        firstletter = first_rune_of_words(segment)
+        print(str(firstletter))
+        print(ioc(firstletter.data.tolist()))
+
+
+# the 13 red rune sections, as views into the memory-mapped LP snapshot
+liberprimus = cicada3301.liber_primus()
+segments = [liberprimus.section(i) for i in range(0, 13)]
 
 # RL is a random rune list same size as all the other runes
-rl = []
-for i in range(0, len(s)):
-    rl.append(random.randrange(0, MAX))
+rl = surrogates.uniform(int(liberprimus.offsets["sections"][13]), 1, MAX)[0].tolist()
 
 # rsegments are random lists, same size as the LP
-rsegments = []
-for i in segments:
-    l = len(i)
-    f = prime_factors(l)
-    r = []
-    for i in range(0, l):
-        r.append(random.randrange(0, MAX))
-    rsegments.append(r)
-
-# GL are the runes in 0-28 format, in one big list
-gl = []
-for i in sl:
-    gl.append(g.rune_to_position_forward_dict[i])
-
-# SGL are the runes in 0-28 format by segment, list of a list by chapter
-sgl = []
-for i in segments:
-    bgl = []
-    for j in i:
-        bgl.append(g.rune_to_position_forward_dict[j])
-    sgl.append(bgl)
+rsegments = [surrogates.uniform(len(i), 1, MAX)[0].tolist() for i in segments]
+
+# GL are the runes in 0-28 format, all sections in one view
+gl = liberprimus.runes[0 : int(liberprimus.offsets["sections"][13])]
+
+# SGL are the runes in 0-28 format by segment, one view per section
+sgl = segments
 
 # for l in range(1,30):
 #    gl = ciphertext_autokey_minuend_decrypt(gl,[1]*l)
@@ -105,110 +70,76 @@ def split_and_chi(ciphertext: list[int]):
     split text in some way and run chi2 on splits with itself
     """
     print("### SPLIT AND CHI")
-    spl = split_by_character(ciphertext)
+    # row s counts the runes that follow rune s, like split_by_character()
+    data = np.array(ciphertext, dtype=np.int64)
+    following = np.bincount(data[:-1] * MAX + data[1:], minlength=MAX * MAX)
+    chis = chi_matrix(following.reshape(MAX, MAX)) * MAX
     for s in range(0, MAX):
         for t in range(s, MAX):
-            print(f"chi {s}-{t}: {chi(spl[s],spl[t])*MAX}")
+            print(f"chi {s}-{t}: {chis[s, t]}")
 
 
 def find_words_with_doublets():
     """
     find isomorphs containing doublets or long isomorphs
     """
-    words = (
-        lp.section1["all_words"]
-        + lp.section2["all_words"]
-        + lp.section3["all_words"]
-        + lp.section4["all_words"]
-        + lp.section5["all_words"]
-        + lp.section6["all_words"]
-        + lp.section7["all_words"]
-        + lp.section8["all_words"]
-        + lp.section9["all_words"]
-        + lp.section10["all_words"]
-        + lp.section11["all_words"]
-        + lp.section12["all_words"]
-        + lp.section13["all_words"]
-    )
-    isos = {}
-
-    for word in words:
-        numbers = []
-        for rune in word:
-            numbers.append(g.rune_to_position_forward_dict[rune])
-
-        iso = isomorph(numbers)
-        string = f"{word} {numbers}"
-        if len(doublets(numbers)) > 0 or len(numbers) > 9:
-            if iso in isos:
-                isos[iso].append(string)
-            else:
-                isos[iso] = [string]
-
-    for key in isos.keys():
-        if len(isos[key]) > 2:
-            for l in range(0, len(isos[key])):
-                print(f"{key} {isos[key][l]}")
+    offsets = gl.boundaries["words"]
+    selected = np.union1d(words_with_doublets(gl), np.flatnonzero(word_lengths(gl) > 9))
+    words = [gl[int(offsets[w]) : int(offsets[w + 1])] for w in selected]
+    index = InvertedIndex(words)
+    seen: set[int] = set()
+
+    for i, word in enumerate(words):
+        if i in seen:
+            continue
+        group = [j for j, _ in index.find(word, whole=True)]
+        seen.update(group)
+        if len(group) > 2:
+            key = isomorph(word.data.tolist())
+            for j in group:
+                print(f"{key} {words[j]} {words[j].data.tolist()}")
 
 
 def find_words_before_single_rune():
     """
-    find isomorphs containing doublets or long isomorphs
+    the last rune of the word before every one-rune word, and the one-rune word
     """
-    words = (
-        lp.section1["all_words"]
-        + lp.section2["all_words"]
-        + lp.section3["all_words"]
-        + lp.section4["all_words"]
-        + lp.section5["all_words"]
-        + lp.section6["all_words"]
-        + lp.section7["all_words"]
-        + lp.section8["all_words"]
-        + lp.section9["all_words"]
-        + lp.section10["all_words"]
-        + lp.section11["all_words"]
-        + lp.section12["all_words"]
-        + lp.section13["all_words"]
-    )
-
-    prev = None
     print(f"A  word = ")
-    counter = 0
-    wc = 0
-    sums = []
-    diff1 = []
-    diff2 = []
-    for word in words:
-        current = []
-        for rune in word:
-            current.append(g.rune_to_position_forward_dict[rune])
-            counter += 1
-        if len(current) == 1:
-            print(
-                f"c={counter%29:4d} sum={(prev[-1]+current[0])%29:02d} diff={(current[0]-prev[-1])%29:02d} diff={(prev[-1]-current[0])%29:02d} {prev[-1]:2d} {current[0]:2d} =  --  {prev} {current} ctr={counter}"
-            )
-            sums.append((prev[-1] + current[0]) % 29)
-            diff1.append((prev[-1] - current[0]) % 29)
-            diff2.append((current[0] - prev[-1]) % 29)
-        prev = current
-
-    print(dist(sums))
-    print(dist(diff1))
-    print(dist(diff2))
+    prev, current = runes_before_words_of_length(gl, 1)
+    prev = prev.astype(int)
+    current = current.astype(int)
+    sums = (prev + current) % 29
+    diff1 = (prev - current) % 29
+    diff2 = (current - prev) % 29
+    # the words themselves and the rune count up to the end of each one-rune word
+    offsets = unit_offsets(gl, "words")
+    singles = words_of_length(gl, 1)
+    singles = singles[offsets[singles] > 0]
+    for i, w in enumerate(singles):
+        counter = int(offsets[w + 1])
+        prevword = gl.data[offsets[w - 1] : offsets[w]].tolist()
+        print(
+            f"c={counter%29:4d} sum={sums[i]:02d} diff={diff2[i]:02d} diff={diff1[i]:02d} {prev[i]:2d} {current[i]:2d} =  --  {prevword} {current[i : i + 1].tolist()} ctr={counter}"
+        )
+
+    print(dist(sums.tolist()))
+    print(dist(diff1.tolist()))
+    print(dist(diff2.tolist()))
 
 
 def analyze_segment(ciphertext: list[int]):
     print(f"ciphertext size {len(ciphertext)}")
     print(f"alphabet size {len(alphabet(ciphertext))}: {alphabet(ciphertext)}")
     print()
-    print(f" ioc={ioc(ciphertext):.3f}")
+    p = profile(ciphertext, maxlength=4)
+    print(f" ioc={p.coincidence(1):.3f}")
     print(
-        f" ioc2={ioc2(ciphertext,cut=0):.3f} ioc2a={ioc2(ciphertext,cut=1):.3f}, ioc2b={ioc2(ciphertext,cut=2):.3f}"
+        f" ioc2={p.coincidence(2,cut=0):.3f} ioc2a={p.coincidence(2,cut=1):.3f}, ioc2b={p.coincidence(2,cut=2):.3f}"
     )
     print(
-        f" ioc3={ioc3(ciphertext,cut=0):.3f} ioc3a={ioc3(ciphertext,cut=1):.3f}, ioc3b={ioc3(ciphertext,cut=2):.3f}, ioc3c={ioc3(ciphertext,cut=3):.3f}"
+        f" ioc3={p.coincidence(3,cut=0):.3f} ioc3a={p.coincidence(3,cut=1):.3f}, ioc3b={p.coincidence(3,cut=2):.3f}, ioc3c={p.coincidence(3,cut=3):.3f}"
     )
-    # print(f" ioc4={ioc4(ciphertext,cut=0):.4f} ioc4a={ioc4(ciphertext,cut=1):.4f}, ioc4b={ioc4(ciphertext,cut=2):.4f}, ioc4c={ioc4(ciphertext,cut=4):.4f}")
+    # print(f" ioc4={p.coincidence(4,cut=0):.4f} ioc4a={p.coincidence(4,cut=1):.4f}, ioc4b={p.coincidence(4,cut=2):.4f}, ioc4c={p.coincidence(4,cut=4):.4f}")
     print()
     # print(f" repeats length 3: {repeat2(ciphertext,min=3,max=3)}")
     print(f" repeats length 4: {repeat2(ciphertext,min=4,max=4)}")